@@ -0,0 +1,86 @@
+"""
+Benchmark del calendario de disponibilidad: compara la matriz de NumPy de
+`build_calendar` con calcular cada sala y día por separado con `DaySchedule`.
+Usa datos sintéticos, por lo que no necesita base de datos.
+
+Uso:
+    python -m app.commands.benchmark_calendar [--theaters 200] [--days 7 30 90] [--per-day 6]
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from app.shared.availability import CLOSE_MINUTE, OPEN_MINUTE, DaySchedule, to_minutes
+from app.shared.calendar_grid import build_calendar
+
+
+def generate_reservations(theaters: int, start_date: date, days: int, per_day: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    reservations = []
+    for theater in range(theaters):
+        for offset in range(days):
+            reservation_date = datetime.combine(start_date + timedelta(days=offset), datetime.min.time())
+            for _ in range(rng.randint(0, per_day)):
+                start = rng.randrange(OPEN_MINUTE, CLOSE_MINUTE - 30, 5)
+                end = min(start + rng.randrange(30, 180, 5), CLOSE_MINUTE)
+                reservations.append({
+                    "theater_id": str(theater),
+                    "reservation_date": reservation_date,
+                    "start_time": reservation_date + timedelta(minutes=start),
+                    "end_time": reservation_date + timedelta(minutes=end),
+                })
+    return reservations
+
+
+def per_day_calendar(theaters: list, start_date: date, days: int, reservations: list) -> list:
+    """Calendario calculado sala por sala y día por día, como lo haría la lógica de una reservación."""
+    by_day = {}
+    for index, reservation in enumerate(reservations):
+        key = (reservation["theater_id"], reservation["reservation_date"].date())
+        by_day.setdefault(key, []).append((index, reservation))
+
+    calendar = []
+    for theater in theaters:
+        theater_days = []
+        for offset in range(days):
+            current_date = start_date + timedelta(days=offset)
+            schedule = DaySchedule()
+            for index, reservation in by_day.get((theater["id"], current_date), []):
+                schedule.add(index, to_minutes(reservation["start_time"]), to_minutes(reservation["end_time"]))
+            theater_days.append({"date": current_date.strftime("%Y-%m-%d"), "free_slots": schedule.free_slots()})
+        calendar.append({"theater_id": theater["id"], "days": theater_days})
+    return calendar
+
+
+def measure(function, *args, repeat: int = 3) -> float:
+    """Mejor tiempo en milisegundos de `repeat` ejecuciones."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Mide el cálculo del calendario de disponibilidad de las salas.")
+    parser.add_argument("--theaters", type=int, default=200, help="Número de salas.")
+    parser.add_argument("--days", type=int, nargs="+", default=[7, 30, 90], help="Rangos de días a medir.")
+    parser.add_argument("--per-day", type=int, default=6, help="Máximo de reservaciones por sala y día.")
+    args = parser.parse_args(argv)
+
+    start_date = date(2030, 1, 1)
+    theaters = [{"id": str(index), "name": f"Sala {index}"} for index in range(args.theaters)]
+
+    print(f"{'días':>6} {'reservaciones':>14} {'numpy (ms)':>12} {'por día (ms)':>14} {'aceleración':>12}")
+    for days in args.days:
+        reservations = generate_reservations(args.theaters, start_date, days, args.per_day)
+        vectorized = measure(build_calendar, theaters, start_date, days, reservations)
+        per_day = measure(per_day_calendar, theaters, start_date, days, reservations)
+        print(f"{days:>6} {len(reservations):>14} {vectorized:>12.1f} {per_day:>14.1f} {per_day / vectorized:>11.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
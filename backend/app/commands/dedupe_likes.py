@@ -0,0 +1,37 @@
+"""
+Migración para el índice único de likes (user_id, movie_id): elimina los likes repetidos,
+crea los índices del registro y recalcula `likes_count` de las películas afectadas.
+
+Se ejecuta una vez en bases de datos creadas antes del índice único; mientras haya likes
+repetidos la aplicación inicia sin ese índice.
+
+Uso:
+    python -m app.commands.dedupe_likes
+"""
+import argparse
+import asyncio
+import sys
+from app.database.indexes import create_indexes
+from app.services.like import dedupe_likes_service, reconcile_likes_count_service
+
+
+async def migrate() -> int:
+    removed = await dedupe_likes_service()
+    print(f"Likes repetidos eliminados: {removed}")
+
+    failed = await create_indexes()
+    for failure in failed:
+        print(f"[error] {failure}")
+
+    fixed = await reconcile_likes_count_service()
+    print(f"Contadores de likes corregidos: {fixed}")
+    return 1 if failed else 0
+
+
+def main(argv=None) -> int:
+    argparse.ArgumentParser(description="Elimina los likes repetidos y crea el índice único de likes.").parse_args(argv)
+    return asyncio.run(migrate())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Comando para importar un catálogo de películas desde un archivo CSV o NDJSON.
+
+Después de cada bloque guarda la última fila procesada en un archivo de punto de control;
+con --resume la importación continúa desde esa fila. El punto de control se elimina al
+terminar la importación.
+
+Uso:
+    python -m app.commands.import_movies catalogo.csv [--format csv] [--chunk-size 1000]
+    python -m app.commands.import_movies catalogo.ndjson --resume
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from app.services.movie import import_movies_service
+from app.shared.movie_import import IMPORT_FORMATS, detect_format, read_rows
+
+
+def read_checkpoint(path: str) -> int:
+    """Última fila procesada según el punto de control, o 0 si no existe."""
+    if not os.path.exists(path):
+        return 0
+    with open(path, encoding="utf-8") as checkpoint:
+        return json.load(checkpoint)["last_row"]
+
+
+def write_checkpoint(path: str, last_row: int) -> None:
+    # Se escribe en un archivo temporal y se renombra para no dejar un punto de control a medias
+    with open(f"{path}.tmp", "w", encoding="utf-8") as checkpoint:
+        json.dump({"last_row": last_row}, checkpoint)
+    os.replace(f"{path}.tmp", path)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Importa películas desde un archivo CSV o NDJSON.")
+    parser.add_argument("path", help="Archivo a importar.")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="Formato del archivo; por defecto se deduce de la extensión.")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Filas por bloque (por defecto IMPORT_BATCH_SIZE).")
+    parser.add_argument("--checkpoint", help="Archivo del punto de control (por defecto <path>.checkpoint).")
+    parser.add_argument("--resume", action="store_true", help="Continúa desde el punto de control.")
+    args = parser.parse_args(argv)
+
+    file_format = args.format or detect_format(args.path)
+    if file_format is None:
+        parser.error("no se pudo deducir el formato del archivo; use --format.")
+    checkpoint_path = args.checkpoint or f"{args.path}.checkpoint"
+    start_row = read_checkpoint(checkpoint_path) if args.resume else 0
+    if start_row:
+        print(f"Reanudando desde la fila {start_row + 1}.")
+
+    started = time.perf_counter()
+
+    def on_chunk(last_row: int) -> None:
+        write_checkpoint(checkpoint_path, last_row)
+        elapsed = time.perf_counter() - started
+        print(f"  {last_row} filas procesadas ({(last_row - start_row) / max(elapsed, 1e-6):.0f} filas/s)")
+
+    with open(args.path, encoding="utf-8-sig", newline="") as stream:
+        result = asyncio.run(import_movies_service(
+            read_rows(stream, file_format),
+            start_row=start_row,
+            chunk_size=args.chunk_size,
+            on_chunk=on_chunk
+        ))
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    for error in result.errors:
+        print(f"[fila {error.row}] {'; '.join(error.errors)}")
+    if result.failed > len(result.errors):
+        print(f"... y {result.failed - len(result.errors)} filas más con errores.")
+    print(
+        f"Películas insertadas: {result.inserted}, con errores: {result.failed}, "
+        f"en {result.elapsed_seconds:.2f} s ({result.rows_per_second:.0f} filas/s)."
+    )
+    return 1 if result.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""
+Comando para crear o verificar los índices de MongoDB.
+
+Uso:
+    python -m app.commands.indexes          # Crea los índices del registro
+    python -m app.commands.indexes --check  # Reporta índices faltantes o sin uso
+"""
+import argparse
+import asyncio
+import sys
+from app.database.indexes import create_indexes, check_indexes
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Crea o verifica los índices de MongoDB.")
+    parser.add_argument("--check", action="store_true", help="Solo reporta índices faltantes o sin uso.")
+    args = parser.parse_args(argv)
+
+    if not args.check:
+        failed = asyncio.run(create_indexes())
+        for failure in failed:
+            print(f"[error] {failure}")
+        if failed:
+            return 1
+        print("Índices creados correctamente.")
+        return 0
+
+    report = asyncio.run(check_indexes())
+    for index in report["missing"]:
+        print(f"[faltante] {index['collection']}.{index['index']}")
+    for index in report["unused"]:
+        print(f"[sin uso] {index['collection']}.{index['index']} (desde {index['since']:%Y-%m-%d %H:%M})")
+    for index in report["unregistered"]:
+        print(f"[no registrado] {index['collection']}.{index['index']}")
+
+    if not any(report.values()):
+        print("Todos los índices del registro existen y están en uso.")
+    # Un código de salida distinto de cero permite usar el comando en CI
+    return 1 if report["missing"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
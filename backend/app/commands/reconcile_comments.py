@@ -0,0 +1,25 @@
+"""
+Comando para calcular el contador `comments_count` de las películas. Se ejecuta una vez
+para inicializarlo en las películas existentes y después para corregir desviaciones.
+
+Uso:
+    python -m app.commands.reconcile_comments [--chunk-size 500]
+"""
+import argparse
+import asyncio
+import sys
+from app.services.comment import reconcile_comments_count_service
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Recalcula el contador de comentarios de las películas.")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Número de películas procesadas por bloque.")
+    args = parser.parse_args(argv)
+
+    fixed = asyncio.run(reconcile_comments_count_service(args.chunk_size))
+    print(f"Contadores de comentarios corregidos: {fixed}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
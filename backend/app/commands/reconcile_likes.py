@@ -0,0 +1,24 @@
+"""
+Comando para corregir desviaciones en el contador `likes_count` de las películas.
+
+Uso:
+    python -m app.commands.reconcile_likes [--chunk-size 500]
+"""
+import argparse
+import asyncio
+import sys
+from app.services.like import reconcile_likes_count_service
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Recalcula el contador de likes de las películas.")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Número de películas procesadas por bloque.")
+    args = parser.parse_args(argv)
+
+    fixed = asyncio.run(reconcile_likes_count_service(args.chunk_size))
+    print(f"Contadores de likes corregidos: {fixed}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
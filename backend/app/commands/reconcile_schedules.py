@@ -0,0 +1,25 @@
+"""
+Comando para liberar los horarios de `theater_schedules` cuya reservación ya no existe.
+
+Uso:
+    python -m app.commands.reconcile_schedules [--chunk-size 500] [--grace-seconds 300]
+"""
+import argparse
+import asyncio
+import sys
+from app.services.theater_schedule import reconcile_schedules_service
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Libera los horarios de salas ocupados por reservaciones eliminadas.")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Número de documentos de horarios procesados por bloque.")
+    parser.add_argument("--grace-seconds", type=int, default=None, help="Antigüedad mínima de los horarios a liberar (por defecto SCHEDULE_RECONCILE_GRACE_SECONDS).")
+    args = parser.parse_args(argv)
+
+    released = asyncio.run(reconcile_schedules_service(args.chunk_size, args.grace_seconds))
+    print(f"Horarios liberados: {released}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
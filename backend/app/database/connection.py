@@ -1,6 +1,6 @@
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
 from app.shared.config import settings
 
-# Crear una conexión global a MongoDB
-client = MongoClient(settings.MONGO_URI)
+# Crear una conexión global asíncrona a MongoDB
+client = AsyncIOMotorClient(settings.MONGO_URI)
 db = client["movie_club"]  # Nombre de la base de datos
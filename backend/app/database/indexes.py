@@ -0,0 +1,114 @@
+from typing import Dict, List
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.database.connection import db
+
+# Registro de los índices de los que dependen los servicios, agrupados por colección.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "comments": [
+        # Comentarios de una película paginados del más reciente al más antiguo. Por su
+        # prefijo también sirve a get_movie_comments, al árbol de comentarios y a la carga
+        # de comentarios del listado de películas.
+        IndexModel(
+            [("movie_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="movie_id_1_created_at_-1__id_-1",
+        ),
+    ],
+    "likes": [
+        # get_movie_likes y la carga de likes del listado de películas
+        IndexModel([("movie_id", ASCENDING)], name="movie_id_1"),
+        # Un usuario solo puede dar un like por película (create_like_service)
+        IndexModel(
+            [("user_id", ASCENDING), ("movie_id", ASCENDING)],
+            name="user_id_1_movie_id_1_unique",
+            unique=True,
+        ),
+    ],
+    "reservations": [
+        # validate_theater_availability
+        IndexModel(
+            [("theater_id", ASCENDING), ("reservation_date", ASCENDING), ("start_time", ASCENDING)],
+            name="theater_id_1_reservation_date_1_start_time_1",
+        ),
+    ],
+    "theater_schedules": [
+        # Un documento de horarios por sala y día (claim_slot)
+        IndexModel(
+            [("theater_id", ASCENDING), ("date", ASCENDING)],
+            name="theater_id_1_date_1_unique",
+            unique=True,
+        ),
+    ],
+}
+
+
+# Índices reemplazados por otros del registro con las mismas claves. MongoDB no permite
+# dos índices con la misma especificación, por lo que se eliminan antes de crear el nuevo.
+REPLACED_INDEXES: Dict[str, List[str]] = {
+    # Reemplazado por user_id_1_movie_id_1_unique
+    "likes": ["user_id_1_movie_id_1"],
+}
+
+
+async def create_indexes(database: AsyncIOMotorDatabase = db) -> List[str]:
+    """
+    Crea todos los índices del registro. La operación es idempotente: MongoDB no hace
+    nada si el índice ya existe con la misma definición.
+
+    Cada índice se crea por separado y un fallo no detiene a los demás: un índice único
+    no se puede crear mientras haya documentos duplicados (ver
+    `python -m app.commands.dedupe_likes`).
+
+    Returns:
+        List[str]: Índices que no se pudieron crear, con el error de MongoDB.
+    """
+    for collection_name, names in REPLACED_INDEXES.items():
+        existing = await database[collection_name].index_information()
+        for name in names:
+            if name in existing:
+                await database[collection_name].drop_index(name)
+
+    failed = []
+    for collection_name, indexes in INDEXES.items():
+        for index in indexes:
+            try:
+                await database[collection_name].create_indexes([index])
+            except OperationFailure as e:
+                failed.append(f"{collection_name}.{index.document['name']}: {e}")
+    return failed
+
+
+async def check_indexes(database: AsyncIOMotorDatabase = db) -> Dict[str, List[dict]]:
+    """
+    Compara los índices del registro con los existentes en la base de datos.
+
+    Returns:
+        dict: Diccionario con tres listas:
+            - missing: Índices del registro que no existen en la base de datos.
+            - unused: Índices existentes que no se han usado desde el último reinicio del servidor.
+            - unregistered: Índices existentes que no están declarados en el registro.
+    """
+    report = {"missing": [], "unused": [], "unregistered": []}
+
+    for collection_name in sorted(set(INDEXES) | set(await database.list_collection_names())):
+        collection = database[collection_name]
+        existing = await collection.index_information()
+        registered = {index.document["name"] for index in INDEXES.get(collection_name, [])}
+
+        for name in sorted(registered - set(existing)):
+            report["missing"].append({"collection": collection_name, "index": name})
+
+        for name in sorted(set(existing) - registered - {"_id_"}):
+            report["unregistered"].append({"collection": collection_name, "index": name})
+
+        if existing:
+            async for stats in collection.aggregate([{"$indexStats": {}}]):
+                if stats["name"] != "_id_" and stats["accesses"]["ops"] == 0:
+                    report["unused"].append({
+                        "collection": collection_name,
+                        "index": stats["name"],
+                        "since": stats["accesses"]["since"],
+                    })
+
+    return report
@@ -1,13 +1,28 @@
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
-from app.routers import movie, reservation, theater, comment, like
+from app.routers import movie, reservation, theater, comment, like, metrics
 from app.routers.cognito import auth, mfa, password_recovery
 from app.shared.exceptions import BusinessLogicError
+from app.database.indexes import create_indexes
+from app.shared.middlewares.auth_middleware import AuthMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Crear los índices que usan los servicios antes de aceptar peticiones. Un índice que
+    # requiere una migración de datos no impide que la aplicación inicie.
+    for failure in await create_indexes():
+        logging.getLogger(__name__).warning("No se pudo crear el índice %s", failure)
+    yield
+
 
 app = FastAPI(
     title="Movie Club API",
     description="API para gestionar películas y reservas de salas en el Movie Club.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Registrar los routers
@@ -20,6 +35,10 @@ app.include_router(movie.router, prefix="/movie", tags=["Movie"])
 app.include_router(theater.router, prefix="/theater", tags=["Theater"])
 app.include_router(comment.router, prefix="/comment", tags=["Comment"])
 app.include_router(like.router, prefix="/like", tags=["Like"])
+app.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
+
+# Validar el access token solo en los endpoints declarados con @protected
+app.add_middleware(AuthMiddleware, routes=app.routes)
 
 @app.get("/", tags=["Root"])
 def read_root():
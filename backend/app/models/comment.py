@@ -1,6 +1,6 @@
 from datetime import datetime
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 class CommentDB(BaseModel):
     id: str = None
@@ -9,4 +9,10 @@ class CommentDB(BaseModel):
     parent_comment_id: Optional[str] = None
     comment_content: str
     created_at: datetime
-    updated_at: Optional[datetime] = None
\ No newline at end of file
+    updated_at: Optional[datetime] = None
+
+
+class CommentNodeDB(CommentDB):
+    replies_count: int = 0
+    replies: List["CommentNodeDB"] = []
+    replies_cursor: Optional[str] = None
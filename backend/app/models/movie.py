@@ -14,4 +14,31 @@ class MovieDB(BaseModel):
     comments: Optional[List[CommentDB]] = []
     likes: Optional[List[LikeDB]] = []
     likes_count: int = 0
-    
\ No newline at end of file
+    comments_count: int = 0
+
+
+class MovieSummaryDB(BaseModel):
+    id: str = None
+    title: str
+    overview: str
+    year: int
+    rating: float
+    category: str
+    duration: int
+    likes_count: int = 0
+    comments_count: int = 0
+
+
+class MovieImportErrorDB(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class MovieImportResultDB(BaseModel):
+    processed: int
+    inserted: int
+    failed: int
+    last_row: int
+    elapsed_seconds: float
+    rows_per_second: float
+    errors: List[MovieImportErrorDB] = []
@@ -19,3 +19,13 @@ class ReservationDB(BaseModel):
     
 
 
+
+
+class ReservationSuggestionDB(BaseModel):
+    theater_id: str
+    theater_name: str
+    start_time: str
+    end_time: str
+    gap_start_time: str
+    gap_end_time: str
+    leftover_minutes: int
@@ -1,3 +1,4 @@
+from typing import Dict, List
 from pydantic import BaseModel
 
 class TheaterDB(BaseModel):
@@ -7,3 +8,21 @@ class TheaterDB(BaseModel):
     projection: str
     screen_size:str
     description: str
+
+
+class TheaterAvailabilityDB(BaseModel):
+    theater_id: str
+    name: str
+    free_slots: List[Dict[str, str]]
+
+
+class CalendarDayDB(BaseModel):
+    date: str
+    occupancy: float
+    free_slots: List[Dict[str, str]]
+
+
+class TheaterCalendarDB(BaseModel):
+    theater_id: str
+    name: str
+    days: List[CalendarDayDB]
@@ -7,6 +7,7 @@ from ...services.cognito.auth import confirm_email_service
 from fastapi import APIRouter, HTTPException, Request
 from ...schemas.cognito.auth import LogoutResponse, LogoutResponseError
 from ...services.cognito.auth import logout_user_service
+from app.shared.exceptions import UNAVAILABLE_ERRORS, ServiceUnavailableError
 
 
 
@@ -30,6 +31,8 @@ async def register_user(user: User):
                 description=error_data["description"]
             ).dict()
         )
+    except UNAVAILABLE_ERRORS as e:
+        raise ServiceUnavailableError(e)
     except RuntimeError as e:
         raise HTTPException(
             status_code=500,
@@ -65,6 +68,8 @@ async def login(user: LoginRequest):
                 description=error_data["description"]
             ).dict()
         )
+    except UNAVAILABLE_ERRORS as e:
+        raise ServiceUnavailableError(e)
     except RuntimeError as e:
         raise HTTPException(
             status_code=500,
@@ -98,6 +103,8 @@ async def confirm_email(data: ConfirmEmail):
                 description=error_data["description"]
             ).dict()
         )
+    except UNAVAILABLE_ERRORS as e:
+        raise ServiceUnavailableError(e)
     except RuntimeError as e:
         raise HTTPException(
             status_code=500,
@@ -143,6 +150,8 @@ async def logout(request: Request):
                 description=error_data["description"]
             ).dict()
         )
+    except UNAVAILABLE_ERRORS as e:
+        raise ServiceUnavailableError(e)
     except RuntimeError as e:
         raise HTTPException(
             status_code=500,
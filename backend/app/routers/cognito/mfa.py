@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException
+from app.shared.exceptions import UNAVAILABLE_ERRORS, ServiceUnavailableError
 from ...schemas.cognito.mfa import VerifyTOTPRequest, VerifyTOTPResponse, VerifyTOTPResponseError
 from ...services.cognito.mfa import verify_totp_service
 from fastapi import APIRouter, HTTPException
@@ -37,6 +38,8 @@ async def verify_totp(request: VerifyTOTPRequest):
                 description=error_data["description"]
             ).dict()
         )
+    except UNAVAILABLE_ERRORS as e:
+        raise ServiceUnavailableError(e)
     except RuntimeError as e:
         raise HTTPException(
             status_code=500,
@@ -71,6 +74,8 @@ async def associate_totp(request: AssociateTOTPRequest):
                 description=error_data["description"]
             ).dict()
         )
+    except UNAVAILABLE_ERRORS as e:
+        raise ServiceUnavailableError(e)
     except RuntimeError as e:
         raise HTTPException(
             status_code=500,
@@ -109,6 +114,8 @@ async def respond_to_auth_challenge(request: RespondToChallengeRequest):
                 description=error_data["description"]
             ).dict()
         )
+    except UNAVAILABLE_ERRORS as e:
+        raise ServiceUnavailableError(e)
     except RuntimeError as e:
         raise HTTPException(
             status_code=500,
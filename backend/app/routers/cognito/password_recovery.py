@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException
+from app.shared.exceptions import UNAVAILABLE_ERRORS, ServiceUnavailableError
 from ...schemas.cognito.password_recovery import (
     ForgotPasswordRequest, ConfirmForgotPasswordRequest,
     ForgotPasswordResponse, ForgotPasswordResponseError,
@@ -36,6 +37,8 @@ async def forgot_password(request: ForgotPasswordRequest):
                 description=error_data["description"]
             ).dict()
         )
+    except UNAVAILABLE_ERRORS as e:
+        raise ServiceUnavailableError(e)
     except RuntimeError as e:
         raise HTTPException(
             status_code=500,
@@ -71,6 +74,8 @@ async def confirm_forgot_password(request: ConfirmForgotPasswordRequest):
                 description=error_data["description"]
             ).dict()
         )
+    except UNAVAILABLE_ERRORS as e:
+        raise ServiceUnavailableError(e)
     except RuntimeError as e:
         raise HTTPException(
             status_code=500,
@@ -1,43 +1,73 @@
-from fastapi import APIRouter, HTTPException
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
 from app.services.comment import (
     get_all_comments_service,
     get_comment_by_id_service,
     create_comment_service,
     update_comment_service,
-    delete_comment_service
+    delete_comment_service,
+    export_comments_service
 )
 from app.schemas.comment import CommentRequest, CommentUpdateRequest, CommentResponse
 from app.shared.utils import validate_object_id
+from app.shared.config import settings
+from app.shared.export import date_range_query, ndjson_response
 
 router = APIRouter()
 
 @router.get("/", response_model=CommentResponse)
-def get_comments():
+async def get_comments(
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
     """
-    Obtiene la lista de todos los comentarios.
+    Obtiene una página de la lista de comentarios.
 
     Parámetros:
-        - Ninguno.
+        - limit (int): Número máximo de comentarios por página (máximo `MAX_PAGE_SIZE`).
+        - cursor (str, opcional): Cursor `next_cursor` devuelto por la página anterior.
 
     Respuesta:
         - code: Código de estado de la operación (200 si es exitoso).
         - message: Mensaje indicando el resultado de la operación.
         - description: Descripción detallada del resultado.
         - data: Lista de comentarios obtenidos.
+        - next_cursor: Cursor para obtener la siguiente página (None si no hay más resultados).
     """
     try:
-        comments = get_all_comments_service()
+        comments, next_cursor = await get_all_comments_service(limit, cursor)
         return CommentResponse(
             code=200,
             message="Comentarios obtenidos con éxito.",
             description="Se obtuvo correctamente la lista de comentarios.",
-            data=comments
+            data=comments,
+            next_cursor=next_cursor
         )
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/export")
+async def export_comments(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to")
+):
+    """
+    Exporta los comentarios en formato NDJSON (un objeto JSON por línea).
+
+    Parámetros:
+        - from (str, opcional): Fecha de creación mínima en formato YYYY-MM-DD (incluida).
+        - to (str, opcional): Fecha de creación máxima en formato YYYY-MM-DD (incluida).
+
+    Respuesta:
+        - Archivo `application/x-ndjson` con los mismos campos que `data` en el listado.
+    """
+    query = date_range_query("created_at", date_from, date_to)
+    return ndjson_response(export_comments_service(query), "comments.ndjson")
+
+
 @router.get("/{comment_id}", response_model=CommentResponse)
-def get_comment(comment_id: str):
+async def get_comment(comment_id: str):
     """
     Obtiene un comentario específico por su ID.
 
@@ -52,7 +82,7 @@ def get_comment(comment_id: str):
     """
     try:
         validate_object_id(comment_id)
-        comment = get_comment_by_id_service(comment_id)
+        comment = await get_comment_by_id_service(comment_id)
         if not comment:
             raise HTTPException(
                 status_code=404,
@@ -79,7 +109,7 @@ def get_comment(comment_id: str):
         )
 
 @router.post("/", response_model=CommentResponse)
-def create_comment(comment: CommentRequest):
+async def create_comment(comment: CommentRequest):
     """
     Crea un nuevo comentario en la base de datos.
 
@@ -93,7 +123,8 @@ def create_comment(comment: CommentRequest):
         - data: Objeto con los datos del comentario creado.
     """
     try:
-        created_comment = create_comment_service(comment)
+        validate_object_id(comment.movie_id)
+        created_comment = await create_comment_service(comment)
         return CommentResponse(
             code=200,
             message="El comentario ha sido creado exitosamente.",
@@ -104,7 +135,7 @@ def create_comment(comment: CommentRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/{comment_id}", response_model=CommentResponse)
-def update_comment(comment_id: str, comment: CommentUpdateRequest):
+async def update_comment(comment_id: str, comment: CommentUpdateRequest):
     """
     Actualiza un comentario existente en la base de datos.
 
@@ -120,7 +151,7 @@ def update_comment(comment_id: str, comment: CommentUpdateRequest):
     """
     try:
         validate_object_id(comment_id)
-        updated_comment = update_comment_service(comment_id, comment)
+        updated_comment = await update_comment_service(comment_id, comment)
         return CommentResponse(
             code=200,
             message="El comentario ha sido actualizado exitosamente.",
@@ -139,7 +170,7 @@ def update_comment(comment_id: str, comment: CommentUpdateRequest):
         )
 
 @router.delete("/{comment_id}", response_model=CommentResponse)
-def delete_comment(comment_id: str):
+async def delete_comment(comment_id: str):
     """
     Elimina un comentario de la base de datos por su ID.
 
@@ -154,7 +185,7 @@ def delete_comment(comment_id: str):
     """
     try:
         validate_object_id(comment_id)
-        delete_comment_service(comment_id)
+        await delete_comment_service(comment_id)
         return CommentResponse(
             code=200,
             message="El comentario ha sido eliminado exitosamente.",
@@ -1,21 +1,24 @@
-from fastapi import APIRouter, HTTPException
+from datetime import date
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import JSONResponse
-from typing import List
+from typing import List, Optional
 from app.services.like import (
     get_movie_likes,
     get_like_by_id_service,
     create_like_service,
     delete_like_service,
-    delete_movie_likes_service
+    delete_movie_likes_service,
+    export_likes_service
 )
 from app.schemas.like import LikeRequest, LikeResponse
 from app.models.like import LikeDB
 from app.shared.utils import validate_object_id
+from app.shared.export import date_range_query, ndjson_response
 
 router = APIRouter()
 
 @router.get("/movie/{movie_id}", response_model=LikeResponse)
-def get_likes_by_movie(movie_id: str):
+async def get_likes_by_movie(movie_id: str):
     """
     Obtiene todos los likes asociados a una película específica.
 
@@ -30,7 +33,7 @@ def get_likes_by_movie(movie_id: str):
     """
     try:
         validate_object_id(movie_id)
-        likes = get_movie_likes(movie_id)
+        likes = await get_movie_likes(movie_id)
         return LikeResponse(
             code=200,
             message="Likes obtenidos con éxito.",
@@ -46,8 +49,27 @@ def get_likes_by_movie(movie_id: str):
             }
         )
 
+@router.get("/export")
+async def export_likes(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to")
+):
+    """
+    Exporta los likes en formato NDJSON (un objeto JSON por línea).
+
+    Parámetros:
+        - from (str, opcional): Fecha de creación mínima en formato YYYY-MM-DD (incluida).
+        - to (str, opcional): Fecha de creación máxima en formato YYYY-MM-DD (incluida).
+
+    Respuesta:
+        - Archivo `application/x-ndjson` con los mismos campos que `data` en el listado.
+    """
+    query = date_range_query("created_at", date_from, date_to)
+    return ndjson_response(export_likes_service(query), "likes.ndjson")
+
+
 @router.get("/{like_id}", response_model=LikeResponse)
-def get_like(like_id: str):
+async def get_like(like_id: str):
     """
     Obtiene un like específico por su ID.
 
@@ -62,7 +84,7 @@ def get_like(like_id: str):
     """
     try:
         validate_object_id(like_id)
-        like = get_like_by_id_service(like_id)
+        like = await get_like_by_id_service(like_id)
         if not like:
             raise HTTPException(
                 status_code=404,
@@ -89,7 +111,7 @@ def get_like(like_id: str):
         )
 
 @router.post("/", response_model=LikeResponse)
-def create_like(like: LikeRequest):
+async def create_like(like: LikeRequest):
     """
     Crea un nuevo like en la base de datos.
 
@@ -103,7 +125,7 @@ def create_like(like: LikeRequest):
         - data: Objeto con los datos del like creado.
     """
     try:
-        created_like = create_like_service(like)
+        created_like = await create_like_service(like)
         return LikeResponse(
             code=200,
             message="Like creado exitosamente.",
@@ -128,7 +150,7 @@ def create_like(like: LikeRequest):
         )
 
 @router.delete("/{like_id}", response_model=LikeResponse)
-def delete_like(like_id: str):
+async def delete_like(like_id: str):
     """
     Elimina un like de la base de datos por su ID.
 
@@ -143,7 +165,7 @@ def delete_like(like_id: str):
     """
     try:
         validate_object_id(like_id)
-        delete_like_service(like_id)
+        await delete_like_service(like_id)
         return LikeResponse(
             code=200,
             message="Like eliminado exitosamente.",
@@ -168,7 +190,7 @@ def delete_like(like_id: str):
         )
 
 @router.delete("/movie/{movie_id}", response_model=LikeResponse)
-def delete_movie_likes(movie_id: str):
+async def delete_movie_likes(movie_id: str):
     """
     Elimina todos los likes asociados a una película.
 
@@ -183,7 +205,7 @@ def delete_movie_likes(movie_id: str):
     """
     try:
         validate_object_id(movie_id)
-        delete_movie_likes_service(movie_id)
+        await delete_movie_likes_service(movie_id)
         return LikeResponse(
             code=200,
             message="Likes eliminados exitosamente.",
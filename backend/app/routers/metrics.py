@@ -0,0 +1,80 @@
+from fastapi import APIRouter
+from app.schemas.metrics import MetricsResponse
+from app.shared.availability import availability_cache
+from app.shared.cache import movie_cache, token_cache
+from app.shared.config import cognito_breaker
+from app.shared.executor import cognito_executor
+
+router = APIRouter()
+
+@router.get("/cache", response_model=MetricsResponse)
+async def get_cache_metrics():
+    """
+    Obtiene las métricas de las cachés en memoria del proceso.
+
+    Parámetros:
+        - Ninguno.
+
+    Respuesta:
+        - code: Código de estado de la operación (200 si es exitoso).
+        - message: Mensaje indicando el resultado de la operación.
+        - description: Descripción detallada del resultado.
+        - data: Tamaño, aciertos, fallos, desalojos y expiraciones de cada caché.
+    """
+    return MetricsResponse(
+        code=200,
+        message="Métricas obtenidas con éxito.",
+        description="Se obtuvieron correctamente las métricas de las cachés.",
+        data={
+            "movie_cache": movie_cache.stats(),
+            "token_cache": token_cache.stats(),
+            "availability_cache": availability_cache.stats(),
+        }
+    )
+
+@router.get("/executors", response_model=MetricsResponse)
+async def get_executor_metrics():
+    """
+    Obtiene las métricas de los pools de hilos usados para llamadas bloqueantes.
+
+    Parámetros:
+        - Ninguno.
+
+    Respuesta:
+        - code: Código de estado de la operación (200 si es exitoso).
+        - message: Mensaje indicando el resultado de la operación.
+        - description: Descripción detallada del resultado.
+        - data: Llamadas encoladas y en ejecución, completadas, fallidas, agotadas y rechazadas.
+    """
+    return MetricsResponse(
+        code=200,
+        message="Métricas obtenidas con éxito.",
+        description="Se obtuvieron correctamente las métricas de los executors.",
+        data={
+            "cognito": cognito_executor.stats(),
+        }
+    )
+
+
+@router.get("/circuit-breakers", response_model=MetricsResponse)
+async def get_circuit_breaker_metrics():
+    """
+    Obtiene el estado de los circuit breakers de los servicios externos.
+
+    Parámetros:
+        - Ninguno.
+
+    Respuesta:
+        - code: Código de estado de la operación (200 si es exitoso).
+        - message: Mensaje indicando el resultado de la operación.
+        - description: Descripción detallada del resultado.
+        - data: Estado, fallos consecutivos y llamadas rechazadas de cada circuit breaker.
+    """
+    return MetricsResponse(
+        code=200,
+        message="Métricas obtenidas con éxito.",
+        description="Se obtuvieron correctamente las métricas de los circuit breakers.",
+        data={
+            "cognito": cognito_breaker.stats(),
+        }
+    )
@@ -1,49 +1,67 @@
-from fastapi import APIRouter, HTTPException
+import io
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile
 from fastapi.responses import JSONResponse
-from typing import List
+from typing import Literal, Optional
 from app.services.movie import (
     get_all_movies_service, 
+    get_movies_summary_service,
     get_movie_by_id_service, 
     create_movie_service, 
     update_movie_service, 
     delete_movie_service,
-    get_movie_comments
+    import_movies_service,
+    get_movie_comments_page_service,
+    get_movie_comment_tree_service
 )
 from app.schemas.movie import MovieRequest, MovieResponse
+from app.schemas.comment import CommentResponse
 from app.models.movie import MovieDB
-from app.models.comment import CommentDB
 from app.shared.utils import validate_object_id
+from app.shared.config import settings
+from app.shared.movie_import import IMPORT_FORMATS, detect_format, read_rows
 
 router = APIRouter()
 
 @router.get("/", response_model=MovieResponse)
-def get_movies():
+async def get_movies(
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    view: Literal["full", "summary"] = "full"
+):
     """
-    Obtiene la lista de todas las películas.
+    Obtiene una página de la lista de películas.
 
     Parámetros:
-        - Ninguno.
+        - limit (int): Número máximo de películas por página (máximo `MAX_PAGE_SIZE`).
+        - cursor (str, opcional): Cursor `next_cursor` devuelto por la página anterior.
+        - view (str): `full` incluye los comentarios y likes de cada película; `summary`
+          devuelve solo los campos del catálogo con `likes_count` y `comments_count`.
 
     Respuesta:
         - code: Código de estado de la operación (200 si es exitoso).
         - message: Mensaje indicando el resultado de la operación.
         - description: Descripción detallada del resultado.
         - data: Lista de películas obtenidas.
+        - next_cursor: Cursor para obtener la siguiente página (None si no hay más resultados).
     """
     try:
-        movies = get_all_movies_service()
+        if view == "summary":
+            movies, next_cursor = await get_movies_summary_service(limit, cursor)
+        else:
+            movies, next_cursor = await get_all_movies_service(limit, cursor)
         return MovieResponse(
             code=200,
             message="Películas obtenidas con éxito.",
             description="Se obtuvo correctamente la lista de películas.",
-            data=movies
+            data=movies,
+            next_cursor=next_cursor
         )
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/{movie_id}", response_model=MovieResponse)
-def get_movie(movie_id: str):
+async def get_movie(movie_id: str):
     """
     Obtiene una película específica por su ID.
 
@@ -58,7 +76,7 @@ def get_movie(movie_id: str):
     """
     try:
         validate_object_id(movie_id)  # Validar que el ID sea un ObjectId válido
-        movie = get_movie_by_id_service(movie_id)
+        movie = await get_movie_by_id_service(movie_id)
         if not movie:
             raise HTTPException(
                 status_code=404,
@@ -94,7 +112,7 @@ def get_movie(movie_id: str):
 
 
 @router.post("/", response_model=MovieResponse)
-def create_movie(movie: MovieRequest):
+async def create_movie(movie: MovieRequest):
     """
     Crea una nueva película en la base de datos.
 
@@ -108,7 +126,7 @@ def create_movie(movie: MovieRequest):
         - data: Objeto con los datos de la película creada.
     """
     try:
-        created_movie = create_movie_service(movie)
+        created_movie = await create_movie_service(movie)
         return MovieResponse(
             code=200,
             message="La película ha sido creada exitosamente.",
@@ -119,8 +137,71 @@ def create_movie(movie: MovieRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/import", response_model=MovieResponse)
+async def import_movies(
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "ndjson"]] = None,
+    start_row: int = Query(0, ge=0)
+):
+    """
+    Importa un catálogo de películas desde un archivo CSV o NDJSON.
+
+    Las filas se validan y guardan por bloques de `IMPORT_BATCH_SIZE`. Las filas inválidas
+    se reportan y no detienen la importación.
+
+    Parámetros:
+        - file (archivo): CSV con encabezado o NDJSON con un objeto por línea, con los campos
+          de `MovieRequest`.
+        - format (str, opcional): `csv` o `ndjson`; por defecto se deduce de la extensión.
+        - start_row (int): Filas a omitir para reanudar una importación (`last_row` de la
+          respuesta anterior).
+
+    Respuesta:
+        - code: Código de estado de la operación (200 si es exitoso).
+        - message: Mensaje indicando el resultado de la operación.
+        - description: Descripción detallada del resultado.
+        - data: Filas procesadas, insertadas y con error, `last_row`, filas por segundo y
+          errores por fila.
+    """
+    file_format = format or detect_format(file.filename)
+    if file_format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": "Formato de archivo no soportado.",
+                "description": "El archivo debe ser CSV o NDJSON; indique el parámetro format si la extensión no es .csv ni .ndjson."
+            }
+        )
+
+    try:
+        stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+        result = await import_movies_service(read_rows(stream, file_format), start_row=start_row)
+        return MovieResponse(
+            code=200,
+            message="Importación de películas completada.",
+            description=f"Se importaron {result.inserted} de {result.processed} películas.",
+            data=result
+        )
+    except UnicodeDecodeError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": "El archivo no está codificado en UTF-8.",
+                "description": str(e)
+            }
+        )
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "message": "Error en la base de datos.",
+                "description": str(e)
+            }
+        )
+
+
 @router.put("/{movie_id}", response_model=MovieResponse)
-def update_movie(movie_id: str, movie: MovieRequest):
+async def update_movie(movie_id: str, movie: MovieRequest):
     """
     Actualiza una película existente en la base de datos.
 
@@ -132,11 +213,12 @@ def update_movie(movie_id: str, movie: MovieRequest):
         - code: Código de estado de la operación (200 si es exitoso).
         - message: Mensaje indicando el resultado de la operación.
         - description: Descripción detallada del resultado.
-        - data: Objeto con los datos de la película actualizada.
+        - data: Datos de la película actualizada con `likes_count` y `comments_count`, sin
+          las listas de comentarios y likes.
     """
     try:
         validate_object_id(movie_id)
-        updated_movie = update_movie_service(movie_id, movie)
+        updated_movie = await update_movie_service(movie_id, movie)
         return MovieResponse(
             code=200,
             message="La película ha sido actualizada exitosamente.",
@@ -164,7 +246,7 @@ def update_movie(movie_id: str, movie: MovieRequest):
 
 
 @router.delete("/{movie_id}", response_model=MovieResponse)
-def delete_movie(movie_id: str):
+async def delete_movie(movie_id: str):
     """
     Elimina una película de la base de datos por su ID.
 
@@ -179,7 +261,7 @@ def delete_movie(movie_id: str):
     """
     try:
         validate_object_id(movie_id)
-        delete_movie_service(movie_id)
+        await delete_movie_service(movie_id)
         return MovieResponse(
             code=200,
             message="La película ha sido eliminada exitosamente.",
@@ -205,22 +287,92 @@ def delete_movie(movie_id: str):
             }
         )
 
-@router.get("/{movie_id}/comments", response_model=List[CommentDB])
-def get_movie_comments_route(movie_id: str):
+@router.get("/{movie_id}/comments", response_model=CommentResponse)
+async def get_movie_comments_route(
+    movie_id: str,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
     """
-    Obtiene todos los comentarios de una película específica.
+    Obtiene una página de los comentarios de una película, del más reciente al más antiguo.
 
     Parámetros:
         - movie_id (str): ID de la película.
+        - limit (int): Número máximo de comentarios por página (máximo `MAX_PAGE_SIZE`).
+        - cursor (str, opcional): Cursor `next_cursor` devuelto por la página anterior.
 
     Respuesta:
-        - Lista de comentarios asociados a la película.
+        - code: Código de estado de la operación (200 si es exitoso).
+        - message: Mensaje indicando el resultado de la operación.
+        - description: Descripción detallada del resultado.
+        - data: Lista de comentarios de la página.
+        - next_cursor: Cursor para obtener la siguiente página (None si no hay más resultados).
     """
     try:
         validate_object_id(movie_id)
-        # Verificar que la película existe
-        movie = get_movie_by_id_service(movie_id)
-        if not movie:
+        page = await get_movie_comments_page_service(movie_id, limit, cursor)
+        if page is None:
+            raise HTTPException(
+                status_code=404,
+                detail={
+                    "message": "Película no encontrada.",
+                    "description": "No se encontró una película con el ID proporcionado."
+                }
+            )
+        comments, next_cursor = page
+        return CommentResponse(
+            code=200,
+            message="Comentarios obtenidos con éxito.",
+            description="Se obtuvo correctamente la lista de comentarios de la película.",
+            data=comments,
+            next_cursor=next_cursor
+        )
+    except HTTPException:
+        raise
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "message": "Error en la base de datos.",
+                "description": str(e)
+            }
+        )
+
+
+@router.get("/{movie_id}/comments/tree", response_model=CommentResponse)
+async def get_movie_comment_tree(
+    movie_id: str,
+    parent_id: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    depth: int = Query(settings.COMMENT_TREE_DEPTH, ge=1, le=settings.MAX_COMMENT_TREE_DEPTH),
+    replies_limit: int = Query(settings.DEFAULT_REPLIES_PAGE_SIZE, ge=0, le=settings.MAX_PAGE_SIZE)
+):
+    """
+    Obtiene los comentarios de una película como árbol de respuestas anidadas.
+
+    Parámetros:
+        - movie_id (str): ID de la película.
+        - parent_id (str, opcional): Devuelve las respuestas de este comentario en lugar de
+          los comentarios de primer nivel.
+        - limit (int): Número máximo de comentarios del primer nivel devuelto.
+        - cursor (str, opcional): Cursor `next_cursor` de la página anterior, o
+          `replies_cursor` de un comentario junto con su ID en `parent_id`.
+        - depth (int): Niveles del árbol incluidos (1 = sin respuestas anidadas).
+        - replies_limit (int): Número máximo de respuestas anidadas por comentario (0 solo
+          devuelve `replies_count`).
+
+    Respuesta:
+        - code: Código de estado de la operación (200 si es exitoso).
+        - message: Mensaje indicando el resultado de la operación.
+        - description: Descripción detallada del resultado.
+        - data: Comentarios con `replies`, `replies_count` y `replies_cursor`.
+        - next_cursor: Cursor para obtener la siguiente página del primer nivel.
+    """
+    try:
+        validate_object_id(movie_id)
+        tree = await get_movie_comment_tree_service(movie_id, parent_id, limit, cursor, depth, replies_limit)
+        if tree is None:
             raise HTTPException(
                 status_code=404,
                 detail={
@@ -228,16 +380,21 @@ def get_movie_comments_route(movie_id: str):
                     "description": "No se encontró una película con el ID proporcionado."
                 }
             )
-        
-        comments = get_movie_comments(movie_id)
-        return comments
+        comments, next_cursor = tree
+        return CommentResponse(
+            code=200,
+            message="Comentarios obtenidos con éxito.",
+            description="Se obtuvo correctamente el árbol de comentarios de la película.",
+            data=comments,
+            next_cursor=next_cursor
+        )
     except HTTPException:
         raise
-    except Exception as e:
+    except RuntimeError as e:
         raise HTTPException(
             status_code=500,
             detail={
-                "message": "Error inesperado en el servidor.",
+                "message": "Error en la base de datos.",
                 "description": str(e)
             }
-        )
\ No newline at end of file
+        )
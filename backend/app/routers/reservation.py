@@ -1,41 +1,112 @@
-from typing import Annotated
-from fastapi import APIRouter, Request, Depends, HTTPException
-from app.schemas.reservation import ReservationRequest, ReservationResponse
-from app.services.reservation import create_reservation_service,get_all_reservations_service,get_reservation_by_id_service,delete_reservation_service,update_reservation_service
+from datetime import date, datetime
+from typing import Annotated, Optional
+from fastapi import APIRouter, Request, Depends, HTTPException, Query
+from app.schemas.reservation import ReservationBatchRequest, ReservationRequest, ReservationResponse
+from app.services.reservation import create_reservation_service,create_reservations_batch_service,export_reservations_service,suggest_reservation_times_service,get_all_reservations_service,get_reservation_by_id_service,delete_reservation_service,update_reservation_service
 from app.shared.utils import decode_token, validate_object_id, validate_reservation_time, validate_theater_availability,validate_movie_duration
 from app.shared.exceptions import BusinessLogicError
-from app.shared.cognito_utils import get_user_from_token
+from app.shared.middlewares.auth_middleware import protected
+from app.shared.config import settings
+from app.shared.export import date_range_query, ndjson_response
 
 router = APIRouter()
 
 @router.get("/", response_model=ReservationResponse)
-def get_reservations():
+async def get_reservations(
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
     """
-    Obtiene la lista de todas las reservaciones.
+    Obtiene una página de la lista de reservaciones.
 
     Parámetros:
-        - Ninguno.
+        - limit (int): Número máximo de reservaciones por página (máximo `MAX_PAGE_SIZE`).
+        - cursor (str, opcional): Cursor `next_cursor` devuelto por la página anterior.
 
     Respuesta:
         - code: Código de estado de la operación (200 si es exitoso).
         - message: Mensaje indicando el resultado de la operación.
         - description: Descripción detallada del resultado.
         - data: Lista de reservaciones obtenidas.
+        - next_cursor: Cursor para obtener la siguiente página (None si no hay más resultados).
     """
     try:
-        reservations = get_all_reservations_service()
+        reservations, next_cursor = await get_all_reservations_service(limit, cursor)
         return ReservationResponse(
             code=200,
             message="Reservaciones obtenidas con éxito.",
             description="Se obtuvo correctamente la lista de reservaciones.",
-            data=reservations
+            data=reservations,
+            next_cursor=next_cursor
         )
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/suggest", response_model=ReservationResponse)
+async def suggest_reservation_times(
+    movie_id: str,
+    reservation_date: date = Query(..., alias="date"),
+    limit: int = Query(settings.DEFAULT_SUGGESTIONS, ge=1, le=settings.MAX_SUGGESTIONS)
+):
+    """
+    Propone horarios para reservar una película en una fecha, en cualquier sala.
+
+    Parámetros:
+        - movie_id (str): ID de la película a proyectar.
+        - date (str): Fecha de la reservación en formato YYYY-MM-DD.
+        - limit (int, opcional): Número máximo de horarios propuestos (máximo `MAX_SUGGESTIONS`).
+
+    Respuesta:
+        - code: Código de estado de la operación (200 si es exitoso).
+        - message: Mensaje indicando el resultado de la operación.
+        - description: Descripción detallada del resultado.
+        - data: Horarios propuestos, primero los que mejor se ajustan a un espacio libre
+          (menos minutos sobrantes en `leftover_minutes`).
+    """
+    try:
+        validate_object_id(movie_id)
+        suggestions = await suggest_reservation_times_service(
+            movie_id, datetime.combine(reservation_date, datetime.min.time()), limit
+        )
+        return ReservationResponse(
+            code=200,
+            message="Horarios propuestos obtenidos con éxito.",
+            description="Se obtuvieron correctamente los horarios disponibles para la película.",
+            data=suggestions
+        )
+    except ValueError as e:
+        error_data = e.args[0]
+        raise BusinessLogicError(
+            message=error_data["message"],
+            description=error_data["description"],
+            data=error_data["data"]
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/export")
+async def export_reservations(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to")
+):
+    """
+    Exporta las reservaciones en formato NDJSON (un objeto JSON por línea).
+
+    Parámetros:
+        - from (str, opcional): Fecha de la reservación mínima en formato YYYY-MM-DD (incluida).
+        - to (str, opcional): Fecha de la reservación máxima en formato YYYY-MM-DD (incluida).
+
+    Respuesta:
+        - Archivo `application/x-ndjson` con los mismos campos que `data` en el listado.
+    """
+    query = date_range_query("reservation_date", date_from, date_to)
+    return ndjson_response(export_reservations_service(query), "reservations.ndjson")
+
+
 @router.get("/{reservation_id}", response_model=ReservationResponse)
-def get_reservation(reservation_id: str):
+async def get_reservation(reservation_id: str):
     """
     Obtiene una reservación específica por su ID.
 
@@ -50,7 +121,7 @@ def get_reservation(reservation_id: str):
     """
     try:
         validate_object_id(reservation_id)
-        reservation = get_reservation_by_id_service(reservation_id)
+        reservation = await get_reservation_by_id_service(reservation_id)
         if not reservation:
             raise HTTPException(
                 status_code=404,
@@ -85,15 +156,52 @@ def get_reservation(reservation_id: str):
         )
 
 
+@router.post("/batch", response_model=ReservationResponse)
+@protected()
+async def create_reservations_batch(request: Request, batch: ReservationBatchRequest):
+    """
+    Crea un lote de reservaciones. Se guardan todas o ninguna.
+
+    Parámetros:
+        - batch (ReservationBatchRequest): Lista de reservaciones a crear (máximo `MAX_BATCH_SIZE`).
+        - Authorization: Header `Bearer <access token>` de Cognito, validado por `AuthMiddleware`.
+
+    Respuesta:
+        - code: Código de estado de la operación (200 si es exitoso).
+        - message: Mensaje indicando el resultado de la operación.
+        - description: Descripción detallada del resultado.
+        - data: Lista de reservaciones creadas, en el orden del lote. Si alguna no es válida
+          se responde 400 y `data` contiene un error por reservación con su posición (`index`).
+    """
+    try:
+        created_reservations = await create_reservations_batch_service(batch.reservations, request.state.user)
+        return ReservationResponse(
+            code=200,
+            message="Las reservaciones han sido creadas exitosamente.",
+            description=f"Se añadieron {len(created_reservations)} reservaciones a la base de datos.",
+            data=created_reservations,
+        )
+    except ValueError as e:
+        error_data = e.args[0]
+        raise BusinessLogicError(
+            message=error_data["message"],
+            description=error_data["description"],
+            data=error_data["data"]
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/{accessToken}", response_model=ReservationResponse)
-def create_reservation(
-    reservation: ReservationRequest, accessToken:str):
-# def create_reservation(request: Request,reservation: ReservationRequest):  access_token: str = Query(..., description="Access Token de Cognito")
+@protected(token_param="accessToken")
+async def create_reservation(
+    request: Request, reservation: ReservationRequest, accessToken:str):
     """
     Crea una nueva reservación en la base de datos.
 
     Parámetros:
         - reservation (ReservationRequest): Objeto con los datos de la reservación a crear.
+        - accessToken (str): Access Token de Cognito, validado por `AuthMiddleware`.
 
     Respuesta:
         - code: Código de estado de la operación (200 si es exitoso).
@@ -103,24 +211,24 @@ def create_reservation(
     """
     try:
         # Obtener el usuario autenticado del middleware
-        user_id = get_user_from_token(accessToken)
+        user_id = request.state.user
 
         if not user_id:
             raise HTTPException(status_code=401, detail="No se pudo extraer el ID del usuario autenticado.")
         
         validate_reservation_time(reservation.start_time, reservation.end_time)
-        validate_theater_availability(
+        await validate_theater_availability(
             reservation.theater_id,
             reservation.reservation_date,
             reservation.start_time,
             reservation.end_time
         )
-        validate_movie_duration(
+        await validate_movie_duration(
             reservation.movie_id,
             reservation.start_time,
             reservation.end_time
         )
-        created_reservation = create_reservation_service(reservation, user_id)
+        created_reservation = await create_reservation_service(reservation, user_id)
 
         return ReservationResponse(
             code=200,
@@ -140,7 +248,7 @@ def create_reservation(
 
 
 @router.put("/{reservation_id}", response_model=ReservationResponse)
-def update_reservation(reservation_id: str, reservation: ReservationRequest):
+async def update_reservation(reservation_id: str, reservation: ReservationRequest):
     """
     Actualiza una reservación existente en la base de datos.
 
@@ -156,7 +264,15 @@ def update_reservation(reservation_id: str, reservation: ReservationRequest):
     """
     try:
         validate_object_id(reservation_id)
-        updated_reservation = update_reservation_service(reservation_id, reservation)
+        updated_reservation = await update_reservation_service(reservation_id, reservation)
+        if not updated_reservation:
+            raise HTTPException(
+                status_code=404,
+                detail={
+                    "message": "Reservación no encontrada.",
+                    "description": "No se encontró una reservación con el ID proporcionado."
+                }
+            )
         return ReservationResponse(
             code=200,
             message="La reservación ha sido actualizada exitosamente.",
@@ -165,6 +281,22 @@ def update_reservation(reservation_id: str, reservation: ReservationRequest):
         )
     except HTTPException:
         raise
+    except ValueError as e:
+        error_data = e.args[0]
+        if not isinstance(error_data, dict):
+            raise HTTPException(
+                status_code=500,
+                detail={
+                    "message": "Error inesperado en el servidor.",
+                    "description": str(e)
+                }
+            )
+        # El nuevo horario ya está ocupado
+        raise BusinessLogicError(
+            message=error_data["message"],
+            description=error_data["description"],
+            data=error_data["data"]
+        )
     except RuntimeError as e:
         raise HTTPException(
             status_code=500,
@@ -184,7 +316,7 @@ def update_reservation(reservation_id: str, reservation: ReservationRequest):
 
 
 @router.delete("/{reservation_id}", response_model=ReservationResponse)
-def delete_reservation(reservation_id: str):
+async def delete_reservation(reservation_id: str):
     """
     Elimina una reservación de la base de datos por su ID.
 
@@ -199,7 +331,7 @@ def delete_reservation(reservation_id: str):
     """
     try:
         validate_object_id(reservation_id)
-        delete_reservation_service(reservation_id)
+        await delete_reservation_service(reservation_id)
         return ReservationResponse(
             code=200,
             message="La reservación ha sido eliminada exitosamente.",
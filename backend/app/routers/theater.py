@@ -1,38 +1,139 @@
-from fastapi import APIRouter, HTTPException
-from app.services.theater import get_all_theaters_service, get_theater_by_id_service, create_theater_service, update_theater_service, delete_theater_service
+from datetime import date, datetime
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from app.services.theater import get_all_theaters_service, get_theater_by_id_service, create_theater_service, update_theater_service, delete_theater_service, get_theaters_availability_service, get_theaters_calendar_service
 from app.schemas.theater import TheaterRequest, TheaterResponse
 from app.shared.utils import validate_object_id
+from app.shared.config import settings
 
 router = APIRouter()
 
 @router.get("/", response_model=TheaterResponse)
-def get_theaters():
+async def get_theaters(
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
     """
-    Obtiene la lista de todas las salas de proyección.
+    Obtiene una página de la lista de salas de proyección.
 
     Parámetros:
-        - Ninguno.
+        - limit (int): Número máximo de salas de proyección por página (máximo `MAX_PAGE_SIZE`).
+        - cursor (str, opcional): Cursor `next_cursor` devuelto por la página anterior.
 
     Respuesta:
         - code: Código de estado de la operación (200 si es exitoso).
         - message: Mensaje indicando el resultado de la operación.
         - description: Descripción detallada del resultado.
         - data: Lista de salas de proyección obtenidas.
+        - next_cursor: Cursor para obtener la siguiente página (None si no hay más resultados).
     """
     try:
-        theaters = get_all_theaters_service()
+        theaters, next_cursor = await get_all_theaters_service(limit, cursor)
         return TheaterResponse(
             code=200,
             message="Salas de proyección obtenidas con éxito.",
             description="Se obtuvo correctamente la lista de salas de proyección.",
-            data=theaters
+            data=theaters,
+            next_cursor=next_cursor
         )
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/availability", response_model=TheaterResponse)
+async def get_theaters_availability(
+    reservation_date: date = Query(..., alias="date"),
+    min_duration: int = Query(0, ge=0),
+    movie_id: Optional[str] = None
+):
+    """
+    Obtiene los horarios libres de todas las salas de proyección en una fecha.
+
+    Parámetros:
+        - date (str): Fecha a consultar en formato YYYY-MM-DD.
+        - min_duration (int, opcional): Duración mínima en minutos de los horarios libres.
+        - movie_id (str, opcional): ID de una película; solo se devuelven horarios en los que cabe completa.
+
+    Respuesta:
+        - code: Código de estado de la operación (200 si es exitoso).
+        - message: Mensaje indicando el resultado de la operación.
+        - description: Descripción detallada del resultado.
+        - data: Lista de salas con sus horarios libres. Las salas sin horarios libres no se incluyen.
+    """
+    try:
+        if movie_id is not None:
+            validate_object_id(movie_id)
+        availability = await get_theaters_availability_service(
+            datetime.combine(reservation_date, datetime.min.time()), min_duration, movie_id
+        )
+        return TheaterResponse(
+            code=200,
+            message="Disponibilidad obtenida con éxito.",
+            description="Se obtuvieron correctamente los horarios libres de las salas de proyección.",
+            data=availability
+        )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "message": "Película no encontrada.",
+                "description": str(e)
+            }
+        )
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "message": "Error en la base de datos.",
+                "description": str(e)
+            }
+        )
+
+
+@router.get("/calendar", response_model=TheaterResponse)
+async def get_theaters_calendar(
+    start_date: date,
+    days: int = Query(30, ge=1, le=settings.MAX_CALENDAR_DAYS),
+    min_duration: int = Query(0, ge=0)
+):
+    """
+    Obtiene el calendario de disponibilidad de todas las salas de proyección.
+
+    Parámetros:
+        - start_date (str): Primer día del calendario en formato YYYY-MM-DD.
+        - days (int, opcional): Número de días del calendario (30 por defecto, máximo `MAX_CALENDAR_DAYS`).
+        - min_duration (int, opcional): Duración mínima en minutos de los horarios libres.
+
+    Respuesta:
+        - code: Código de estado de la operación (200 si es exitoso).
+        - message: Mensaje indicando el resultado de la operación.
+        - description: Descripción detallada del resultado.
+        - data: Lista de salas con su porcentaje de ocupación y horarios libres por día.
+    """
+    try:
+        calendar = await get_theaters_calendar_service(
+            datetime.combine(start_date, datetime.min.time()), days, min_duration
+        )
+        return TheaterResponse(
+            code=200,
+            message="Calendario obtenido con éxito.",
+            description="Se obtuvo correctamente el calendario de disponibilidad de las salas de proyección.",
+            data=calendar
+        )
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "message": "Error en la base de datos.",
+                "description": str(e)
+            }
+        )
+
+
 @router.get("/{theater_id}", response_model=TheaterResponse)
-def get_theater(theater_id: str):
+async def get_theater(theater_id: str):
     """
     Obtiene una sala de proyección específica por su ID.
 
@@ -47,7 +148,7 @@ def get_theater(theater_id: str):
     """
     try:
         validate_object_id(theater_id)
-        theater = get_theater_by_id_service(theater_id)
+        theater = await get_theater_by_id_service(theater_id)
         if not theater:
             raise HTTPException(
                 status_code=404,
@@ -83,7 +184,7 @@ def get_theater(theater_id: str):
 
 
 @router.post("/", response_model=TheaterResponse)
-def create_theater(theater: TheaterRequest):
+async def create_theater(theater: TheaterRequest):
     """
     Crea una nueva sala de proyección en la base de datos.
 
@@ -97,7 +198,7 @@ def create_theater(theater: TheaterRequest):
         - data: Objeto con los datos de la sala de proyección creada.
     """
     try:
-        created_theater = create_theater_service(theater)
+        created_theater = await create_theater_service(theater)
         return TheaterResponse(
             code=200,
             message="La sala de proyección ha sido creada exitosamente.",
@@ -109,7 +210,7 @@ def create_theater(theater: TheaterRequest):
 
 
 @router.put("/{theater_id}", response_model=TheaterResponse)
-def update_theater(theater_id: str, theater: TheaterRequest):
+async def update_theater(theater_id: str, theater: TheaterRequest):
     """
     Actualiza una sala de proyección existente en la base de datos.
 
@@ -125,7 +226,7 @@ def update_theater(theater_id: str, theater: TheaterRequest):
     """
     try:
         validate_object_id(theater_id)
-        updated_theater = update_theater_service(theater_id, theater)
+        updated_theater = await update_theater_service(theater_id, theater)
         return TheaterResponse(
             code=200,
             message="La sala de proyección ha sido actualizada exitosamente.",
@@ -153,7 +254,7 @@ def update_theater(theater_id: str, theater: TheaterRequest):
 
 
 @router.delete("/{theater_id}", response_model=TheaterResponse)
-def delete_theater(theater_id: str):
+async def delete_theater(theater_id: str):
     """
     Elimina una sala de proyección de la base de datos por su ID.
 
@@ -168,7 +269,7 @@ def delete_theater(theater_id: str):
     """
     try:
         validate_object_id(theater_id)
-        delete_theater_service(theater_id)
+        await delete_theater_service(theater_id)
         return TheaterResponse(
             code=200,
             message="La sala de proyección ha sido eliminada exitosamente.",
@@ -1,7 +1,7 @@
 from datetime import datetime
 from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Union
-from app.models.comment import CommentDB
+from app.models.comment import CommentDB, CommentNodeDB
 
 # Esquema para crear un comentario
 class CommentRequest(BaseModel):
@@ -38,4 +38,5 @@ class CommentResponse(BaseModel):
     code: int
     message: str
     description: str
-    data: Optional[Union[CommentDB, Dict, List[CommentDB]]] = None
+    data: Optional[Union[CommentDB, Dict, List[CommentNodeDB], List[CommentDB]]] = None
+    next_cursor: Optional[str] = None
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+from typing import Dict, Optional
+
+
+class MetricsResponse(BaseModel):
+    code: int
+    message: str
+    description: str
+    data: Optional[Dict] = None
@@ -1,7 +1,7 @@
 from datetime import datetime
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import List, Optional, Dict, Union
-from app.models.movie import MovieDB
+from app.models.movie import MovieDB, MovieImportResultDB, MovieSummaryDB
 from app.models.comment import CommentDB
 
 class MovieRequest(BaseModel):
@@ -36,4 +36,5 @@ class MovieResponse(BaseModel):
     code: int
     message: str
     description: str
-    data: Optional[Union[MovieDB, Dict, List[MovieDB]]] = None
\ No newline at end of file
+    data: Optional[Union[MovieDB, MovieSummaryDB, Dict, List[MovieDB], List[MovieSummaryDB], MovieImportResultDB]] = None
+    next_cursor: Optional[str] = None
\ No newline at end of file
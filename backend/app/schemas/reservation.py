@@ -3,8 +3,9 @@ from pydantic import BaseModel, ConfigDict, Field, field_validator, validator
 from collections import OrderedDict
 from typing import List, Optional, Dict, Union
 from datetime import datetime
-from app.models.reservation import ReservationDB
+from app.models.reservation import ReservationDB, ReservationSuggestionDB
 from app.shared.utils import validate_object_id
+from app.shared.config import settings
 
 
 class ReservationRequest(BaseModel):
@@ -56,11 +57,16 @@ class ReservationRequest(BaseModel):
         }
     )
 
+class ReservationBatchRequest(BaseModel):
+    reservations: List[ReservationRequest] = Field(min_length=1, max_length=settings.MAX_BATCH_SIZE)
+
+
 class ReservationResponse(BaseModel):
     code: int
     message: str
     description: str
-    data: Optional[Union[ReservationDB, Dict, List[ReservationDB]]] = None
+    data: Optional[Union[ReservationDB, Dict, List[ReservationDB], List[ReservationSuggestionDB]]] = None
+    next_cursor: Optional[str] = None
 
     class Config:
         arbitrary_types_allowed = True
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import List, Optional, Dict, Union
-from app.models.theater import TheaterDB
+from app.models.theater import TheaterAvailabilityDB, TheaterCalendarDB, TheaterDB
 
 
 class TheaterRequest(BaseModel):
@@ -28,5 +28,6 @@ class TheaterResponse(BaseModel):
     code: int
     message: str
     description: str
-    data: Optional[Union[TheaterDB, Dict, List[TheaterDB]]] = None
+    data: Optional[Union[TheaterDB, Dict, List[TheaterDB], List[TheaterAvailabilityDB], List[TheaterCalendarDB]]] = None
+    next_cursor: Optional[str] = None
 
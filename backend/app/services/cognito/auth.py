@@ -2,6 +2,7 @@ from ...schemas.cognito.auth import RegisterResponse, User
 from botocore.exceptions import ClientError
 from app.shared.utils import generate_secret_hash
 from app.shared.config import USER_POOL_ID, CLIENT_ID, client, CLIENT_SECRET
+from app.shared.executor import cognito_executor
 from ...schemas.cognito.auth import LoginRequest, LoginResponse
 from ...schemas.cognito.auth import ConfirmEmail, ConfirmEmailResponse
 from ...schemas.cognito.auth import LogoutResponse
@@ -13,7 +14,8 @@ async def register_user_service(user: User) -> RegisterResponse:
     """
     secret_hash = generate_secret_hash(user.username, CLIENT_ID, CLIENT_SECRET)
     try:
-        response = client.sign_up(
+        response = await cognito_executor.run(
+            client.sign_up,
             ClientId=CLIENT_ID,
             SecretHash=secret_hash,
             Username=user.username,
@@ -47,7 +49,8 @@ async def login_user_service(user: LoginRequest) -> LoginResponse:
     """
     secret_hash = generate_secret_hash(user.username, CLIENT_ID, CLIENT_SECRET)
     try:
-        response = client.initiate_auth(
+        response = await cognito_executor.run(
+            client.initiate_auth,
             ClientId=CLIENT_ID,
             AuthFlow="USER_PASSWORD_AUTH",
             AuthParameters={
@@ -101,7 +104,8 @@ async def confirm_email_service(data: ConfirmEmail) -> ConfirmEmailResponse:
     """
     secret_hash = generate_secret_hash(data.username, CLIENT_ID, CLIENT_SECRET)
     try:
-        response = client.confirm_sign_up(
+        response = await cognito_executor.run(
+            client.confirm_sign_up,
             ClientId=CLIENT_ID,
             SecretHash=secret_hash,
             Username=data.username,
@@ -131,7 +135,7 @@ async def logout_user_service(access_token: str) -> LogoutResponse:
     Lógica de negocio para cerrar la sesión de un usuario en AWS Cognito.
     """
     try:
-        client.global_sign_out(AccessToken=access_token)
+        await cognito_executor.run(client.global_sign_out, AccessToken=access_token)
         return LogoutResponse(
             code=200,
             message="Sesión cerrada",
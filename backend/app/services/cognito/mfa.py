@@ -4,6 +4,7 @@ from botocore.exceptions import ClientError
 from ...schemas.cognito.mfa import RespondToChallengeRequest, RespondToChallengeResponse
 from ...schemas.cognito.mfa import AssociateTOTPRequest, AssociateTOTPResponse
 from app.shared.config import USER_POOL_ID, CLIENT_ID, client, CLIENT_SECRET
+from app.shared.executor import cognito_executor
 
 # Configuración del cliente de Cognito
 
@@ -12,7 +13,8 @@ async def verify_totp_service(request: VerifyTOTPRequest) -> VerifyTOTPResponse:
     Lógica de negocio para verificar el código TOTP en AWS Cognito.
     """
     try:
-        response = client.verify_software_token(
+        response = await cognito_executor.run(
+            client.verify_software_token,
             Session=request.session,
             UserCode=request.user_code
         )
@@ -47,7 +49,8 @@ async def associate_totp_service(request: AssociateTOTPRequest) -> AssociateTOTP
     Lógica de negocio para asociar TOTP al usuario en AWS Cognito.
     """
     try:
-        response = client.associate_software_token(
+        response = await cognito_executor.run(
+            client.associate_software_token,
             Session=request.session
         )
         return AssociateTOTPResponse(
@@ -72,7 +75,8 @@ async def respond_to_auth_challenge_service(request: RespondToChallengeRequest)
     """
     secret_hash = generate_secret_hash(request.username, CLIENT_ID, CLIENT_SECRET)
     try:
-        response = client.respond_to_auth_challenge(
+        response = await cognito_executor.run(
+            client.respond_to_auth_challenge,
             ClientId=CLIENT_ID,
             ChallengeName='SOFTWARE_TOKEN_MFA',
             Session=request.session,
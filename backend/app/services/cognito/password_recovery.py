@@ -5,6 +5,7 @@ from ...schemas.cognito.password_recovery import (
 )
 from botocore.exceptions import ClientError
 from app.shared.config import USER_POOL_ID, CLIENT_ID, client, CLIENT_SECRET
+from app.shared.executor import cognito_executor
 
 
 
@@ -16,7 +17,8 @@ async def forgot_password_service(request: ForgotPasswordRequest) -> ForgotPassw
     secret_hash = generate_secret_hash(request.username, CLIENT_ID, CLIENT_SECRET)
 
     try:
-        client.forgot_password(
+        await cognito_executor.run(
+            client.forgot_password,
             ClientId=CLIENT_ID,
             Username=request.username,
             SecretHash=secret_hash
@@ -44,7 +46,8 @@ async def confirm_forgot_password_service(request: ConfirmForgotPasswordRequest)
     """
     secret_hash = generate_secret_hash(request.username, CLIENT_ID, CLIENT_SECRET)
     try:
-        client.confirm_forgot_password(
+        await cognito_executor.run(
+            client.confirm_forgot_password,
             ClientId=CLIENT_ID,
             Username=request.username,
             ConfirmationCode=request.confirmation_code,
@@ -1,16 +1,21 @@
-from typing import List
+from typing import AsyncIterator, List, Optional, Tuple
 from datetime import datetime
 from app.database.connection import db
 from app.models.comment import CommentDB
 from app.schemas.comment import CommentRequest, CommentUpdateRequest
+from pymongo import ReturnDocument, UpdateOne
 from pymongo.errors import PyMongoError
+from app.shared.utils import get_page
+from app.shared.cache import movie_cache
+from app.shared.config import settings
 from bson import ObjectId
 
 comments_collection = db["comments"]
+movies_collection = db["movies"]
 
-def get_all_comments_service() -> List[CommentDB]:
+async def get_all_comments_service(limit: int, cursor: Optional[str] = None) -> Tuple[List[CommentDB], Optional[str]]:
     try:
-        comments_cursor = comments_collection.find({})
+        comments_page, next_cursor = await get_page(comments_collection, {}, limit, cursor)
         comments = [
             CommentDB(
                 id=str(comment["_id"]),
@@ -21,15 +26,15 @@ def get_all_comments_service() -> List[CommentDB]:
                 created_at=comment["created_at"],
                 updated_at=comment.get("updated_at")
             )
-            for comment in comments_cursor
+            for comment in comments_page
         ]
-        return comments
+        return comments, next_cursor
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
-def get_comment_by_id_service(comment_id: str) -> CommentDB:
+async def get_comment_by_id_service(comment_id: str) -> CommentDB:
     try:
-        comment = comments_collection.find_one({"_id": ObjectId(comment_id)})
+        comment = await comments_collection.find_one({"_id": ObjectId(comment_id)})
         if not comment:
             return None
         return CommentDB(
@@ -44,53 +49,135 @@ def get_comment_by_id_service(comment_id: str) -> CommentDB:
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
-def create_comment_service(comment_data: CommentRequest) -> CommentDB:
+async def create_comment_service(comment_data: CommentRequest) -> CommentDB:
     try:
+        # Convertir el ID antes de insertar: un ID inválido no debe dejar el comentario sin contar
+        movie_id = ObjectId(comment_data.movie_id)
         comment_dict = comment_data.model_dump()
         comment_dict["created_at"] = datetime.utcnow()
         
-        result = comments_collection.insert_one(comment_dict)
-        created_comment = comments_collection.find_one({"_id": result.inserted_id})
+        await comments_collection.insert_one(comment_dict)
+
+        # Incrementar el contador de comentarios de la película de forma atómica
+        await movies_collection.update_one(
+            {"_id": movie_id},
+            {"$inc": {"comments_count": 1}}
+        )
+        movie_cache.invalidate(comment_dict["movie_id"])
         
         return CommentDB(
-            id=str(created_comment["_id"]),
-            user_id=created_comment["user_id"],
-            movie_id=created_comment["movie_id"],
-            parent_comment_id=created_comment.get("parent_comment_id"),
-            comment_content=created_comment["comment_content"],
-            created_at=created_comment["created_at"],
-            updated_at=created_comment.get("updated_at")
+            id=str(comment_dict["_id"]),
+            user_id=comment_dict["user_id"],
+            movie_id=comment_dict["movie_id"],
+            parent_comment_id=comment_dict.get("parent_comment_id"),
+            comment_content=comment_dict["comment_content"],
+            created_at=comment_dict["created_at"],
+            updated_at=comment_dict.get("updated_at")
         )
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
-def update_comment_service(comment_id: str, comment_data: CommentUpdateRequest) -> CommentDB:
+async def update_comment_service(comment_id: str, comment_data: CommentUpdateRequest) -> CommentDB:
     try:
         update_data = comment_data.model_dump()
         update_data["updated_at"] = datetime.utcnow()
         
-        result = comments_collection.update_one(
+        updated_comment = await comments_collection.find_one_and_update(
             {"_id": ObjectId(comment_id)},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.matched_count == 0:
+        if updated_comment is None:
             raise ValueError(f"No se encontró ningún comentario con el ID proporcionado: {comment_id}")
+        movie_cache.invalidate(updated_comment["movie_id"])
             
-        updated_comment = comments_collection.find_one({"_id": ObjectId(comment_id)})
-        return CommentDB(**updated_comment)
+        return CommentDB(
+            id=str(updated_comment["_id"]),
+            user_id=updated_comment["user_id"],
+            movie_id=updated_comment["movie_id"],
+            parent_comment_id=updated_comment.get("parent_comment_id"),
+            comment_content=updated_comment["comment_content"],
+            created_at=updated_comment["created_at"],
+            updated_at=updated_comment.get("updated_at")
+        )
         
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
-def delete_comment_service(comment_id: str) -> bool:
+async def delete_comment_service(comment_id: str) -> bool:
     try:
-        result = comments_collection.delete_one({"_id": ObjectId(comment_id)})
+        deleted_comment = await comments_collection.find_one_and_delete({"_id": ObjectId(comment_id)})
         
-        if result.deleted_count == 0:
+        if deleted_comment is None:
             raise ValueError(f"No se encontró ningún comentario con el ID proporcionado: {comment_id}")
+
+        # Decrementar el contador de comentarios de la película de forma atómica
+        await movies_collection.update_one(
+            {"_id": ObjectId(deleted_comment["movie_id"])},
+            {"$inc": {"comments_count": -1}}
+        )
+        movie_cache.invalidate(deleted_comment["movie_id"])
             
         return True
         
     except PyMongoError as e:
-        raise RuntimeError(f"Database error: {str(e)}")
\ No newline at end of file
+        raise RuntimeError(f"Database error: {str(e)}")
+
+async def reconcile_comments_count_service(chunk_size: int = 500) -> int:
+    """
+    Calcula el contador `comments_count` de las películas a partir de la colección de
+    comentarios. Sirve para inicializarlo en las películas creadas antes de que existiera
+    y para corregir desviaciones.
+
+    Las películas se procesan por bloques de `chunk_size`: por cada bloque se cuentan
+    los comentarios con una sola agregación y solo se escriben los contadores que difieren.
+
+    Returns:
+        int: Número de películas cuyo contador fue corregido.
+    """
+    try:
+        fixed = 0
+        cursor = None
+        while True:
+            movies, cursor = await get_page(movies_collection, {}, chunk_size, cursor, projection={"comments_count": 1})
+            movie_ids = [str(movie["_id"]) for movie in movies]
+
+            counts = {
+                group["_id"]: group["count"]
+                async for group in comments_collection.aggregate([
+                    {"$match": {"movie_id": {"$in": movie_ids}}},
+                    {"$group": {"_id": "$movie_id", "count": {"$sum": 1}}}
+                ])
+            }
+
+            updates = [
+                UpdateOne({"_id": movie["_id"]}, {"$set": {"comments_count": counts.get(movie_id, 0)}})
+                for movie_id, movie in zip(movie_ids, movies)
+                if movie.get("comments_count") != counts.get(movie_id, 0)
+            ]
+            if updates:
+                await movies_collection.bulk_write(updates, ordered=False)
+                fixed += len(updates)
+
+            if cursor is None:
+                return fixed
+    except PyMongoError as e:
+        raise RuntimeError(f"Database error: {str(e)}")
+
+async def export_comments_service(query: dict) -> AsyncIterator[CommentDB]:
+    """Recorre los comentarios que cumplen `query` por lotes, sin cargarlos todos en memoria."""
+    try:
+        comments_cursor = comments_collection.find(query).sort("_id", 1).batch_size(settings.EXPORT_BATCH_SIZE)
+        async for comment in comments_cursor:
+            yield CommentDB(
+                id=str(comment["_id"]),
+                user_id=comment["user_id"],
+                movie_id=comment["movie_id"],
+                parent_comment_id=comment.get("parent_comment_id"),
+                comment_content=comment["comment_content"],
+                created_at=comment["created_at"],
+                updated_at=comment.get("updated_at")
+            )
+    except PyMongoError as e:
+        raise RuntimeError(f"Database error: {str(e)}")
@@ -1,14 +1,19 @@
-from typing import List
+from typing import AsyncIterator, List
 from datetime import datetime
 from app.database.connection import db
 from app.models.like import LikeDB
 from app.schemas.like import LikeRequest
-from pymongo.errors import PyMongoError
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError, PyMongoError
 from bson import ObjectId
+from app.shared.utils import get_page
+from app.shared.cache import movie_cache
+from app.shared.config import settings
 
 likes_collection = db["likes"]
+movies_collection = db["movies"]
 
-def get_movie_likes(movie_id: str) -> List[LikeDB]:
+async def get_movie_likes(movie_id: str) -> List[LikeDB]:
     """Obtiene todos los likes asociados a una película."""
     try:
         likes_cursor = likes_collection.find({"movie_id": movie_id})
@@ -19,14 +24,14 @@ def get_movie_likes(movie_id: str) -> List[LikeDB]:
                 movie_id=like["movie_id"],
                 created_at=like["created_at"]
             )
-            for like in likes_cursor
+            async for like in likes_cursor
         ]
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
-def get_like_by_id_service(like_id: str) -> LikeDB:
+async def get_like_by_id_service(like_id: str) -> LikeDB:
     try:
-        like = likes_collection.find_one({"_id": ObjectId(like_id)})
+        like = await likes_collection.find_one({"_id": ObjectId(like_id)})
         if not like:
             return None
         
@@ -39,59 +44,136 @@ def get_like_by_id_service(like_id: str) -> LikeDB:
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
-def create_like_service(like_data: LikeRequest) -> LikeDB:
+async def create_like_service(like_data: LikeRequest) -> LikeDB:
     try:
-        # Verificar si ya existe un like del mismo usuario para la misma película
-        existing_like = likes_collection.find_one({
-            "user_id": like_data.user_id,
-            "movie_id": like_data.movie_id
-        })
-        
-        if existing_like:
-            raise ValueError("El usuario ya dio like a esta película")
-            
         like_dict = like_data.model_dump()
         like_dict["created_at"] = datetime.now()
         
-        result = likes_collection.insert_one(like_dict)
-        created_like = likes_collection.find_one({"_id": result.inserted_id})
+        # El índice único (user_id, movie_id) rechaza el like duplicado en el mismo insert
+        try:
+            await likes_collection.insert_one(like_dict)
+        except DuplicateKeyError:
+            raise ValueError("El usuario ya dio like a esta película")
         
-        # Actualizar el contador de likes en la película
-        from app.services.movie import update_movie_likes_count
-        update_movie_likes_count(like_data.movie_id)
+        # Incrementar el contador de likes de la película de forma atómica
+        await movies_collection.update_one(
+            {"_id": ObjectId(like_data.movie_id)},
+            {"$inc": {"likes_count": 1}}
+        )
+        movie_cache.invalidate(like_data.movie_id)
         
         return LikeDB(
-            id=str(created_like["_id"]),
-            user_id=created_like["user_id"],
-            movie_id=created_like["movie_id"],
-            created_at=created_like["created_at"]
+            id=str(like_dict["_id"]),
+            user_id=like_dict["user_id"],
+            movie_id=like_dict["movie_id"],
+            created_at=like_dict["created_at"]
         )
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
-def delete_like_service(like_id: str) -> bool:
+async def delete_like_service(like_id: str) -> bool:
     try:
-        # Obtener el like antes de eliminarlo para tener el movie_id
-        like = likes_collection.find_one({"_id": ObjectId(like_id)})
+        # Eliminar el like obteniendo el documento para conocer el movie_id
+        like = await likes_collection.find_one_and_delete({"_id": ObjectId(like_id)})
         if not like:
             raise ValueError(f"No se encontró ningún like con el ID proporcionado: {like_id}")
         
-        movie_id = like["movie_id"]
-        
-        # Eliminar el like
-        result = likes_collection.delete_one({"_id": ObjectId(like_id)})
-        
-        # Actualizar el contador de likes en la película
-        update_movie_likes_count(movie_id)
+        # Decrementar el contador de likes de la película de forma atómica
+        await movies_collection.update_one(
+            {"_id": ObjectId(like["movie_id"])},
+            {"$inc": {"likes_count": -1}}
+        )
+        movie_cache.invalidate(like["movie_id"])
         
         return True
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
     
-def delete_movie_likes_service(movie_id: str) -> bool:
+async def delete_movie_likes_service(movie_id: str) -> bool:
     """Elimina todos los likes asociados a una película."""
     try:
-        result = likes_collection.delete_many({"movie_id": movie_id})
+        result = await likes_collection.delete_many({"movie_id": movie_id})
+        # La película ya no tiene likes: el contador se reinicia junto con ellos
+        await movies_collection.update_one(
+            {"_id": ObjectId(movie_id)},
+            {"$set": {"likes_count": 0}}
+        )
+        movie_cache.invalidate(movie_id)
         return True
     except PyMongoError as e:
-        raise RuntimeError(f"Database error: {str(e)}")
\ No newline at end of file
+        raise RuntimeError(f"Database error: {str(e)}")
+
+async def reconcile_likes_count_service(chunk_size: int = 500) -> int:
+    """
+    Corrige el contador `likes_count` de las películas a partir de la colección de likes.
+
+    Las películas se procesan por bloques de `chunk_size`: por cada bloque se cuentan
+    los likes con una sola agregación y solo se escriben los contadores que difieren.
+
+    Returns:
+        int: Número de películas cuyo contador fue corregido.
+    """
+    try:
+        fixed = 0
+        cursor = None
+        while True:
+            movies, cursor = await get_page(movies_collection, {}, chunk_size, cursor, projection={"likes_count": 1})
+            movie_ids = [str(movie["_id"]) for movie in movies]
+
+            counts = {
+                group["_id"]: group["count"]
+                async for group in likes_collection.aggregate([
+                    {"$match": {"movie_id": {"$in": movie_ids}}},
+                    {"$group": {"_id": "$movie_id", "count": {"$sum": 1}}}
+                ])
+            }
+
+            updates = [
+                UpdateOne({"_id": movie["_id"]}, {"$set": {"likes_count": counts.get(movie_id, 0)}})
+                for movie_id, movie in zip(movie_ids, movies)
+                if movie.get("likes_count") != counts.get(movie_id, 0)
+            ]
+            if updates:
+                await movies_collection.bulk_write(updates, ordered=False)
+                fixed += len(updates)
+
+            if cursor is None:
+                return fixed
+    except PyMongoError as e:
+        raise RuntimeError(f"Database error: {str(e)}")
+
+async def dedupe_likes_service(collection=likes_collection, chunk_size: int = 500) -> int:
+    """
+    Elimina los likes repetidos de un mismo usuario a una misma película, conservando el
+    más antiguo. Es necesario antes de crear el índice único (user_id, movie_id).
+
+    Returns:
+        int: Número de likes eliminados.
+    """
+    try:
+        duplicate_ids = []
+        async for group in collection.aggregate([
+            {"$group": {"_id": {"user_id": "$user_id", "movie_id": "$movie_id"}, "ids": {"$push": "$_id"}}},
+            {"$match": {"ids.1": {"$exists": True}}}
+        ], allowDiskUse=True):
+            duplicate_ids.extend(sorted(group["ids"])[1:])
+
+        for start in range(0, len(duplicate_ids), chunk_size):
+            await collection.delete_many({"_id": {"$in": duplicate_ids[start:start + chunk_size]}})
+        return len(duplicate_ids)
+    except PyMongoError as e:
+        raise RuntimeError(f"Database error: {str(e)}")
+
+async def export_likes_service(query: dict) -> AsyncIterator[LikeDB]:
+    """Recorre los likes que cumplen `query` por lotes, sin cargarlos todos en memoria."""
+    try:
+        likes_cursor = likes_collection.find(query).sort("_id", 1).batch_size(settings.EXPORT_BATCH_SIZE)
+        async for like in likes_cursor:
+            yield LikeDB(
+                id=str(like["_id"]),
+                user_id=like["user_id"],
+                movie_id=like["movie_id"],
+                created_at=like["created_at"]
+            )
+    except PyMongoError as e:
+        raise RuntimeError(f"Database error: {str(e)}")
@@ -1,32 +1,36 @@
-from typing import List
+import time
+from collections import defaultdict
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from pydantic import TypeAdapter, ValidationError
+from starlette.concurrency import run_in_threadpool
 from app.database.connection import db
-from app.models.movie import MovieDB
-from app.models.comment import CommentDB
+from app.models.movie import MovieDB, MovieImportErrorDB, MovieImportResultDB, MovieSummaryDB
+from app.models.comment import CommentDB, CommentNodeDB
+from app.models.like import LikeDB
 from app.schemas.movie import MovieRequest
-from pymongo.errors import PyMongoError
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, PyMongoError
 from bson import ObjectId
-from app.services.like import get_movie_likes, delete_movie_likes_service
+from app.services.like import get_movie_likes, delete_movie_likes_service, likes_collection
+from app.shared.utils import decode_created_at_cursor, encode_cursor, get_page, validate_object_id
+from app.shared.cache import movie_cache
+from app.shared.config import settings
+from app.shared.comment_tree import build_comment_tree, index_replies
 
 movies_collection = db["movies"]
 comments_collection = db["comments"]
 
-def update_movie_likes_count(movie_id: str) -> int:
-    """Actualiza y retorna el contador de likes de una película"""
-    try:
-        likes = get_movie_likes(movie_id)
-        likes_count = len(likes)
-        
-        # Actualizar el contador en la base de datos
-        movies_collection.update_one(
-            {"_id": ObjectId(movie_id)},
-            {"$set": {"likes_count": likes_count}}
-        )
-        
-        return likes_count
-    except PyMongoError as e:
-        raise RuntimeError(f"Database error: {str(e)}")
+# Campos del catálogo que se devuelven en el listado resumido
+MOVIE_SUMMARY_PROJECTION = {
+    "title": 1, "overview": 1, "year": 1, "rating": 1,
+    "category": 1, "duration": 1, "likes_count": 1, "comments_count": 1
+}
+
+# Valida un bloque completo de filas de la importación en una sola llamada
+movie_list_adapter = TypeAdapter(List[MovieRequest])
 
-def get_movie_comments(movie_id: str) -> List[CommentDB]:
+async def get_movie_comments(movie_id: str) -> List[CommentDB]:
     """Obtiene todos los comentarios asociados a una película."""
     try:
         comments_cursor = comments_collection.find({"movie_id": movie_id})
@@ -40,48 +44,205 @@ def get_movie_comments(movie_id: str) -> List[CommentDB]:
                 created_at=comment["created_at"],
                 updated_at=comment.get("updated_at")
             )
-            for comment in comments_cursor
+            async for comment in comments_cursor
         ]
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
-def get_all_movies_service() -> List[MovieDB]:
+async def get_movie_comments_page_service(
+    movie_id: str,
+    limit: int,
+    cursor: Optional[str] = None
+) -> Optional[Tuple[List[CommentDB], Optional[str]]]:
+    """
+    Obtiene una página de los comentarios de una película, de los más recientes a los
+    más antiguos.
+
+    Usa paginación keyset sobre (created_at, _id) con el índice
+    `movie_id_1_created_at_-1__id_-1`, por lo que el costo de cada página no depende de
+    su posición. La existencia de la película se comprueba con un `find_one` que solo
+    devuelve el `_id`.
+
+    Returns:
+        tuple: Comentarios de la página y el cursor de la siguiente página (None si no hay
+        más resultados), o None si la película no existe.
+    """
+    query = {"movie_id": movie_id}
+    if cursor:
+        last_created_at, last_id = decode_created_at_cursor(cursor)
+        last_id = validate_object_id(last_id)
+        query["$or"] = [
+            {"created_at": {"$lt": last_created_at}},
+            {"created_at": last_created_at, "_id": {"$lt": last_id}},
+        ]
+
+    try:
+        if not await movies_collection.find_one({"_id": ObjectId(movie_id)}, {"_id": 1}):
+            return None
+
+        # Se pide un comentario extra para saber si existe una página siguiente
+        comments = await comments_collection.find(query).sort(
+            [("created_at", -1), ("_id", -1)]
+        ).to_list(length=limit + 1)
+        next_cursor = None
+        if len(comments) > limit:
+            comments = comments[:limit]
+            next_cursor = encode_cursor(created_at=comments[-1]["created_at"].isoformat(), id=str(comments[-1]["_id"]))
+
+        return [
+            CommentDB(
+                id=str(comment["_id"]),
+                user_id=comment["user_id"],
+                movie_id=comment["movie_id"],
+                parent_comment_id=comment.get("parent_comment_id"),
+                comment_content=comment["comment_content"],
+                created_at=comment["created_at"],
+                updated_at=comment.get("updated_at")
+            )
+            for comment in comments
+        ], next_cursor
+    except PyMongoError as e:
+        raise RuntimeError(f"Database error: {str(e)}")
+
+async def get_movie_comment_tree_service(
+    movie_id: str,
+    parent_id: Optional[str] = None,
+    limit: int = settings.DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    depth: int = settings.COMMENT_TREE_DEPTH,
+    replies_limit: int = settings.DEFAULT_REPLIES_PAGE_SIZE
+) -> Optional[Tuple[List[CommentNodeDB], Optional[str]]]:
+    """
+    Obtiene los comentarios de una película como árbol de respuestas anidadas.
+
+    Los comentarios se leen con una sola consulta sobre el índice de `movie_id`, ya
+    ordenados por (created_at, _id), y se enlazan en memoria en tiempo lineal con
+    `index_replies`. Ver `build_comment_tree` para la paginación por nivel.
+
+    Returns:
+        tuple: Página de nodos y cursor de la siguiente página, o None si la película no existe.
+    """
     try:
-        movies_cursor = movies_collection.find({})
-        movies = []
-        for movie in movies_cursor:
-            comments = get_movie_comments(str(movie["_id"]))
-            likes = get_movie_likes(str(movie["_id"]))
-            likes_count = len(likes)
-            movies.append(
-                MovieDB(
-                    id=str(movie["_id"]),
-                    title=movie["title"],
-                    overview=movie["overview"],
-                    year=movie["year"],
-                    rating=movie["rating"],
-                    category=movie["category"],
-                    duration=movie["duration"],
-                    comments=comments,
-                    likes=likes,
-                    likes_count=likes_count
+        if not await movies_collection.find_one({"_id": ObjectId(movie_id)}, {"_id": 1}):
+            return None
+
+        comments = await comments_collection.find({"movie_id": movie_id}).sort(
+            [("created_at", 1), ("_id", 1)]
+        ).to_list(length=None)
+        return build_comment_tree(index_replies(comments), parent_id, limit, cursor, depth, replies_limit)
+    except PyMongoError as e:
+        raise RuntimeError(f"Database error: {str(e)}")
+
+async def get_all_movies_service(limit: int, cursor: Optional[str] = None) -> Tuple[List[MovieDB], Optional[str]]:
+    """
+    Obtiene una página de películas con sus comentarios y likes.
+
+    Los comentarios y likes se obtienen con una sola consulta `$in` por colección
+    y se agrupan en memoria, por lo que el número de consultas no depende del
+    tamaño del catálogo.
+    """
+    try:
+        movies, next_cursor = await get_page(movies_collection, {}, limit, cursor)
+        movie_ids = [str(movie["_id"]) for movie in movies]
+
+        comments_by_movie = defaultdict(list)
+        async for comment in comments_collection.find({"movie_id": {"$in": movie_ids}}):
+            comments_by_movie[comment["movie_id"]].append(
+                CommentDB(
+                    id=str(comment["_id"]),
+                    user_id=comment["user_id"],
+                    movie_id=comment["movie_id"],
+                    parent_comment_id=comment.get("parent_comment_id"),
+                    comment_content=comment["comment_content"],
+                    created_at=comment["created_at"],
+                    updated_at=comment.get("updated_at")
+                )
+            )
+
+        likes_by_movie = defaultdict(list)
+        async for like in likes_collection.find({"movie_id": {"$in": movie_ids}}):
+            likes_by_movie[like["movie_id"]].append(
+                LikeDB(
+                    id=str(like["_id"]),
+                    user_id=like["user_id"],
+                    movie_id=like["movie_id"],
+                    created_at=like["created_at"]
                 )
             )
-        return movies
+
+        movies = [
+            MovieDB(
+                id=movie_id,
+                title=movie["title"],
+                overview=movie["overview"],
+                year=movie["year"],
+                rating=movie["rating"],
+                category=movie["category"],
+                duration=movie["duration"],
+                comments=comments_by_movie[movie_id],
+                likes=likes_by_movie[movie_id],
+                likes_count=len(likes_by_movie[movie_id]),
+                comments_count=len(comments_by_movie[movie_id])
+            )
+            for movie_id, movie in zip(movie_ids, movies)
+        ]
+        return movies, next_cursor
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
-def get_movie_by_id_service(movie_id: str) -> MovieDB:
+async def get_movies_summary_service(limit: int, cursor: Optional[str] = None) -> Tuple[List[MovieSummaryDB], Optional[str]]:
+    """
+    Obtiene una página de películas con los campos del catálogo y sus contadores de
+    likes y comentarios, sin incluir las listas de comentarios y likes.
+
+    Los contadores se leen de los campos `likes_count` y `comments_count` de cada
+    película, por lo que la página se obtiene con una sola consulta.
+    """
     try:
-        movie = movies_collection.find_one({"_id": ObjectId(movie_id)})
+        movies, next_cursor = await get_page(movies_collection, {}, limit, cursor, projection=MOVIE_SUMMARY_PROJECTION)
+        movie_ids = [str(movie["_id"]) for movie in movies]
+
+        movies = [
+            MovieSummaryDB(
+                id=movie_id,
+                title=movie["title"],
+                overview=movie["overview"],
+                year=movie["year"],
+                rating=movie["rating"],
+                category=movie["category"],
+                duration=movie["duration"],
+                likes_count=movie.get("likes_count", 0),
+                comments_count=movie.get("comments_count", 0)
+            )
+            for movie_id, movie in zip(movie_ids, movies)
+        ]
+        return movies, next_cursor
+    except PyMongoError as e:
+        raise RuntimeError(f"Database error: {str(e)}")
+
+async def get_movie_by_id_service(movie_id: str) -> MovieDB:
+    """
+    Obtiene el detalle de una película con sus comentarios y likes.
+
+    El resultado se guarda en `movie_cache`; las escrituras sobre la película, sus
+    likes o sus comentarios invalidan la entrada.
+    """
+    cached_movie = movie_cache.get(movie_id)
+    if cached_movie is not None:
+        return cached_movie
+
+    # Si una escritura invalida la película durante la carga, el resultado no se guarda
+    generation = movie_cache.generation(movie_id)
+    try:
+        movie = await movies_collection.find_one({"_id": ObjectId(movie_id)})
         if not movie:
             return None
             
-        comments = get_movie_comments(movie_id)
-        likes = get_movie_likes(movie_id)
+        comments = await get_movie_comments(movie_id)
+        likes = await get_movie_likes(movie_id)
         likes_count = len(likes)
         
-        return MovieDB(
+        movie_detail = MovieDB(
             id=str(movie["_id"]),
             title=movie["title"],
             overview=movie["overview"],
@@ -91,51 +252,59 @@ def get_movie_by_id_service(movie_id: str) -> MovieDB:
             duration=movie["duration"],
             comments=comments,
             likes=likes,
-            likes_count=likes_count
+            likes_count=likes_count,
+            comments_count=len(comments)
         )
+        movie_cache.set(movie_id, movie_detail, generation=generation)
+        return movie_detail
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
-def create_movie_service(movie_data: MovieRequest) -> MovieDB:
+async def create_movie_service(movie_data: MovieRequest) -> MovieDB:
     try:
         movie_dict = movie_data.model_dump(exclude={"id"})
         movie_dict["likes_count"] = 0  # Inicializar el contador de likes
+        movie_dict["comments_count"] = 0  # Inicializar el contador de comentarios
         
-        result = movies_collection.insert_one(movie_dict)
-        created_movie = movies_collection.find_one({"_id": result.inserted_id})
+        # insert_one asigna el _id al diccionario, no es necesario volver a leerlo
+        await movies_collection.insert_one(movie_dict)
         
         return MovieDB(
-            id=str(created_movie["_id"]),
-            title=created_movie["title"],
-            overview=created_movie["overview"],
-            year=created_movie["year"],
-            rating=created_movie["rating"],
-            category=created_movie["category"],
-            duration=created_movie["duration"],
+            id=str(movie_dict["_id"]),
+            title=movie_dict["title"],
+            overview=movie_dict["overview"],
+            year=movie_dict["year"],
+            rating=movie_dict["rating"],
+            category=movie_dict["category"],
+            duration=movie_dict["duration"],
             comments=[],
             likes=[],
-            likes_count=0
+            likes_count=0,
+            comments_count=0
         )
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
-def update_movie_service(movie_id: str, movie_data: MovieRequest) -> MovieDB:
+async def update_movie_service(movie_id: str, movie_data: MovieRequest) -> MovieSummaryDB:
+    """
+    Actualiza los datos del catálogo de una película en un solo viaje a la base de datos.
+
+    Devuelve la vista resumida con los contadores guardados `likes_count` y
+    `comments_count`; las listas de comentarios y likes se obtienen con
+    `GET /movie/{movie_id}`.
+    """
     try:
-        result = movies_collection.update_one(
+        updated_movie = await movies_collection.find_one_and_update(
             {"_id": ObjectId(movie_id)},
-            {"$set": movie_data.model_dump(exclude={"id"})}
+            {"$set": movie_data.model_dump(exclude={"id"})},
+            return_document=ReturnDocument.AFTER
         )
 
-        if result.matched_count == 0:
+        if updated_movie is None:
             raise ValueError(f"No se encontró ninguna película con el ID proporcionado: {movie_id}")
+        movie_cache.invalidate(movie_id)
 
-        # Obtener la película actualizada con sus comentarios y likes
-        updated_movie = movies_collection.find_one({"_id": ObjectId(movie_id)})
-        comments = get_movie_comments(movie_id)
-        likes = get_movie_likes(movie_id)
-        likes_count = len(likes)
-        
-        return MovieDB(
+        return MovieSummaryDB(
             id=str(updated_movie["_id"]),
             title=updated_movie["title"],
             overview=updated_movie["overview"],
@@ -143,27 +312,144 @@ def update_movie_service(movie_id: str, movie_data: MovieRequest) -> MovieDB:
             rating=updated_movie["rating"],
             category=updated_movie["category"],
             duration=updated_movie["duration"],
-            comments=comments,
-            likes=likes,
-            likes_count=likes_count
+            likes_count=updated_movie.get("likes_count", 0),
+            comments_count=updated_movie.get("comments_count", 0)
         )
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
-def delete_movie_service(movie_id: str) -> bool:
+async def delete_movie_service(movie_id: str) -> bool:
     try:
         # Eliminar la película
-        result = movies_collection.delete_one({"_id": ObjectId(movie_id)})
+        result = await movies_collection.delete_one({"_id": ObjectId(movie_id)})
         
         if result.deleted_count == 0:
             raise ValueError(f"No se encontró ninguna película con el ID proporcionado: {movie_id}")
+        movie_cache.invalidate(movie_id)
         
         # Eliminar todos los comentarios asociados a la película
-        comments_collection.delete_many({"movie_id": movie_id})
+        await comments_collection.delete_many({"movie_id": movie_id})
         
         # Eliminar todos los likes asociados a la película
-        delete_movie_likes_service(movie_id)
+        await delete_movie_likes_service(movie_id)
         
         return True
     except PyMongoError as e:
-        raise RuntimeError(f"Database error: {str(e)}")
\ No newline at end of file
+        raise RuntimeError(f"Database error: {str(e)}")
+
+def _validate_movie_rows(rows: list) -> Tuple[List[MovieRequest], List[int], dict]:
+    """
+    Valida un bloque de filas con `movie_list_adapter`.
+
+    Returns:
+        Tuple: películas válidas, posición en el bloque de cada una y errores por posición.
+    """
+    try:
+        return movie_list_adapter.validate_python(rows), list(range(len(rows))), {}
+    except ValidationError as e:
+        errors = defaultdict(list)
+        for error in e.errors():
+            field = ".".join(str(part) for part in error["loc"][1:])
+            errors[error["loc"][0]].append(f"{field}: {error['msg']}" if field else error["msg"])
+
+    # Solo se vuelve a validar cuando el bloque tiene filas con errores
+    positions = [position for position in range(len(rows)) if position not in errors]
+    movies = movie_list_adapter.validate_python([rows[position] for position in positions])
+    return movies, positions, errors
+
+def _read_import_chunk(rows: Iterator, chunk_size: int) -> Tuple[int, List[dict], List[int], dict]:
+    """
+    Lee y valida el siguiente bloque de filas. Es trabajo síncrono (lectura del archivo,
+    CSV y validación), por lo que se ejecuta fuera del event loop.
+
+    Returns:
+        Tuple: filas leídas, documentos a insertar, posición en el bloque de cada documento
+        y errores por posición.
+    """
+    chunk = list(islice(rows, chunk_size))
+    if not chunk:
+        return 0, [], [], {}
+    movies, positions, errors = _validate_movie_rows(chunk)
+    documents = [
+        {**movie.model_dump(), "likes_count": 0, "comments_count": 0}
+        for movie in movies
+    ]
+    return len(chunk), documents, positions, errors
+
+async def import_movies_service(
+    rows: Iterable,
+    start_row: int = 0,
+    chunk_size: Optional[int] = None,
+    on_chunk: Optional[Callable[[int], None]] = None,
+) -> MovieImportResultDB:
+    """
+    Importa películas a partir de filas (diccionarios con los campos de `MovieRequest`).
+
+    Las filas se leen por bloques de `chunk_size` (`IMPORT_BATCH_SIZE` por defecto); cada
+    bloque se valida de una vez y las filas válidas se guardan con un `insert_many` no
+    ordenado, por lo que una fila inválida no detiene el resto de la importación. La
+    lectura y la validación se hacen en el threadpool; en el event loop solo se esperan
+    las inserciones.
+
+    Args:
+        rows: Filas del archivo, numeradas desde 1.
+        start_row: Número de filas ya importadas que se omiten, para reanudar una
+            importación desde su último punto de control.
+        on_chunk: Se llama con el número de la última fila procesada al terminar cada
+            bloque; permite guardar el punto de control.
+
+    Returns:
+        MovieImportResultDB: Totales, errores por fila (máximo `MAX_IMPORT_ERRORS`) y
+        filas procesadas por segundo.
+    """
+    chunk_size = chunk_size or settings.IMPORT_BATCH_SIZE
+    rows = iter(rows)
+    # Las filas anteriores al punto de control se leen pero no se validan
+    await run_in_threadpool(next, islice(rows, start_row, start_row), None)
+
+    started = time.perf_counter()
+    last_row = start_row
+    inserted = failed = 0
+    row_errors = []
+
+    def add_error(row: int, messages: List[str]) -> None:
+        nonlocal failed
+        failed += 1
+        if len(row_errors) < settings.MAX_IMPORT_ERRORS:
+            row_errors.append(MovieImportErrorDB(row=row, errors=messages))
+
+    try:
+        while True:
+            read, documents, positions, errors = await run_in_threadpool(_read_import_chunk, rows, chunk_size)
+            if not read:
+                break
+
+            for position in sorted(errors):
+                add_error(last_row + position + 1, errors[position])
+
+            if documents:
+                try:
+                    result = await movies_collection.insert_many(documents, ordered=False)
+                    inserted += len(result.inserted_ids)
+                except BulkWriteError as e:
+                    inserted += e.details["nInserted"]
+                    for write_error in e.details["writeErrors"]:
+                        add_error(last_row + positions[write_error["index"]] + 1, [write_error["errmsg"]])
+
+            last_row += read
+            if on_chunk is not None:
+                on_chunk(last_row)
+    except PyMongoError as e:
+        raise RuntimeError(f"Database error: {str(e)}")
+
+    elapsed = time.perf_counter() - started
+    processed = last_row - start_row
+    return MovieImportResultDB(
+        processed=processed,
+        inserted=inserted,
+        failed=failed,
+        last_row=last_row,
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round(processed / elapsed, 1) if elapsed else 0.0,
+        errors=row_errors
+    )
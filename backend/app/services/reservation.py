@@ -1,16 +1,67 @@
+import asyncio
+from bisect import bisect_left
+from collections import defaultdict
 from datetime import datetime
-from typing import List
+from typing import AsyncIterator, List, Optional, Tuple
+from fastapi import HTTPException
+from pymongo import ReturnDocument
 from pymongo.errors import PyMongoError
+from app.shared.utils import check_movie_duration, get_page, validate_object_id, validate_reservation_time
+from app.shared.availability import (
+    DaySchedule, format_minutes, forget_reservation, get_day_schedule, invalidate_day_schedule,
+    record_reservation, slot_unavailable_error, to_minutes
+)
+from app.services.theater import get_theaters_day_schedules
+from app.services.theater_schedule import claim_slot, claim_slots, release_slot, release_slots
 from bson import ObjectId
-from app.models.reservation import ReservationDB
+from app.models.reservation import ReservationDB, ReservationSuggestionDB
 from app.schemas.reservation import ReservationRequest
 from app.database.connection import db
+from app.shared.config import settings
 
 reservations_collection = db["reservations"]
+movies_collection = db["movies"]
 
-def get_all_reservations_service() -> List[ReservationDB]:
+async def _slot_taken_error(theater_id: ObjectId, reservation_date: datetime) -> ValueError:
+    # El horario en caché no tenía el conflicto: se recarga para responder con datos actuales
+    invalidate_day_schedule(theater_id, reservation_date)
+    return slot_unavailable_error(await get_day_schedule(theater_id, reservation_date))
+
+def _reservation_fields(reservation_data: ReservationRequest) -> dict:
+    """
+    Campos editables de una reservación tal como se guardan: IDs como ObjectId y horas
+    combinadas con `reservation_date`. No incluye `_id` ni `user_id`.
+    """
+    reservation_dict = reservation_data.model_dump(exclude={"id", "user_id"})
+    reservation_dict["theater_id"] = validate_object_id(reservation_dict["theater_id"])
+    reservation_dict["movie_id"] = validate_object_id(reservation_dict["movie_id"])
+    reservation_dict["start_time"]= datetime.combine(reservation_dict["reservation_date"].date(), reservation_dict["start_time"].time())
+    reservation_dict["end_time"]= datetime.combine(reservation_dict["reservation_date"].date(), reservation_dict["end_time"].time())
+    return reservation_dict
+
+def _build_reservation_document(reservation_data: ReservationRequest, user_id: str) -> dict:
+    """Documento a guardar para una reservación nueva, con su ID ya asignado."""
+    reservation_dict = _reservation_fields(reservation_data)
+    reservation_dict["_id"] = ObjectId()
+    reservation_dict["user_id"] = user_id
+    return reservation_dict
+
+def _to_reservation_db(reservation_dict: dict) -> ReservationDB:
+    return ReservationDB(
+        id=str(reservation_dict["_id"]),
+        user_id=str(reservation_dict["user_id"]),
+        theater_id=str(reservation_dict["theater_id"]),
+        movie_id=str(reservation_dict["movie_id"]),
+        is_private=reservation_dict["is_private"],
+        start_time=reservation_dict["start_time"],
+        end_time=reservation_dict["end_time"],
+        reservation_date=reservation_dict["reservation_date"].strftime("%Y-%m-%d"),
+        status=reservation_dict["status"],
+    )
+
+async def get_all_reservations_service(limit: int, cursor: Optional[str] = None) -> Tuple[List[ReservationDB], Optional[str]]:
     try:
-        reservations_cursor = reservations_collection.find({})
+        reservations_page, next_cursor = await get_page(reservations_collection, {}, limit, cursor)
         reservations = [
             ReservationDB(
                 id=str(reservation["_id"]),
@@ -23,15 +74,15 @@ def get_all_reservations_service() -> List[ReservationDB]:
                 reservation_date=reservation["reservation_date"],
                 status=reservation["status"],
             )
-            for reservation in reservations_cursor
+            for reservation in reservations_page
         ]
-        return reservations
+        return reservations, next_cursor
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
-def get_reservation_by_id_service(reservation_id: str) -> ReservationDB:
+async def get_reservation_by_id_service(reservation_id: str) -> ReservationDB:
     try:
-        reservation = reservations_collection.find_one({"_id": ObjectId(reservation_id)})
+        reservation = await reservations_collection.find_one({"_id": ObjectId(reservation_id)})
         if not reservation:
             return None
         return ReservationDB(
@@ -48,85 +99,321 @@ def get_reservation_by_id_service(reservation_id: str) -> ReservationDB:
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
-def create_reservation_service(reservation_data: ReservationRequest, user_id: str) -> ReservationDB:
+async def create_reservation_service(reservation_data: ReservationRequest, user_id: str) -> ReservationDB:
     try:
         
         reservation_data.validate_fields()
-        reservation_dict = reservation_data.model_dump(exclude={"id"})
-        reservation_dict["user_id"] = user_id
-        reservation_dict["theater_id"] = ObjectId(reservation_dict["theater_id"])
-        reservation_dict["movie_id"] = ObjectId(reservation_dict["movie_id"])
-        reservation_dict["start_time"]= datetime.combine(reservation_dict["reservation_date"].date(), reservation_dict["start_time"].time())
-        reservation_dict["end_time"]= datetime.combine(reservation_dict["reservation_date"].date(), reservation_dict["end_time"].time())
+        reservation_dict = _build_reservation_document(reservation_data, user_id)
 
-        result = reservations_collection.insert_one(reservation_dict)
+        # Ocupar el horario antes de guardar: si otra petición lo tomó primero no se reserva
+        claim_id = await claim_slot(
+            reservation_dict["theater_id"],
+            reservation_dict["reservation_date"],
+            reservation_dict["start_time"],
+            reservation_dict["end_time"],
+            reservation_dict["_id"],
+        )
+        if claim_id is None:
+            raise await _slot_taken_error(reservation_dict["theater_id"], reservation_dict["reservation_date"])
 
-        
-        created_reservation = reservations_collection.find_one({"_id": result.inserted_id})
+        try:
+            await reservations_collection.insert_one(reservation_dict)
+        except PyMongoError:
+            await release_slot(reservation_dict["theater_id"], reservation_dict["reservation_date"], reservation_dict["_id"])
+            raise
+        record_reservation(reservation_dict)
 
-        return ReservationDB(
-            id=str(created_reservation["_id"]),
-            user_id=created_reservation["user_id"],
-            theater_id=str(created_reservation["theater_id"]),
-            movie_id=str(created_reservation["movie_id"]),
-            is_private=created_reservation["is_private"],
-            start_time=created_reservation["start_time"],
-            end_time=created_reservation["end_time"],
-            reservation_date=created_reservation["reservation_date"].strftime("%Y-%m-%d"),
-            status=created_reservation["status"],
-        )
+        return _to_reservation_db(reservation_dict)
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
-def update_reservation_service(reservation_id: str, reservation_data: ReservationRequest) -> ReservationDB:
+async def update_reservation_service(reservation_id: str, reservation_data: ReservationRequest) -> Optional[ReservationDB]:
+    """
+    Actualiza una reservación con los mismos campos que guarda la creación; el usuario
+    dueño de la reservación no cambia.
+
+    Returns:
+        ReservationDB: La reservación actualizada, o None si no existe.
+    """
     try:
-        reservation_data.validate_fields()
-        reservation_dict = reservation_data.model_dump()
-        reservation_dict["user_id"] = ObjectId(reservation_dict["user_id"])
-        reservation_dict["theater_id"] = ObjectId(reservation_dict["theater_id"])
-        reservation_dict["movie_id"] = ObjectId(reservation_dict["movie_id"])
-        
+        update_fields = _reservation_fields(reservation_data)
+        claim_id = await claim_slot(
+            update_fields["theater_id"],
+            update_fields["reservation_date"],
+            update_fields["start_time"],
+            update_fields["end_time"],
+            ObjectId(reservation_id),
+        )
+        if claim_id is None:
+            raise await _slot_taken_error(update_fields["theater_id"], update_fields["reservation_date"])
 
-        result = reservations_collection.update_one(
+        previous_reservation = await reservations_collection.find_one_and_update(
             {"_id": ObjectId(reservation_id)},
-            {"$set": reservation_data.model_dump()}
+            {"$set": update_fields},
+            return_document=ReturnDocument.BEFORE
         )
 
-        
-        if result.matched_count == 0:
-            raise ValueError(f"No se encontró ninguna reservación con el ID proporcionado: {reservation_id}")
+        if previous_reservation is None:
+            await release_slot(update_fields["theater_id"], update_fields["reservation_date"], ObjectId(reservation_id))
+            return None
 
-        
-        updated_reservation = reservations_collection.find_one({"_id": ObjectId(reservation_id)})
-
-        formatted_reservation = {
-            "user_id": str(updated_reservation["user_id"]),
-            "theater_id": str(updated_reservation["theater_id"]), 
-            "movie_id": str(updated_reservation["movie_id"]), 
-            "is_private": updated_reservation["is_private"],
-            "start_time": updated_reservation["start_time"],
-            "end_time": updated_reservation["end_time"],
-            "reservation_date": updated_reservation["reservation_date"],
-            "status": updated_reservation["status"],
-        }
-        
-        return ReservationDB(**formatted_reservation)
+        # Liberar el horario anterior de la reservación, conservando el recién ocupado
+        await release_slot(
+            previous_reservation["theater_id"],
+            previous_reservation["reservation_date"],
+            previous_reservation["_id"],
+            keep_claim_id=claim_id,
+        )
 
-        
+        # Se pide el documento anterior para mover la reservación en el índice de horarios
+        updated_reservation = {**previous_reservation, **update_fields}
+        forget_reservation(previous_reservation)
+        record_reservation(updated_reservation)
+
+        return _to_reservation_db(updated_reservation)
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
-def delete_reservation_service(reservation_id: str) -> bool:
+async def delete_reservation_service(reservation_id: str) -> bool:
     try:
 
         
-        result = reservations_collection.delete_one({"_id": ObjectId(reservation_id)})
+        deleted_reservation = await reservations_collection.find_one_and_delete(
+            {"_id": ObjectId(reservation_id)},
+            projection={"theater_id": 1, "reservation_date": 1}
+        )
 
         
-        if result.deleted_count == 0:
+        if deleted_reservation is None:
             raise ValueError(f"No se encontró ninguna película con el ID proporcionado: {reservation_id}")
 
+        forget_reservation(deleted_reservation)
+        await _release_deleted_slot(deleted_reservation)
+
         return True 
 
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
+
+async def _release_deleted_slot(reservation: dict) -> None:
+    """
+    Libera el horario de una reservación ya eliminada, con reintentos. Si todos fallan el
+    horario queda ocupado hasta que se ejecute `python -m app.commands.reconcile_schedules`.
+    """
+    for attempt in range(1, settings.SLOT_RELEASE_ATTEMPTS + 1):
+        try:
+            await release_slot(reservation["theater_id"], reservation["reservation_date"], reservation["_id"])
+            return
+        except PyMongoError:
+            if attempt == settings.SLOT_RELEASE_ATTEMPTS:
+                raise
+            await asyncio.sleep(0.1 * attempt)
+
+def _item_error(index: int, error_data: dict) -> dict:
+    return {
+        "index": index,
+        "message": error_data["message"],
+        "description": error_data["description"],
+        "data": error_data.get("data"),
+    }
+
+async def create_reservations_batch_service(reservations_data: List[ReservationRequest], user_id: str) -> List[ReservationDB]:
+    """
+    Crea un lote de reservaciones: se guardan todas o ninguna.
+
+    Las películas y las reservaciones existentes de las salas y días del lote se consultan
+    en bloque. Los horarios se ocupan con una actualización atómica por sala y día; si
+    alguna falla o falla la inserción, se liberan los horarios ya ocupados.
+
+    Raises:
+        ValueError: Si alguna reservación no es válida. `data` contiene un error por
+            reservación con su posición en el lote (`index`).
+    """
+    try:
+        errors = []
+        documents = {}
+        for index, reservation_data in enumerate(reservations_data):
+            try:
+                reservation_data.validate_fields()
+                validate_reservation_time(reservation_data.start_time, reservation_data.end_time)
+            except HTTPException as e:
+                errors.append(_item_error(index, e.detail))
+                continue
+            except ValueError as e:
+                errors.append(_item_error(index, e.args[0]))
+                continue
+            documents[index] = _build_reservation_document(reservation_data, user_id)
+
+        # Películas del lote en una sola consulta
+        movie_ids = list({document["movie_id"] for document in documents.values()})
+        movies = {
+            movie["_id"]: movie
+            async for movie in movies_collection.find({"_id": {"$in": movie_ids}}, {"duration": 1})
+        }
+        for index, document in list(documents.items()):
+            try:
+                check_movie_duration(movies.get(document["movie_id"]), str(document["movie_id"]), document["start_time"], document["end_time"])
+            except ValueError as e:
+                errors.append(_item_error(index, e.args[0]))
+                del documents[index]
+
+        # Reservaciones existentes de todas las salas y días del lote en una sola consulta
+        groups = defaultdict(list)
+        for index, document in documents.items():
+            groups[(document["theater_id"], document["reservation_date"])].append(index)
+
+        schedules = defaultdict(DaySchedule)
+        if groups:
+            existing_reservations = reservations_collection.find(
+                {"$or": [{"theater_id": theater_id, "reservation_date": reservation_date} for theater_id, reservation_date in groups]},
+                {"theater_id": 1, "reservation_date": 1, "start_time": 1, "end_time": 1},
+            )
+            async for reservation in existing_reservations:
+                schedules[(reservation["theater_id"], reservation["reservation_date"])].add(
+                    reservation["_id"], to_minutes(reservation["start_time"]), to_minutes(reservation["end_time"])
+                )
+
+        for key, indexes in groups.items():
+            schedule = schedules[key]
+            latest_end, latest_index = None, None
+            for index in sorted(indexes, key=lambda i: documents[i]["start_time"]):
+                document = documents[index]
+                start, end = to_minutes(document["start_time"]), to_minutes(document["end_time"])
+                if schedule.has_conflict(start, end):
+                    errors.append(_item_error(index, slot_unavailable_error(schedule).args[0]))
+                elif latest_end is not None and start < latest_end:
+                    errors.append(_item_error(index, {
+                        "message": "Conflicto dentro del lote",
+                        "description": f"El horario se traslapa con la reservación {latest_index} del lote.",
+                    }))
+                if latest_end is None or end > latest_end:
+                    latest_end, latest_index = end, index
+
+        if errors:
+            raise _batch_error(errors, len(reservations_data))
+
+        # Ocupar los horarios de cada sala y día; si alguno se ocupó mientras tanto, liberar todo
+        keys = list(groups)
+        claimed = await asyncio.gather(*(
+            claim_slots(
+                theater_id,
+                reservation_date,
+                [(documents[i]["start_time"], documents[i]["end_time"], documents[i]["_id"]) for i in groups[(theater_id, reservation_date)]],
+            )
+            for theater_id, reservation_date in keys
+        ), return_exceptions=True)
+        failures = [result for result in claimed if isinstance(result, BaseException)]
+        if failures:
+            # Una actualización que falló pudo haberse aplicado: se liberan todos los grupos.
+            # Los IDs de las reservaciones son nuevos, por lo que liberar un grupo no ocupado no tiene efecto.
+            await _release_batch(documents, groups, keys)
+            raise failures[0]
+        if not all(claimed):
+            await _release_batch(documents, groups, [key for key, ok in zip(keys, claimed) if ok])
+            for key, ok in zip(keys, claimed):
+                if not ok:
+                    invalidate_day_schedule(*key)
+                    errors.extend(
+                        _item_error(index, {
+                            "message": "No hay disponibilidad en ese horario",
+                            "description": "Otra reservación ocupó la sala en este horario mientras se procesaba el lote.",
+                        })
+                        for index in groups[key]
+                    )
+            raise _batch_error(errors, len(reservations_data))
+
+        ordered_documents = [documents[index] for index in sorted(documents)]
+        try:
+            await reservations_collection.insert_many(ordered_documents)
+        except PyMongoError:
+            await _release_batch(documents, groups, keys)
+            await reservations_collection.delete_many({"_id": {"$in": [document["_id"] for document in ordered_documents]}})
+            raise
+
+        for document in ordered_documents:
+            record_reservation(document)
+        return [_to_reservation_db(document) for document in ordered_documents]
+    except PyMongoError as e:
+        raise RuntimeError(f"Database error: {str(e)}")
+
+def _batch_error(errors: List[dict], total: int) -> ValueError:
+    return ValueError({
+        "message": "Lote de reservaciones inválido",
+        "description": f"{len(errors)} de {total} reservaciones no son válidas. No se guardó ninguna reservación del lote.",
+        "data": sorted(errors, key=lambda error: error["index"]),
+    })
+
+async def _release_batch(documents: dict, groups: dict, keys: list) -> None:
+    # Se intenta liberar cada grupo aunque falle otro, y después se propaga el primer error
+    released = await asyncio.gather(*(
+        release_slots(theater_id, reservation_date, [documents[i]["_id"] for i in groups[(theater_id, reservation_date)]])
+        for theater_id, reservation_date in keys
+    ), return_exceptions=True)
+    for result in released:
+        if isinstance(result, BaseException):
+            raise result
+
+async def suggest_reservation_times_service(movie_id: str, reservation_date: datetime, limit: int) -> List[ReservationSuggestionDB]:
+    """
+    Propone horarios para proyectar una película en una fecha, en cualquier sala.
+
+    Se ordenan por mejor ajuste: primero los espacios libres que la película ocupa casi por
+    completo, para dejar disponibles los espacios grandes. Los espacios de todas las salas
+    se ordenan por duración y una búsqueda binaria descarta los más cortos que la película.
+    """
+    try:
+        movie = await movies_collection.find_one({"_id": ObjectId(movie_id)}, {"duration": 1})
+        if not movie:
+            raise ValueError({
+                "message": "Película no encontrada",
+                "description": f"No se encontró ninguna película con el ID proporcionado: {movie_id}",
+                "data": None
+            })
+        duration = movie.get("duration")
+        if not duration:
+            raise ValueError({
+                "message": "Duración no especificada",
+                "description": "La película seleccionada no tiene una duración definida.",
+                "data": None
+            })
+
+        theaters, gaps = [], []
+        for theater, schedule in await get_theaters_day_schedules(reservation_date):
+            gaps.extend((end - start, start, end, len(theaters)) for start, end in schedule.free_gaps())
+            theaters.append(theater)
+        gaps.sort()
+
+        first_fit = bisect_left(gaps, (duration,))
+        return [
+            ReservationSuggestionDB(
+                theater_id=str(theaters[theater_index]["_id"]),
+                theater_name=theaters[theater_index]["name"],
+                start_time=format_minutes(start),
+                end_time=format_minutes(start + duration),
+                gap_start_time=format_minutes(start),
+                gap_end_time=format_minutes(end),
+                leftover_minutes=length - duration,
+            )
+            for length, start, end, theater_index in gaps[first_fit:first_fit + limit]
+        ]
+    except PyMongoError as e:
+        raise RuntimeError(f"Database error: {str(e)}")
+
+async def export_reservations_service(query: dict) -> AsyncIterator[ReservationDB]:
+    """Recorre las reservaciones que cumplen `query` por lotes, sin cargarlas todas en memoria."""
+    try:
+        reservations_cursor = reservations_collection.find(query).sort("_id", 1).batch_size(settings.EXPORT_BATCH_SIZE)
+        async for reservation in reservations_cursor:
+            yield ReservationDB(
+                id=str(reservation["_id"]),
+                user_id=str(reservation["user_id"]),
+                theater_id=str(reservation["theater_id"]),
+                movie_id=str(reservation["movie_id"]),
+                is_private=reservation["is_private"],
+                start_time=reservation["start_time"],
+                end_time=reservation["end_time"],
+                reservation_date=reservation["reservation_date"],
+                status=reservation["status"],
+            )
+    except PyMongoError as e:
+        raise RuntimeError(f"Database error: {str(e)}")
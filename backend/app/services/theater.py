@@ -1,15 +1,21 @@
-from typing import List
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
 from app.database.connection import db
-from app.models.theater import TheaterDB
+from app.models.theater import TheaterAvailabilityDB, TheaterCalendarDB, TheaterDB
 from app.schemas.theater import TheaterRequest
+from pymongo import ReturnDocument
 from pymongo.errors import PyMongoError
+from app.shared.utils import get_page
+from app.shared.availability import DaySchedule, to_minutes
+from app.shared.calendar_grid import build_calendar
 from bson import ObjectId
 
 theaters_collection = db["theaters"]
+movies_collection = db["movies"]
 
-def get_all_theaters_service() -> List[TheaterDB]:
+async def get_all_theaters_service(limit: int, cursor: Optional[str] = None) -> Tuple[List[TheaterDB], Optional[str]]:
     try:
-        theaters_cursor = theaters_collection.find({})
+        theaters_page, next_cursor = await get_page(theaters_collection, {}, limit, cursor)
         theaters = [
             TheaterDB(
                 id=str(theater["_id"]),
@@ -19,15 +25,15 @@ def get_all_theaters_service() -> List[TheaterDB]:
                 screen_size=theater["screen_size"],
                 description=theater["description"],
             )
-            for theater in theaters_cursor
+            for theater in theaters_page
         ]
-        return theaters
+        return theaters, next_cursor
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
-def get_theater_by_id_service(theater_id: str) -> TheaterDB:
+async def get_theater_by_id_service(theater_id: str) -> TheaterDB:
     try:
-        theater = theaters_collection.find_one({"_id": ObjectId(theater_id)})
+        theater = await theaters_collection.find_one({"_id": ObjectId(theater_id)})
         if not theater:
             return None
         return TheaterDB(
@@ -41,46 +47,51 @@ def get_theater_by_id_service(theater_id: str) -> TheaterDB:
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
-def create_theater_service(theater_data: TheaterRequest)-> TheaterDB:
+async def create_theater_service(theater_data: TheaterRequest)-> TheaterDB:
     try:
-        result = theaters_collection.insert_one(theater_data.model_dump(exclude={"id"}))
-
-        created_theater = theaters_collection.find_one({"_id": result.inserted_id})
+        theater_dict = theater_data.model_dump(exclude={"id"})
+        await theaters_collection.insert_one(theater_dict)
 
         return TheaterDB(
-            id=str(created_theater["_id"]),
-            name=created_theater["name"],
-            max_capacity=created_theater["max_capacity"],
-            projection=created_theater["projection"],
-            screen_size=created_theater["screen_size"],
-            description=created_theater["description"],
+            id=str(theater_dict["_id"]),
+            name=theater_dict["name"],
+            max_capacity=theater_dict["max_capacity"],
+            projection=theater_dict["projection"],
+            screen_size=theater_dict["screen_size"],
+            description=theater_dict["description"],
         )
 
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
-def update_theater_service(theater_id: str, theater_data: TheaterRequest) -> TheaterDB:
+async def update_theater_service(theater_id: str, theater_data: TheaterRequest) -> TheaterDB:
     try:
-        result = theaters_collection.update_one(
+        updated_theater = await theaters_collection.find_one_and_update(
             {"_id": ObjectId(theater_id)},
-            {"$set": theater_data.model_dump(exclude={"id"})}
+            {"$set": theater_data.model_dump(exclude={"id"})},
+            return_document=ReturnDocument.AFTER
         )
 
-        if result.matched_count == 0:
+        if updated_theater is None:
             raise ValueError(f"No se encontró ninguna película con el ID proporcionado: {theater_id}")
 
-        updated_theater = theaters_collection.find_one({"_id": ObjectId(theater_id)})
-
-        return TheaterDB(**updated_theater)
+        return TheaterDB(
+            id=str(updated_theater["_id"]),
+            name=updated_theater["name"],
+            max_capacity=updated_theater["max_capacity"],
+            projection=updated_theater["projection"],
+            screen_size=updated_theater["screen_size"],
+            description=updated_theater["description"],
+        )
         
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
-def delete_theater_service(theater_id: str) -> bool:
+async def delete_theater_service(theater_id: str) -> bool:
     try:
 
  
-        result = theaters_collection.delete_one({"_id": ObjectId(theater_id)})
+        result = await theaters_collection.delete_one({"_id": ObjectId(theater_id)})
 
   
         if result.deleted_count == 0:
@@ -91,3 +102,94 @@ def delete_theater_service(theater_id: str) -> bool:
     except PyMongoError as e:
         raise RuntimeError(f"Database error: {str(e)}")
 
+async def get_theaters_day_schedules(reservation_date: datetime) -> List[Tuple[dict, DaySchedule]]:
+    """
+    Horario del día de cada sala, obtenido con una sola agregación sobre `theaters` unida
+    a las reservaciones de esa fecha.
+
+    Returns:
+        list: Pares (sala con `_id` y `name`, DaySchedule).
+    """
+    pipeline = [
+        {"$project": {"name": 1}},
+        {"$lookup": {
+            "from": "reservations",
+            "localField": "_id",
+            "foreignField": "theater_id",
+            "pipeline": [
+                {"$match": {"reservation_date": reservation_date}},
+                {"$project": {"start_time": 1, "end_time": 1}},
+            ],
+            "as": "reservations",
+        }},
+    ]
+
+    schedules = []
+    async for theater in theaters_collection.aggregate(pipeline):
+        schedule = DaySchedule()
+        for reservation in theater.pop("reservations"):
+            schedule.add(reservation["_id"], to_minutes(reservation["start_time"]), to_minutes(reservation["end_time"]))
+        schedules.append((theater, schedule))
+    return schedules
+
+async def get_theaters_availability_service(
+    reservation_date: datetime, min_duration: int = 0, movie_id: Optional[str] = None
+) -> List[TheaterAvailabilityDB]:
+    """
+    Calcula los horarios libres de todas las salas en una fecha. Solo se devuelven las
+    salas con al menos un horario libre de `min_duration` minutos (o de la duración de
+    `movie_id`).
+    """
+    try:
+        if movie_id is not None:
+            movie = await movies_collection.find_one({"_id": ObjectId(movie_id)}, {"duration": 1})
+            if not movie:
+                raise ValueError(f"No se encontró ninguna película con el ID proporcionado: {movie_id}")
+            min_duration = max(min_duration, movie["duration"])
+
+        availability = []
+        for theater, schedule in await get_theaters_day_schedules(reservation_date):
+            free_slots = schedule.free_slots(min_duration)
+            if free_slots:
+                availability.append(TheaterAvailabilityDB(
+                    theater_id=str(theater["_id"]),
+                    name=theater["name"],
+                    free_slots=free_slots,
+                ))
+        return availability
+    except PyMongoError as e:
+        raise RuntimeError(f"Database error: {str(e)}")
+
+async def get_theaters_calendar_service(
+    start_date: datetime, days: int, min_duration: int = 0
+) -> List[TheaterCalendarDB]:
+    """
+    Calendario de disponibilidad de todas las salas para `days` días a partir de
+    `start_date`. Las reservaciones del rango se cargan con una sola agregación y la
+    ocupación se calcula sobre una matriz salas × días × bloques de 5 minutos.
+    """
+    try:
+        pipeline = [
+            {"$project": {"name": 1}},
+            {"$lookup": {
+                "from": "reservations",
+                "localField": "_id",
+                "foreignField": "theater_id",
+                "pipeline": [
+                    {"$match": {"reservation_date": {"$gte": start_date, "$lt": start_date + timedelta(days=days)}}},
+                    {"$project": {"_id": 0, "reservation_date": 1, "start_time": 1, "end_time": 1}},
+                ],
+                "as": "reservations",
+            }},
+        ]
+
+        theaters, reservations = [], []
+        async for theater in theaters_collection.aggregate(pipeline):
+            theater_id = str(theater["_id"])
+            theaters.append({"id": theater_id, "name": theater["name"]})
+            reservations.extend({**reservation, "theater_id": theater_id} for reservation in theater["reservations"])
+
+        calendar = build_calendar(theaters, start_date.date(), days, reservations, min_duration)
+        return [TheaterCalendarDB(**theater) for theater in calendar]
+    except PyMongoError as e:
+        raise RuntimeError(f"Database error: {str(e)}")
@@ -0,0 +1,188 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from app.database.connection import db
+from app.shared.availability import to_minutes
+from app.shared.config import settings
+from app.shared.utils import get_page
+
+# Un documento por sala y día con los horarios reservados:
+# {theater_id, date, slots: [{reservation_id, claim_id, start, end}]}, con start y end
+# en minutos desde la medianoche. Reservar un horario es una única actualización
+# condicionada sobre ese documento, por lo que dos reservaciones simultáneas de la
+# misma sala no pueden ocupar el mismo horario y las de salas distintas no se bloquean.
+schedules_collection = db["theater_schedules"]
+reservations_collection = db["reservations"]
+
+
+async def _ensure_schedule(theater_id: ObjectId, reservation_date: datetime) -> None:
+    """
+    Crea el documento de horarios de la sala y día si no existe, con las reservaciones
+    guardadas antes de que existiera.
+    """
+    if await schedules_collection.find_one({"theater_id": theater_id, "date": reservation_date}, {"_id": 1}):
+        return
+
+    existing_reservations = reservations_collection.find(
+        {"theater_id": theater_id, "reservation_date": reservation_date},
+        {"start_time": 1, "end_time": 1},
+    )
+    slots = [
+        {
+            "reservation_id": reservation["_id"],
+            "claim_id": ObjectId(),
+            "start": to_minutes(reservation["start_time"]),
+            "end": to_minutes(reservation["end_time"]),
+        }
+        async for reservation in existing_reservations
+    ]
+    try:
+        await schedules_collection.update_one(
+            {"theater_id": theater_id, "date": reservation_date},
+            {"$setOnInsert": {"slots": slots}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # Otra petición creó el documento al mismo tiempo
+        pass
+
+
+async def claim_slot(
+    theater_id: ObjectId,
+    reservation_date: datetime,
+    start_time: datetime,
+    end_time: datetime,
+    reservation_id: ObjectId,
+) -> ObjectId:
+    """
+    Ocupa el horario [start_time, end_time) de la sala para la reservación indicada.
+
+    Los horarios ya ocupados por la misma reservación no cuentan como conflicto, de modo
+    que una reservación puede moverse a un horario que se traslapa con el suyo.
+
+    Returns:
+        ObjectId: ID del horario ocupado, o None si el horario ya está reservado.
+    """
+    await _ensure_schedule(theater_id, reservation_date)
+
+    start, end = to_minutes(start_time), to_minutes(end_time)
+    claim_id = ObjectId()
+    result = await schedules_collection.update_one(
+        {
+            "theater_id": theater_id,
+            "date": reservation_date,
+            "slots": {"$not": {"$elemMatch": {
+                "reservation_id": {"$ne": reservation_id},
+                "start": {"$lt": end},
+                "end": {"$gt": start},
+            }}},
+        },
+        {"$push": {"slots": {"reservation_id": reservation_id, "claim_id": claim_id, "start": start, "end": end}}},
+    )
+    return claim_id if result.modified_count else None
+
+
+async def release_slot(
+    theater_id: ObjectId,
+    reservation_date: datetime,
+    reservation_id: ObjectId,
+    keep_claim_id: ObjectId = None,
+) -> None:
+    """Libera los horarios de la reservación en la sala y día, salvo `keep_claim_id`."""
+    slot_filter = {"reservation_id": reservation_id}
+    if keep_claim_id is not None:
+        slot_filter["claim_id"] = {"$ne": keep_claim_id}
+    await schedules_collection.update_one(
+        {"theater_id": theater_id, "date": reservation_date},
+        {"$pull": {"slots": slot_filter}},
+    )
+
+
+async def claim_slots(
+    theater_id: ObjectId,
+    reservation_date: datetime,
+    slots: List[Tuple[datetime, datetime, ObjectId]],
+) -> bool:
+    """
+    Ocupa varios horarios (start_time, end_time, reservation_id) de la sala y día en una
+    sola actualización: se ocupan todos o ninguno.
+
+    Returns:
+        bool: False si alguno de los horarios ya está reservado.
+    """
+    await _ensure_schedule(theater_id, reservation_date)
+
+    new_slots = [
+        {"reservation_id": reservation_id, "claim_id": ObjectId(), "start": to_minutes(start_time), "end": to_minutes(end_time)}
+        for start_time, end_time, reservation_id in slots
+    ]
+    result = await schedules_collection.update_one(
+        {
+            "theater_id": theater_id,
+            "date": reservation_date,
+            "$and": [
+                {"slots": {"$not": {"$elemMatch": {"start": {"$lt": slot["end"]}, "end": {"$gt": slot["start"]}}}}}
+                for slot in new_slots
+            ],
+        },
+        {"$push": {"slots": {"$each": new_slots}}},
+    )
+    return result.modified_count == 1
+
+
+async def release_slots(theater_id: ObjectId, reservation_date: datetime, reservation_ids: List[ObjectId]) -> None:
+    """Libera los horarios de varias reservaciones en la sala y día."""
+    await schedules_collection.update_one(
+        {"theater_id": theater_id, "date": reservation_date},
+        {"$pull": {"slots": {"reservation_id": {"$in": reservation_ids}}}},
+    )
+
+
+async def reconcile_schedules_service(chunk_size: int = 500, grace_seconds: Optional[int] = None) -> int:
+    """
+    Libera los horarios de `theater_schedules` cuya reservación ya no existe, por ejemplo
+    si falló `release_slot` después de eliminar la reservación.
+
+    Solo se liberan los horarios ocupados hace más de `grace_seconds`
+    (`SCHEDULE_RECONCILE_GRACE_SECONDS` por defecto), porque una reservación nueva ocupa su
+    horario antes de guardarse. La antigüedad se obtiene del `claim_id` (un ObjectId).
+
+    Returns:
+        int: Número de horarios liberados.
+    """
+    if grace_seconds is None:
+        grace_seconds = settings.SCHEDULE_RECONCILE_GRACE_SECONDS
+    claimed_before = datetime.now(timezone.utc) - timedelta(seconds=grace_seconds)
+
+    try:
+        released = 0
+        cursor = None
+        while True:
+            schedules, cursor = await get_page(schedules_collection, {}, chunk_size, cursor, projection={"slots": 1})
+            reservation_ids = {slot["reservation_id"] for schedule in schedules for slot in schedule["slots"]}
+            existing = {
+                reservation["_id"]
+                async for reservation in reservations_collection.find({"_id": {"$in": list(reservation_ids)}}, {"_id": 1})
+            }
+
+            updates = []
+            for schedule in schedules:
+                orphaned = [
+                    slot for slot in schedule["slots"]
+                    if slot["reservation_id"] not in existing and slot["claim_id"].generation_time <= claimed_before
+                ]
+                if orphaned:
+                    updates.append(UpdateOne(
+                        {"_id": schedule["_id"]},
+                        {"$pull": {"slots": {"claim_id": {"$in": [slot["claim_id"] for slot in orphaned]}}}}
+                    ))
+                    released += len(orphaned)
+            if updates:
+                await schedules_collection.bulk_write(updates, ordered=False)
+
+            if cursor is None:
+                return released
+    except PyMongoError as e:
+        raise RuntimeError(f"Database error: {str(e)}")
@@ -0,0 +1,148 @@
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+from typing import Dict, Hashable, List, Tuple
+from bson import ObjectId
+from app.database.connection import db
+from app.shared.cache import TTLCache
+from app.shared.config import settings
+
+reservations_collection = db["reservations"]
+
+# Horario de funciones de las salas, en minutos desde la medianoche (09:00 a 22:00)
+OPEN_MINUTE = 9 * 60
+CLOSE_MINUTE = 22 * 60
+
+
+def to_minutes(value: datetime) -> int:
+    """Convierte la hora de un datetime a minutos desde la medianoche."""
+    return value.hour * 60 + value.minute
+
+
+def format_minutes(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class DaySchedule:
+    """
+    Horarios ocupados de una sala en un día.
+
+    Guarda las reservaciones por ID y, a partir de ellas, los bloques ocupados como
+    intervalos [inicio, fin) disjuntos y ordenados. Con esos bloques la detección de
+    conflictos es una búsqueda binaria.
+    """
+
+    def __init__(self):
+        self._reservations: Dict[Hashable, Tuple[int, int]] = {}
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._reservations)
+
+    def _merge(self, start: int, end: int) -> None:
+        # Bloques que se tocan o traslapan con [start, end) se fusionan en uno solo
+        first = bisect_left(self._ends, start)
+        last = bisect_right(self._starts, end)
+        if first < last:
+            start = min(start, self._starts[first])
+            end = max(end, self._ends[last - 1])
+        self._starts[first:last] = [start]
+        self._ends[first:last] = [end]
+
+    def add(self, reservation_id: Hashable, start: int, end: int) -> None:
+        if reservation_id in self._reservations:
+            self.remove(reservation_id)
+        self._reservations[reservation_id] = (start, end)
+        if start < end:
+            self._merge(start, end)
+
+    def remove(self, reservation_id: Hashable) -> None:
+        if self._reservations.pop(reservation_id, None) is None:
+            return
+        # Quitar un intervalo puede partir un bloque fusionado, así que se reconstruyen
+        self._starts, self._ends = [], []
+        for start, end in sorted(self._reservations.values()):
+            if start < end:
+                self._merge(start, end)
+
+    def has_conflict(self, start: int, end: int) -> bool:
+        """Indica si [start, end) se traslapa con algún bloque ocupado."""
+        index = bisect_left(self._starts, end)
+        return index > 0 and self._ends[index - 1] > start
+
+    def free_gaps(self, min_duration: int = 0) -> List[Tuple[int, int]]:
+        """
+        Espacios libres (inicio, fin) en minutos dentro del horario de la sala.
+        `min_duration` descarta los espacios de menos minutos.
+        """
+        gaps = []
+        current_start = OPEN_MINUTE
+        for start, end in zip(self._starts + [CLOSE_MINUTE], self._ends + [CLOSE_MINUTE]):
+            start = min(start, CLOSE_MINUTE)
+            if current_start < start and start - current_start >= min_duration:
+                gaps.append((current_start, start))
+            current_start = max(current_start, end)
+            if current_start >= CLOSE_MINUTE:
+                break
+        return gaps
+
+    def free_slots(self, min_duration: int = 0) -> List[dict]:
+        """Espacios libres de `free_gaps` en formato {"start_time", "end_time"}."""
+        return [
+            {"start_time": format_minutes(start), "end_time": format_minutes(end)}
+            for start, end in self.free_gaps(min_duration)
+        ]
+
+
+def slot_unavailable_error(schedule: DaySchedule) -> ValueError:
+    """Error de negocio para un horario ocupado, con los horarios libres de la sala."""
+    return ValueError({
+        "message": "No hay disponibilidad en ese horario",
+        "description": "La sala de proyección ya tiene reservaciones en este horario, por favor valida los horarios disponibles",
+        "data": schedule.free_slots()  # Lista de horarios disponibles acotados
+    })
+
+
+# Horarios por (theater_id, fecha). Las entradas expiran para recoger los cambios hechos
+# por otros procesos; los cambios de este proceso se aplican al momento.
+availability_cache = TTLCache(maxsize=settings.AVAILABILITY_CACHE_SIZE, ttl=settings.AVAILABILITY_CACHE_TTL)
+
+
+def _schedule_key(theater_id, reservation_date: datetime) -> Tuple[str, date]:
+    return str(theater_id), reservation_date.date()
+
+
+async def get_day_schedule(theater_id: str, reservation_date: datetime) -> DaySchedule:
+    """Obtiene el horario de una sala en un día, cargándolo de la base de datos si no está en caché."""
+    key = _schedule_key(theater_id, reservation_date)
+    schedule = availability_cache.get(key)
+    if schedule is None:
+        generation = availability_cache.generation(key)
+        schedule = DaySchedule()
+        cursor = reservations_collection.find(
+            {"theater_id": ObjectId(theater_id), "reservation_date": reservation_date},
+            {"start_time": 1, "end_time": 1},
+        )
+        async for reservation in cursor:
+            schedule.add(reservation["_id"], to_minutes(reservation["start_time"]), to_minutes(reservation["end_time"]))
+        availability_cache.set(key, schedule, generation=generation)
+    return schedule
+
+
+def record_reservation(reservation: dict) -> None:
+    """Agrega una reservación guardada al horario en caché de su sala y día, si está cargado."""
+    schedule = availability_cache.get(_schedule_key(reservation["theater_id"], reservation["reservation_date"]))
+    if schedule is not None:
+        schedule.add(reservation["_id"], to_minutes(reservation["start_time"]), to_minutes(reservation["end_time"]))
+
+
+def forget_reservation(reservation: dict) -> None:
+    """Quita una reservación del horario en caché de su sala y día, si está cargado."""
+    schedule = availability_cache.get(_schedule_key(reservation["theater_id"], reservation["reservation_date"]))
+    if schedule is not None:
+        schedule.remove(reservation["_id"])
+
+
+def invalidate_day_schedule(theater_id, reservation_date: datetime) -> None:
+    """Descarta el horario en caché de la sala y día para recargarlo en la próxima consulta."""
+    availability_cache.invalidate(_schedule_key(theater_id, reservation_date))
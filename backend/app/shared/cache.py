@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+from app.shared.config import settings
+
+
+class TTLCache:
+    """
+    Caché en memoria con expiración por tiempo (TTL) y desalojo LRU.
+
+    Cada entrada expira `ttl` segundos después de guardarse. Cuando la caché alcanza
+    `maxsize` entradas se desaloja la usada menos recientemente.
+
+    `invalidate` y `clear` avanzan la generación de las claves. Quien carga un valor lee
+    `generation(key)` antes de consultarlo y lo pasa a `set`; si hubo una invalidación
+    mientras tanto, el valor ya está desactualizado y no se guarda.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generations: Dict[Hashable, int] = {}
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def generation(self, key: Hashable) -> Tuple[int, int]:
+        """Generación actual de `key`; cambia cada vez que la clave se invalida."""
+        with self._lock:
+            return self._epoch, self._generations.get(key, 0)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, generation: Optional[Tuple[int, int]] = None) -> bool:
+        """
+        Guarda un valor. `ttl` permite sobrescribir la expiración por defecto.
+
+        Si se indica `generation` y la clave se invalidó desde entonces, el valor no se
+        guarda. Devuelve True si el valor se guardó.
+        """
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if generation is not None and generation != (self._epoch, self._generations.get(key, 0)):
+                return False
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+            if len(self._generations) > self.maxsize:
+                # Acota la memoria: a lo sumo se descartan las cargas que estén en curso
+                self._new_epoch()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._new_epoch()
+
+    def _new_epoch(self) -> None:
+        # Una nueva época invalida todas las generaciones leídas antes
+        self._generations.clear()
+        self._epoch += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round(self.hits / requests, 4) if requests else 0.0,
+            }
+
+
+# Caché del detalle de películas (get_movie_by_id_service), indexada por movie_id
+movie_cache = TTLCache(maxsize=settings.MOVIE_CACHE_SIZE, ttl=settings.MOVIE_CACHE_TTL)
+
+# Caché de usuarios por hash de access token (get_user_from_token). Cada entrada
+# expira con el `exp` del token, por lo que el TTL por defecto no se usa.
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=0)
@@ -0,0 +1,113 @@
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Sequence
+import numpy as np
+from app.shared.availability import CLOSE_MINUTE, OPEN_MINUTE, format_minutes, to_minutes
+
+# Resolución del calendario en minutos
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = (CLOSE_MINUTE - OPEN_MINUTE) // SLOT_MINUTES
+# Hora "HH:MM" de cada límite entre bloques
+SLOT_LABELS = [format_minutes(OPEN_MINUTE + slot * SLOT_MINUTES) for slot in range(SLOTS_PER_DAY + 1)]
+
+
+def build_occupancy(
+    theater_ids: Sequence[str],
+    start_date: date,
+    days: int,
+    reservations: Iterable[dict],
+) -> np.ndarray:
+    """
+    Construye la matriz booleana salas × días × bloques de `SLOT_MINUTES` minutos, donde
+    True indica un bloque ocupado.
+
+    Cada reservación suma +1 en su bloque de inicio y -1 en su bloque de fin; la suma
+    acumulada por día marca todos los bloques cubiertos sin recorrerlos uno por uno.
+    Un bloque parcialmente reservado cuenta como ocupado.
+    """
+    theater_index = {theater_id: index for index, theater_id in enumerate(theater_ids)}
+    first_day = start_date.toordinal()
+    fields = np.array([
+        (
+            theater_index.get(str(reservation["theater_id"]), -1),
+            reservation["reservation_date"].toordinal() - first_day,
+            to_minutes(reservation["start_time"]),
+            to_minutes(reservation["end_time"]),
+        )
+        for reservation in reservations
+    ], dtype=np.int64).reshape(-1, 4)
+    rows, columns, starts, ends = fields.T
+
+    starts = np.clip((starts - OPEN_MINUTE) // SLOT_MINUTES, 0, SLOTS_PER_DAY)
+    ends = np.clip(-((OPEN_MINUTE - ends) // SLOT_MINUTES), 0, SLOTS_PER_DAY)
+    valid = (rows >= 0) & (columns >= 0) & (columns < days) & (starts < ends)
+
+    changes = np.zeros((len(theater_ids), days, SLOTS_PER_DAY + 1), dtype=np.int32)
+    np.add.at(changes, (rows[valid], columns[valid], starts[valid]), 1)
+    np.add.at(changes, (rows[valid], columns[valid], ends[valid]), -1)
+
+    return np.cumsum(changes, axis=2)[:, :, :SLOTS_PER_DAY] > 0
+
+
+def free_windows(occupancy: np.ndarray, min_duration: int = 0) -> Dict[tuple, List[dict]]:
+    """
+    Obtiene los horarios libres de cada (sala, día) de la matriz de ocupación.
+
+    Returns:
+        dict: {(índice de sala, índice de día): [{"start_time", "end_time"}, ...]}.
+    """
+    theaters, days, _ = occupancy.shape
+    # Se rodea cada día de bloques ocupados para que todo horario libre tenga inicio y fin
+    padded = np.ones((theaters, days, SLOTS_PER_DAY + 2), dtype=np.int8)
+    padded[:, :, 1:-1] = occupancy
+    edges = np.diff(padded, axis=2)
+    # Los inicios (-1) y fines (+1) aparecen en el mismo orden al recorrer la matriz
+    start_rows, start_columns, start_slots = np.nonzero(edges == -1)
+    _, _, end_slots = np.nonzero(edges == 1)
+
+    min_slots = -(-min_duration // SLOT_MINUTES)
+    keep = (end_slots - start_slots) >= max(min_slots, 1)
+
+    windows: Dict[tuple, List[dict]] = {}
+    for row, column, start, end in zip(
+        start_rows[keep].tolist(), start_columns[keep].tolist(), start_slots[keep].tolist(), end_slots[keep].tolist()
+    ):
+        windows.setdefault((row, column), []).append({"start_time": SLOT_LABELS[start], "end_time": SLOT_LABELS[end]})
+    return windows
+
+
+def occupancy_percentages(occupancy: np.ndarray) -> np.ndarray:
+    """Porcentaje de bloques ocupados por (sala, día), redondeado a dos decimales."""
+    return np.round(occupancy.mean(axis=2) * 100, 2)
+
+
+def build_calendar(
+    theaters: Sequence[dict],
+    start_date: date,
+    days: int,
+    reservations: Iterable[dict],
+    min_duration: int = 0,
+) -> List[dict]:
+    """
+    Calendario de disponibilidad de `days` días a partir de `start_date` para las salas
+    indicadas ({"id", "name"}), con ocupación y horarios libres por día.
+    """
+    occupancy = build_occupancy([theater["id"] for theater in theaters], start_date, days, reservations)
+    windows = free_windows(occupancy, min_duration)
+    percentages = occupancy_percentages(occupancy).tolist()
+    dates = [(start_date + timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(days)]
+
+    return [
+        {
+            "theater_id": theater["id"],
+            "name": theater["name"],
+            "days": [
+                {
+                    "date": dates[column],
+                    "occupancy": percentages[row][column],
+                    "free_slots": windows.get((row, column), []),
+                }
+                for column in range(days)
+            ],
+        }
+        for row, theater in enumerate(theaters)
+    ]
@@ -1,22 +1,74 @@
-import boto3
-from botocore.exceptions import ClientError
+import hashlib
+import time
 from fastapi import HTTPException
-from app.shared.config import REGION_NAME, client
+from jose import JWTError, jwt
+from app.shared.config import CLIENT_ID, COGNITO_ISSUER, settings
+from app.shared.cache import token_cache
+from app.shared.jwks import jwks_cache
+from app.shared.utils import verify_and_decode_token
+
+
+class RejectedToken:
+    """Resultado negativo guardado en caché para un token rechazado."""
+
+    def __init__(self, reason: str):
+        self.reason = reason
+
+
+def validate_access_token_claims(claims: dict) -> None:
+    """
+    Valida que los claims correspondan a un access token emitido por nuestro user pool.
+
+    Raises:
+        ValueError: Si el token no es un access token válido para la aplicación.
+    """
+    if claims.get("token_use") != "access":
+        raise ValueError("El token no es un access token.")
+    if claims.get("iss") != COGNITO_ISSUER:
+        raise ValueError("El token no fue emitido por el user pool configurado.")
+    if CLIENT_ID and claims.get("client_id") != CLIENT_ID:
+        raise ValueError("El token no pertenece al cliente de la aplicación.")
+    if not claims.get("username"):
+        raise ValueError("El token no contiene el nombre de usuario.")
+
+
+def requires_key_fetch(access_token: str) -> bool:
+    """
+    Indica si validar el token descargaría el JWKS de Cognito (caché vacía o `kid`
+    desconocido). En ese caso `get_user_from_token` bloquea hasta `JWKS_FETCH_TIMEOUT`.
+    """
+    try:
+        kid = jwt.get_unverified_header(access_token).get("kid")
+    except JWTError:
+        return False
+    return jwks_cache.needs_fetch(kid)
 
-# Cliente de Cognito
 
 def get_user_from_token(access_token: str):
     """
-    Valida el access_token con Cognito y obtiene la información del usuario (username).
+    Valida el access_token localmente y obtiene el usuario (username).
+
+    La firma se verifica con las claves públicas de Cognito en caché, sin llamar a
+    `get_user`. El resultado se guarda en `token_cache` por el hash del token hasta
+    su expiración (`exp`); los tokens rechazados también se guardan durante
+    `TOKEN_NEGATIVE_CACHE_TTL` segundos.
     """
+    token_hash = hashlib.sha256(access_token.encode("utf-8")).hexdigest()
+    cached = token_cache.get(token_hash)
+    if isinstance(cached, RejectedToken):
+        raise HTTPException(status_code=401, detail=f"Token inválido o expirado: {cached.reason}")
+    if cached is not None:
+        return cached
+
     try:
-        response = client.get_user(AccessToken=access_token)
-        username = response.get("Username")
-        loquesea=response.get("UserAttributes")
-        print(loquesea)
-        return username
-    except ClientError as e:
-        error_message = e.response['Error']['Message']
-        raise HTTPException(status_code=401, detail=f"Token inválido o expirado: {error_message}")
+        claims = verify_and_decode_token(access_token)
+        validate_access_token_claims(claims)
+    except ValueError as e:
+        token_cache.set(token_hash, RejectedToken(str(e)), ttl=settings.TOKEN_NEGATIVE_CACHE_TTL)
+        raise HTTPException(status_code=401, detail=f"Token inválido o expirado: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error inesperado: {str(e)}")
+
+    username = claims["username"]
+    token_cache.set(token_hash, username, ttl=max(claims["exp"] - time.time(), 0))
+    return username
@@ -0,0 +1,87 @@
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from app.models.comment import CommentNodeDB
+from app.shared.utils import decode_created_at_cursor, encode_cursor
+
+
+def _sort_key(comment: dict) -> Tuple[datetime, str]:
+    return comment["created_at"], str(comment["_id"])
+
+
+def index_replies(comments: List[dict]) -> Dict[Optional[str], List[dict]]:
+    """
+    Agrupa los comentarios por `parent_comment_id` en un solo recorrido (O(n)).
+
+    Los comentarios sin padre, o cuyo padre ya no existe en la película, quedan bajo la
+    clave None como comentarios de primer nivel. Cada lista conserva el orden de
+    `comments`, que debe venir ordenado por (created_at, _id).
+    """
+    comment_ids = {str(comment["_id"]) for comment in comments}
+    replies = defaultdict(list)
+    for comment in comments:
+        parent_id = comment.get("parent_comment_id")
+        replies[parent_id if parent_id in comment_ids else None].append(comment)
+    return replies
+
+
+def _page(siblings: List[dict], limit: int, cursor: Optional[str]) -> Tuple[List[dict], Optional[str]]:
+    """Página de un nivel del árbol, con keyset sobre (created_at, _id)."""
+    start = 0
+    if cursor:
+        start = bisect_right([_sort_key(comment) for comment in siblings], decode_created_at_cursor(cursor))
+
+    page = siblings[start:start + limit]
+    next_cursor = None
+    # Con limit 0 la página está vacía y no hay posición para el cursor
+    if page and start + limit < len(siblings):
+        created_at, comment_id = _sort_key(page[-1])
+        next_cursor = encode_cursor(created_at=created_at.isoformat(), id=comment_id)
+    return page, next_cursor
+
+
+def build_comment_tree(
+    replies: Dict[Optional[str], List[dict]],
+    parent_id: Optional[str] = None,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    depth: int = 1,
+    replies_limit: int = 10,
+) -> Tuple[List[CommentNodeDB], Optional[str]]:
+    """
+    Construye una página de las respuestas de `parent_id` (o de los comentarios de primer
+    nivel si es None) con sus respuestas anidadas hasta `depth` niveles.
+
+    El primer nivel se pagina con `limit` y `cursor`; los niveles anidados devuelven como
+    máximo `replies_limit` respuestas por comentario. Cada nodo incluye `replies_count`;
+    si tiene más respuestas de las devueltas, se piden con `parent_id` igual a su ID y
+    `cursor` igual a su `replies_cursor` (sin cursor si el nodo está en el último nivel).
+
+    Returns:
+        tuple: Nodos de la página y el cursor de la siguiente página del primer nivel.
+    """
+    page, next_cursor = _page(replies.get(parent_id, []), limit, cursor)
+    return [_node(comment, replies, depth - 1, replies_limit) for comment in page], next_cursor
+
+
+def _node(comment: dict, replies: Dict[Optional[str], List[dict]], depth: int, replies_limit: int) -> CommentNodeDB:
+    comment_id = str(comment["_id"])
+    children = replies.get(comment_id, [])
+    nested, replies_cursor = [], None
+    if depth > 0 and children:
+        page, replies_cursor = _page(children, replies_limit, None)
+        nested = [_node(child, replies, depth - 1, replies_limit) for child in page]
+
+    return CommentNodeDB(
+        id=comment_id,
+        user_id=comment["user_id"],
+        movie_id=comment["movie_id"],
+        parent_comment_id=comment.get("parent_comment_id"),
+        comment_content=comment["comment_content"],
+        created_at=comment["created_at"],
+        updated_at=comment.get("updated_at"),
+        replies_count=len(children),
+        replies=nested,
+        replies_cursor=replies_cursor
+    )
@@ -1,9 +1,9 @@
 
 
 from pydantic_settings import BaseSettings
-import boto3
 from dotenv import load_dotenv
 import os
+from app.shared.resilience import CircuitBreaker, ResilientClient, build_cognito_client
 
 
 
@@ -16,13 +16,79 @@ CLIENT_ID = os.getenv('CLIENT_ID')
 REGION_NAME = os.getenv('REGION_NAME')
 CLIENT_SECRET = os.getenv('CLIENT_SECRET')
 
-# Cliente de Cognito|
-client = boto3.client('cognito-idp', region_name=REGION_NAME)
-JWKS_URL = f"https://cognito-idp.{REGION_NAME}.amazonaws.com/{USER_POOL_ID}/.well-known/jwks.json"
+COGNITO_ISSUER = f"https://cognito-idp.{REGION_NAME}.amazonaws.com/{USER_POOL_ID}"
+JWKS_URL = f"{COGNITO_ISSUER}/.well-known/jwks.json"
 
 
 class Settings(BaseSettings):
     # MONGO_URI: str = "mongodb://database:27017"
     MONGO_URI: str = "mongodb://localhost:27017/movie_club"
+    # Paginación de los listados
+    DEFAULT_PAGE_SIZE: int = 50
+    MAX_PAGE_SIZE: int = 100
+    # Árbol de comentarios de una película: niveles y respuestas por comentario por defecto
+    COMMENT_TREE_DEPTH: int = 3
+    MAX_COMMENT_TREE_DEPTH: int = 10
+    DEFAULT_REPLIES_PAGE_SIZE: int = 10
+    # Documentos por lote en las exportaciones NDJSON
+    EXPORT_BATCH_SIZE: int = 500
+    # Días máximos del calendario de disponibilidad de las salas
+    MAX_CALENDAR_DAYS: int = 90
+    # Reservaciones máximas por lote (POST /reservation/batch)
+    MAX_BATCH_SIZE: int = 100
+    # Intentos para liberar el horario de una reservación eliminada y antigüedad mínima de
+    # los horarios sin reservación que libera reconcile_schedules
+    SLOT_RELEASE_ATTEMPTS: int = 3
+    SCHEDULE_RECONCILE_GRACE_SECONDS: int = 300
+    # Importación masiva del catálogo de películas: filas por insert_many y errores reportados
+    IMPORT_BATCH_SIZE: int = 1000
+    MAX_IMPORT_ERRORS: int = 100
+    # Horarios propuestos por GET /reservation/suggest
+    DEFAULT_SUGGESTIONS: int = 10
+    MAX_SUGGESTIONS: int = 50
+    # Caché del detalle de películas
+    MOVIE_CACHE_SIZE: int = 1024
+    MOVIE_CACHE_TTL: int = 300
+    # Caché de las claves públicas (JWKS) de Cognito, en segundos
+    JWKS_CACHE_TTL: int = 3600
+    JWKS_MIN_REFETCH_INTERVAL: int = 30
+    JWKS_FETCH_TIMEOUT: float = 5.0
+    # Caché de usuarios resueltos a partir de access tokens
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_NEGATIVE_CACHE_TTL: int = 30
+    # Caché de horarios ocupados por sala y día (validate_theater_availability)
+    AVAILABILITY_CACHE_SIZE: int = 4096
+    AVAILABILITY_CACHE_TTL: int = 60
+    # Pool de hilos para las llamadas bloqueantes a AWS Cognito (timeout en segundos)
+    COGNITO_MAX_WORKERS: int = 8
+    COGNITO_MAX_QUEUE: int = 64
+    COGNITO_CALL_TIMEOUT: float = 10.0
+    # Timeouts, reintentos y circuit breaker del cliente de Cognito, en segundos
+    COGNITO_CONNECT_TIMEOUT: float = 2.0
+    COGNITO_READ_TIMEOUT: float = 5.0
+    COGNITO_MAX_ATTEMPTS: int = 3
+    COGNITO_RETRY_BASE_DELAY: float = 0.1
+    COGNITO_RETRY_MAX_DELAY: float = 1.0
+    COGNITO_BREAKER_FAILURE_THRESHOLD: int = 5
+    COGNITO_BREAKER_RESET_TIMEOUT: float = 30.0
 
 settings = Settings()
+
+# Cliente de Cognito con timeouts, reintentos y circuit breaker
+cognito_breaker = CircuitBreaker(
+    "cognito",
+    failure_threshold=settings.COGNITO_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.COGNITO_BREAKER_RESET_TIMEOUT,
+)
+client = ResilientClient(
+    build_cognito_client(
+        REGION_NAME,
+        connect_timeout=settings.COGNITO_CONNECT_TIMEOUT,
+        read_timeout=settings.COGNITO_READ_TIMEOUT,
+    ),
+    cognito_breaker,
+    max_attempts=settings.COGNITO_MAX_ATTEMPTS,
+    base_delay=settings.COGNITO_RETRY_BASE_DELAY,
+    max_delay=settings.COGNITO_RETRY_MAX_DELAY,
+    budget=settings.COGNITO_CALL_TIMEOUT,
+)
@@ -1,4 +1,9 @@
 from fastapi import HTTPException
+from app.shared.executor import ExecutorSaturatedError, ExecutorTimeoutError
+from app.shared.resilience import CircuitOpenError
+
+# Errores de un servicio externo caído, saturado o que no respondió a tiempo
+UNAVAILABLE_ERRORS = (CircuitOpenError, ExecutorSaturatedError, ExecutorTimeoutError)
 
 class BusinessLogicError(HTTPException):
     def __init__(self, message: str, description: str = None, data: dict = None):
@@ -9,3 +14,16 @@ class BusinessLogicError(HTTPException):
             "data": data
         }
         super().__init__(status_code=400, detail=detail)
+
+class ServiceUnavailableError(HTTPException):
+    """
+    Respuesta para los errores de `UNAVAILABLE_ERRORS`: 504 si la llamada no terminó a
+    tiempo y 503 si el circuito está abierto o el executor está saturado.
+    """
+    def __init__(self, error: Exception):
+        timed_out = isinstance(error, ExecutorTimeoutError)
+        detail = {
+            "message": "El servicio no respondió a tiempo." if timed_out else "Servicio no disponible temporalmente.",
+            "description": str(error)
+        }
+        super().__init__(status_code=504 if timed_out else 503, detail=detail)
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from app.shared.config import settings
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """La cola del executor está llena y la llamada se rechaza sin encolarla."""
+
+
+class ExecutorTimeoutError(RuntimeError):
+    """La llamada no terminó dentro del tiempo máximo permitido."""
+
+
+class BoundedExecutor:
+    """
+    Pool de hilos dedicado para ejecutar llamadas bloqueantes sin detener el event loop.
+
+    - Como máximo `max_workers` llamadas se ejecutan a la vez y `max_queue` esperan
+      turno; las llamadas adicionales se rechazan con `ExecutorSaturatedError`.
+    - Cada llamada se espera como máximo `timeout` segundos. Si se agota, la petición
+      recibe `ExecutorTimeoutError`; una llamada que ya empezó no puede interrumpirse
+      y termina en segundo plano, ocupando su hilo hasta entonces.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int, timeout: float):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+
+    def _call(self, fn: Callable, args: tuple, kwargs: dict) -> Any:
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        else:
+            with self._lock:
+                self.completed += 1
+            return result
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def _on_done(self, future: Future) -> None:
+        # Una llamada cancelada antes de empezar nunca pasa por `_call`
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Ejecuta `fn(*args, **kwargs)` en el pool y espera su resultado.
+
+        Raises:
+            ExecutorSaturatedError: Si el pool y su cola están llenos.
+            ExecutorTimeoutError: Si la llamada no terminó a tiempo.
+        """
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise ExecutorSaturatedError(f"El servicio {self.name} está saturado, intente más tarde.")
+            self.queued += 1
+
+        # Las tareas en espera cuentan como encoladas hasta que un hilo las toma
+        future = self._executor.submit(self._call, fn, args, kwargs)
+        future.add_done_callback(self._on_done)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise ExecutorTimeoutError(f"El servicio {self.name} no respondió a tiempo.")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "timeout": self.timeout,
+                "queued": self.queued,
+                "active": self.active,
+                "completed": self.completed,
+                "failed": self.failed,
+                "timeouts": self.timeouts,
+                "rejected": self.rejected,
+            }
+
+
+# Executor de las llamadas síncronas de boto3 a AWS Cognito
+cognito_executor = BoundedExecutor(
+    "cognito",
+    max_workers=settings.COGNITO_MAX_WORKERS,
+    max_queue=settings.COGNITO_MAX_QUEUE,
+    timeout=settings.COGNITO_CALL_TIMEOUT,
+)
@@ -0,0 +1,49 @@
+from datetime import date, datetime, timedelta
+from typing import AsyncIterator, Optional
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from app.shared.config import settings
+
+
+def date_range_query(field: str, date_from: Optional[date], date_to: Optional[date]) -> dict:
+    """Filtro de MongoDB para `field` entre dos fechas, ambas incluidas. Sin fechas no filtra."""
+    date_range = {}
+    if date_from is not None:
+        date_range["$gte"] = datetime.combine(date_from, datetime.min.time())
+    if date_to is not None:
+        date_range["$lt"] = datetime.combine(date_to, datetime.min.time()) + timedelta(days=1)
+    return {field: date_range} if date_range else {}
+
+
+async def ndjson_lines(rows: AsyncIterator[BaseModel]) -> AsyncIterator[bytes]:
+    """
+    Serializa los modelos como NDJSON, un objeto por línea, mientras se leen de la base
+    de datos, por lo que la memoria no depende del número de registros exportados.
+
+    La primera fila se envía en cuanto está disponible para que el cliente empiece a
+    recibir datos; después se envía un bloque por cada `EXPORT_BATCH_SIZE` filas, igual
+    que el tamaño de lote del cursor de MongoDB.
+    """
+    lines = []
+    first_row = True
+    async for row in rows:
+        lines.append(row.model_dump_json())
+        if first_row or len(lines) >= settings.EXPORT_BATCH_SIZE:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+            first_row = False
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def ndjson_response(rows: AsyncIterator[BaseModel], filename: str) -> StreamingResponse:
+    """
+    Respuesta que transmite las filas mientras se leen de la base de datos. Si la lectura
+    falla a mitad de la exportación el código de estado ya fue enviado y la respuesta
+    termina incompleta.
+    """
+    return StreamingResponse(
+        ndjson_lines(rows),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,101 @@
+import threading
+import time
+from typing import Dict, Optional
+import requests
+from jose import jwk
+from jose.backends.base import Key
+from app.shared.config import JWKS_URL, settings
+
+
+class JWKSCache:
+    """
+    Caché en proceso de las claves públicas (JWKS) de Cognito, indexadas por `kid`.
+
+    - La primera consulta descarga el JWKS de forma síncrona.
+    - Cuando las claves superan su TTL se siguen usando mientras se refrescan en un
+      hilo en segundo plano, sin bloquear la verificación de tokens.
+    - Si llega un token con un `kid` desconocido (rotación de claves) se vuelve a
+      descargar el JWKS una vez, como máximo cada `min_refetch_interval` segundos.
+    """
+
+    def __init__(self, url: str, ttl: float, min_refetch_interval: float, timeout: float):
+        self.url = url
+        self.ttl = ttl
+        self.min_refetch_interval = min_refetch_interval
+        self.timeout = timeout
+        self._keys: Dict[str, Key] = {}
+        self._fetched_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def _fetch_keys(self) -> Dict[str, Key]:
+        response = requests.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        return {
+            key_data["kid"]: jwk.construct(key_data, key_data.get("alg", "RS256"))
+            for key_data in response.json()["keys"]
+        }
+
+    def refresh(self) -> None:
+        """Descarga el JWKS y reemplaza las claves en caché."""
+        keys = self._fetch_keys()
+        with self._lock:
+            self._keys = keys
+            self._fetched_at = time.monotonic()
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            except requests.RequestException:
+                # Se conservan las claves anteriores hasta el próximo intento
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name="jwks-refresh", daemon=True).start()
+
+    def needs_fetch(self, kid: Optional[str]) -> bool:
+        """Indica si `get_key(kid)` descargaría el JWKS de forma síncrona."""
+        if self._fetched_at is None:
+            return True
+        return kid not in self._keys and time.monotonic() - self._fetched_at > self.min_refetch_interval
+
+    def get_key(self, kid: str) -> Optional[Key]:
+        """
+        Obtiene la clave pública asociada a `kid`, o None si no existe en Cognito.
+
+        Raises:
+            RuntimeError: Si no fue posible descargar el JWKS y no hay claves en caché.
+        """
+        if self._fetched_at is None:
+            try:
+                self.refresh()
+            except requests.RequestException as e:
+                raise RuntimeError(f"No se pudieron obtener las claves públicas de Cognito: {str(e)}")
+        elif time.monotonic() - self._fetched_at > self.ttl:
+            self._refresh_in_background()
+
+        key = self._keys.get(kid)
+        if key is None and time.monotonic() - self._fetched_at > self.min_refetch_interval:
+            # Posible rotación de claves: volver a descargar el JWKS una sola vez
+            try:
+                self.refresh()
+            except requests.RequestException:
+                return None
+            key = self._keys.get(kid)
+        return key
+
+
+jwks_cache = JWKSCache(
+    JWKS_URL,
+    ttl=settings.JWKS_CACHE_TTL,
+    min_refetch_interval=settings.JWKS_MIN_REFETCH_INTERVAL,
+    timeout=settings.JWKS_FETCH_TIMEOUT,
+)
@@ -1,26 +1,108 @@
-from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
-from app.shared.utils.cognito_utils import validate_token_and_get_payload
+from typing import Callable, List, Optional, Tuple
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.shared.cognito_utils import get_user_from_token, requires_key_fetch
 
-class AuthMiddleware(BaseHTTPMiddleware):
+
+def protected(token_param: Optional[str] = None) -> Callable:
+    """
+    Declara un endpoint como protegido por `AuthMiddleware`.
+
+    Args:
+        token_param (str, opcional): Nombre del parámetro de ruta que contiene el
+            access token. Si no se indica, el token se lee del header
+            `Authorization: Bearer <token>`.
     """
-    Middleware para validar el token de autorización y extraer el usuario autenticado.
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.auth_protected = True
+        endpoint.auth_token_param = token_param
+        return endpoint
+    return decorator
+
+
+class AuthMiddleware:
     """
-    async def dispatch(self, request: Request, call_next):
-        authorization: str = request.headers.get("Authorization")
-        
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Token de autorización no proporcionado")
-
-        token = authorization.split(" ")[1]
-        
+    Middleware ASGI que valida el access token solo en los endpoints declarados con
+    `@protected` y agrega el usuario autenticado a `request.state.user`.
+
+    Las peticiones a rutas públicas pasan sin validación. La verificación reutiliza
+    las claves públicas y los resultados en caché de `get_user_from_token`; solo cuando
+    hay que descargar el JWKS se ejecuta en el threadpool.
+    """
+
+    def __init__(self, app: ASGIApp, routes: List[BaseRoute]):
+        self.app = app
+        self.routes = routes
+        self._protected_routes: Optional[List[BaseRoute]] = None
+
+    def _get_protected_routes(self) -> List[BaseRoute]:
+        # Las rutas se registran al importar los routers, antes de la primera petición
+        if self._protected_routes is None:
+            self._protected_routes = [
+                route for route in self.routes
+                if getattr(getattr(route, "endpoint", None), "auth_protected", False)
+            ]
+        return self._protected_routes
+
+    def _match_protected_route(self, scope: Scope) -> Optional[Tuple[BaseRoute, dict]]:
+        """Retorna la ruta protegida que atenderá la petición y sus parámetros de ruta."""
+        protected_routes = self._get_protected_routes()
+        if not any(route.matches(scope)[0] == Match.FULL for route in protected_routes):
+            return None
+
+        # Confirmar que la ruta protegida es la primera coincidencia, como hace el router
+        for route in self.routes:
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                if route in protected_routes:
+                    return route, child_scope.get("path_params", {})
+                return None
+        return None
+
+    @staticmethod
+    def _get_token(scope: Scope, route: BaseRoute, path_params: dict) -> Optional[str]:
+        token_param = route.endpoint.auth_token_param
+        if token_param:
+            return path_params.get(token_param)
+
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value.decode("latin-1")
+                if authorization.startswith("Bearer "):
+                    return authorization[len("Bearer "):]
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_match = self._match_protected_route(scope)
+        if route_match is None:
+            await self.app(scope, receive, send)
+            return
+
+        route, path_params = route_match
+        token = self._get_token(scope, route, path_params)
+        if not token:
+            response = JSONResponse(status_code=401, content={"detail": "Token de autorización no proporcionado"})
+            await response(scope, receive, send)
+            return
+
         try:
-            payload = validate_token_and_get_payload(token)
-            request.state.user = payload  # Agregamos el usuario al request
+            if requires_key_fetch(token):
+                # La descarga del JWKS es síncrona: se hace en un hilo para no detener el event loop
+                user = await run_in_threadpool(get_user_from_token, token)
+            else:
+                user = get_user_from_token(token)
         except HTTPException as e:
-            raise e
-        except Exception:
-            raise HTTPException(status_code=401, detail="Token inválido")
-        
-        response = await call_next(request)
-        return response
+            response = JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+            await response(scope, receive, send)
+            return
+
+        # Agregamos el usuario al request
+        scope.setdefault("state", {})["user"] = user
+        await self.app(scope, receive, send)
@@ -0,0 +1,36 @@
+import csv
+import json
+from typing import Iterator, Optional, TextIO
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    """Formato del archivo según su extensión: `.csv` o `.ndjson`/`.jsonl`."""
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    if extension == "csv":
+        return "csv"
+    if extension in ("ndjson", "jsonl"):
+        return "ndjson"
+    return None
+
+
+def read_rows(stream: TextIO, file_format: str) -> Iterator[object]:
+    """
+    Lee las filas del archivo una por una, sin cargarlo completo en memoria.
+
+    En CSV la primera línea contiene los nombres de los campos. En NDJSON cada línea no
+    vacía es un objeto JSON; una línea que no es JSON válido se devuelve como texto para
+    que la validación la reporte como error de esa fila.
+    """
+    if file_format == "csv":
+        yield from csv.DictReader(stream)
+        return
+
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            yield line.rstrip("\n")
@@ -0,0 +1,182 @@
+import random
+import threading
+import time
+from typing import Any, Callable, Optional
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, ReadTimeoutError
+
+# Errores de AWS que indican un problema temporal del servicio y no de la petición
+RETRYABLE_ERROR_CODES = {
+    "TooManyRequestsException",
+    "ThrottlingException",
+    "InternalErrorException",
+    "ServiceUnavailable",
+}
+
+
+class CircuitOpenError(RuntimeError):
+    """El circuito está abierto y la llamada se rechaza sin contactar al servicio."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker con tres estados:
+
+    - closed: las llamadas pasan normalmente.
+    - open: tras `failure_threshold` fallos consecutivos las llamadas fallan de inmediato
+      durante `reset_timeout` segundos.
+    - half_open: pasado ese tiempo se permite una llamada de prueba; si funciona el
+      circuito se cierra y si falla vuelve a abrirse.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self.rejected = 0
+
+    def before_call(self) -> None:
+        """
+        Raises:
+            CircuitOpenError: Si el circuito está abierto.
+        """
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "open" or (self.state == "half_open" and self._probe_in_flight):
+                self.rejected += 1
+                raise CircuitOpenError(f"El servicio {self.name} no está disponible, intente más tarde.")
+            if self.state == "half_open":
+                self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout": self.reset_timeout,
+                "rejected": self.rejected,
+            }
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Indica si vale la pena reintentar una llamada fallida.
+
+    Solo se reintentan los errores temporales de AWS y los fallos de conexión, en los
+    que la petición no llegó al servicio. Un timeout de lectura no se reintenta porque
+    la operación pudo haberse aplicado (por ejemplo, `sign_up`).
+    """
+    if isinstance(error, ClientError):
+        return error.response.get("Error", {}).get("Code") in RETRYABLE_ERROR_CODES
+    return isinstance(error, BotoConnectionError) and not isinstance(error, ReadTimeoutError)
+
+
+def is_failure(error: Exception) -> bool:
+    """Indica si el error cuenta como fallo del servicio para el circuit breaker."""
+    return is_retryable(error) or isinstance(error, (BotoConnectionError, ReadTimeoutError))
+
+
+class ResilientClient:
+    """
+    Envuelve un cliente de boto3 aplicando reintentos acotados con jitter y un circuit
+    breaker a cada llamada.
+
+    Los atributos que no son operaciones del servicio (por ejemplo `client.exceptions`)
+    se devuelven sin cambios, por lo que el wrapper sustituye al cliente original.
+    Los reintentos se detienen cuando el tiempo total superaría `budget` segundos.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        breaker: CircuitBreaker,
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float,
+        budget: float,
+    ):
+        self._client = client
+        self.breaker = breaker
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._client, name)
+        if name.startswith("_") or name == "exceptions" or not callable(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            return self._call(attribute, args, kwargs)
+
+        return call
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: espera aleatoria entre 0 y el backoff exponencial del intento
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _call(self, operation: Callable, args: tuple, kwargs: dict) -> Any:
+        # El circuit breaker cuenta llamadas, no intentos: una llamada que agota sus
+        # reintentos registra un solo fallo
+        self.breaker.before_call()
+        deadline = time.monotonic() + self.budget
+        attempt = 0
+        while True:
+            try:
+                result = operation(*args, **kwargs)
+            except Exception as e:
+                if not is_failure(e):
+                    # Errores de negocio (credenciales incorrectas, código inválido...)
+                    self.breaker.record_success()
+                    raise
+
+                attempt += 1
+                delay = self._backoff(attempt)
+                if not is_retryable(e) or attempt >= self.max_attempts or time.monotonic() + delay >= deadline:
+                    self.breaker.record_failure()
+                    raise
+                time.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
+
+
+def build_cognito_client(
+    region_name: Optional[str],
+    connect_timeout: float,
+    read_timeout: float,
+    **client_kwargs,
+) -> Any:
+    """
+    Crea el cliente de boto3 para Cognito con timeouts de conexión y lectura. Los
+    reintentos internos de botocore se desactivan porque los aplica `ResilientClient`.
+    """
+    config = Config(
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        retries={"mode": "standard", "total_max_attempts": 1},
+    )
+    return boto3.client("cognito-idp", region_name=region_name, config=config, **client_kwargs)
@@ -1,19 +1,20 @@
 from fastapi import HTTPException
 from datetime import datetime, date, time
 from app.database.connection import db
-from app.shared.config import JWKS_URL
+from app.shared.jwks import jwks_cache
+from app.shared.availability import get_day_schedule, invalidate_day_schedule, slot_unavailable_error, to_minutes
 from bson import ObjectId
 from fastapi import Depends
 from fastapi.security import OAuth2PasswordBearer
-from typing import Annotated, Dict
+from typing import Annotated, Dict, List, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorCollection
 import base64
+import json
 import hmac
 import hashlib
 from jose import jwt, JWTError
-import requests
 
 
-reservations_collection=db["reservations"]
 movies_collection=db["movies"]
 users_collection = db["users"]
 
@@ -39,7 +40,7 @@ def encode_token(payload: dict) -> str:
     token = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
     return token
 
-def decode_token(token:Annotated[str, Depends(oauth2_scheme)]) -> str:
+async def decode_token(token:Annotated[str, Depends(oauth2_scheme)]) -> str:
     """
     Decodifica un token JWT para obtener el payload.
 
@@ -47,7 +48,7 @@ def decode_token(token:Annotated[str, Depends(oauth2_scheme)]) -> str:
     :return: Información decodificada del token.
     """
     data = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-    user = users_collection.find_one({"username": data["username"]})
+    user = await users_collection.find_one({"username": data["username"]})
     # user=users.get(data["username"])
     return user
 
@@ -67,7 +68,78 @@ def validate_object_id(id: str) -> ObjectId:
                 "description": f"ObjectId inválido: {id}"
             }
         )
-    
+
+
+def encode_cursor(**values) -> str:
+    """
+    Codifica los valores de la última posición de una página en un cursor opaco.
+    """
+    payload = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("utf-8")
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Decodifica un cursor generado por `encode_cursor`.
+    Lanza una excepción si el cursor no es válido.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("utf-8")))
+        if not isinstance(values, dict):
+            raise ValueError(cursor)
+        return values
+    except Exception:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": "Cursor de paginación inválido.",
+                "description": f"El cursor proporcionado no es válido: {cursor}"
+            }
+        )
+
+def decode_created_at_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decodifica un cursor de paginación keyset sobre (created_at, _id).
+    Lanza una excepción si el cursor no es válido.
+    """
+    values = decode_cursor(cursor)
+    try:
+        return datetime.fromisoformat(values["created_at"]), str(values["id"])
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": "Cursor de paginación inválido.",
+                "description": f"El cursor proporcionado no es válido: {cursor}"
+            }
+        )
+
+async def get_page(collection: AsyncIOMotorCollection, query: dict, limit: int, cursor: Optional[str] = None, projection: Optional[dict] = None) -> Tuple[List[dict], Optional[str]]:
+    """
+    Obtiene una página de documentos ordenados por `_id` usando paginación keyset.
+
+    Args:
+        collection (AsyncIOMotorCollection): Colección de MongoDB a consultar.
+        query (dict): Filtro base de la consulta.
+        limit (int): Número máximo de documentos de la página.
+        cursor (str, opcional): Cursor devuelto por la página anterior.
+        projection (dict, opcional): Campos a devolver de cada documento.
+
+    Returns:
+        tuple: Lista de documentos de la página y el cursor de la siguiente página
+        (None si no hay más resultados).
+    """
+    if cursor:
+        last_id = validate_object_id(decode_cursor(cursor).get("id", ""))
+        query = {**query, "_id": {"$gt": last_id}}
+
+    # Se pide un documento extra para saber si existe una página siguiente
+    documents = await collection.find(query, projection).sort("_id", 1).to_list(length=limit + 1)
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_cursor(id=str(documents[-1]["_id"]))
+    return documents, next_cursor
+
 def validate_reservation_time(start_time: datetime, end_time: datetime):
     """
     Valida que los tiempos de inicio y fin estén dentro del horario permitido (09:00 - 22:00).
@@ -92,7 +164,7 @@ def validate_reservation_time(start_time: datetime, end_time: datetime):
         })
 
 
-def validate_theater_availability(theater_id: str, reservation_date: datetime, start_time: datetime, end_time: datetime):
+async def validate_theater_availability(theater_id: str, reservation_date: datetime, start_time: datetime, end_time: datetime):
     """
     Verifica si hay conflictos de horarios en un teatro específico y calcula los horarios disponibles del día.
 
@@ -108,60 +180,18 @@ def validate_theater_availability(theater_id: str, reservation_date: datetime, s
     Raises:
         ValueError: Si hay conflictos de horarios en el teatro.
     """
-    # Buscar todas las reservaciones que coincidan con el teatro y la fecha
-    existing_reservations = list(reservations_collection.find({
-        "theater_id": ObjectId(theater_id),
-        "reservation_date": reservation_date
-    }))
-
-    # Ordenar reservaciones existentes por horario de inicio
-    existing_reservations.sort(key=lambda x: x["start_time"])
-
-    # Calcular espacios disponibles
-    open_time = datetime.combine(reservation_date.date(), time(9, 0))
-    close_time = datetime.combine(reservation_date.date(), time(22, 0))
-    end_time = datetime.combine(reservation_date.date(), end_time.time())
-    start_time = datetime.combine(reservation_date.date(), start_time.time())
-    current_start = open_time
-    available_times = []
-
-    for reservation in existing_reservations:
-        reservation_start = reservation["start_time"]
-        reservation_end = reservation["end_time"]
-
-        # Si hay un espacio disponible antes de la siguiente reservación
-        if current_start < reservation_start:
-            available_times.append({
-                "start_time": current_start.strftime("%H:%M"),
-                "end_time": reservation_start.strftime("%H:%M")
-            })
-        # Mover el inicio actual al final de la reservación actual
-        current_start = max(current_start, reservation_end)
-
-    # Verificar si hay espacio después de la última reservación
-    if current_start < close_time:
-        available_times.append({
-            "start_time": current_start.strftime("%H:%M"),
-            "end_time": close_time.strftime("%H:%M")
-        })
-
-    # Validar conflictos con el horario solicitado
-    conflicting_reservations = [
-        res for res in existing_reservations
-        if res["start_time"] < end_time and res["end_time"] > start_time
-    ]
-
-    if conflicting_reservations:
-        raise ValueError({
-            "message": "No hay disponibilidad en ese horario",
-            "description": "La sala de proyección ya tiene reservaciones en este horario, por favor valida los horarios disponibles",
-            "data": available_times  # Lista de horarios disponibles acotados
-        })
-
-
-    return
-
-def validate_movie_duration(movie_id: str, start_time: datetime, end_time: datetime):
+    start, end = to_minutes(start_time), to_minutes(end_time)
+    schedule = await get_day_schedule(theater_id, reservation_date)
+
+    # Validar conflictos con el horario solicitado. El horario en caché puede no incluir
+    # las reservaciones liberadas por otro proceso, así que se recarga antes de rechazar.
+    if schedule.has_conflict(start, end):
+        invalidate_day_schedule(theater_id, reservation_date)
+        schedule = await get_day_schedule(theater_id, reservation_date)
+        if schedule.has_conflict(start, end):
+            raise slot_unavailable_error(schedule)
+
+async def validate_movie_duration(movie_id: str, start_time: datetime, end_time: datetime):
     """
     Valida si la duración de la película seleccionada permite su reproducción completa en el horario solicitado.
 
@@ -174,7 +204,17 @@ def validate_movie_duration(movie_id: str, start_time: datetime, end_time: datet
         ValueError: Si la duración de la película no encaja en el horario seleccionado.
     """
     # Buscar la película en la base de datos
-    movie = movies_collection.find_one({"_id": ObjectId(movie_id)})
+    movie = await movies_collection.find_one({"_id": ObjectId(movie_id)})
+    check_movie_duration(movie, movie_id, start_time, end_time)
+
+
+def check_movie_duration(movie: Optional[dict], movie_id: str, start_time: datetime, end_time: datetime):
+    """
+    Valida que la película ya consultada (`movie`, o None si no existe) quepa en el horario.
+
+    Raises:
+        ValueError: Si la película no existe o su duración no encaja en el horario seleccionado.
+    """
     if not movie:
         raise ValueError({
             "message": "Película no encontrada",
@@ -230,7 +270,7 @@ def format_datetime_fields(reservation_data: dict) -> dict:
     return reservation_data
 
 
-def validate_user_unique(username: str, email: str):
+async def validate_user_unique(username: str, email: str):
     """
     Valida que el nombre de usuario o correo electrónico no existan previamente en la base de datos.
 
@@ -257,7 +297,7 @@ def validate_user_unique(username: str, email: str):
             }
         }
     """
-    existing_user = users_collection.find_one({
+    existing_user = await users_collection.find_one({
         "$or": [
             {"username": username},
             {"email": email}
@@ -278,27 +318,25 @@ def validate_user_unique(username: str, email: str):
 
 
 
-# URL de los JWKS (JSON Web Key Set) para validar el token
-
-
-def get_cognito_public_keys():
-    response = requests.get(JWKS_URL)
-    return response.json()["keys"]
-
 def verify_and_decode_token(token: str) -> dict:
     """
     Verifica y decodifica un JWT de AWS Cognito.
+
+    La clave pública se obtiene de `jwks_cache` a partir del `kid` del token, por lo
+    que la verificación no consulta el JWKS de Cognito en cada llamada.
     """
     try:
-        # Obtener las claves públicas
-        jwks = get_cognito_public_keys()
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = jwks_cache.get_key(kid)
+        if key is None:
+            raise JWTError(f"Clave de firma desconocida: {kid}")
         # Decodificar el token
         decoded_token = jwt.decode(
             token,
-            key=jwks,
+            key=key,
             algorithms=["RS256"],
             options={"verify_aud": False},  # Desactiva la validación de "aud" si no se usa
         )
         return decoded_token
     except JWTError as e:
-        raise ValueError(f"Token inválido: {str(e)}")
\ No newline at end of file
+        raise ValueError(f"Token inválido: {str(e)}")
@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from app.shared.middlewares import auth_middleware
+from app.shared.middlewares.auth_middleware import AuthMiddleware, protected
+
+
+@pytest.fixture
+def auth_client(monkeypatch):
+    validated_tokens = []
+
+    def fake_get_user_from_token(token: str):
+        validated_tokens.append(token)
+        if token != "valid-token":
+            raise HTTPException(status_code=401, detail="Token inválido o expirado")
+        return "juan"
+
+    monkeypatch.setattr(auth_middleware, "get_user_from_token", fake_get_user_from_token)
+
+    app = FastAPI()
+
+    @app.get("/public")
+    async def public_route():
+        return {"ok": True}
+
+    @app.get("/private")
+    @protected()
+    async def private_route(request: Request):
+        return {"user": request.state.user}
+
+    @app.post("/private/{access_token}")
+    @protected(token_param="access_token")
+    async def private_path_route(request: Request, access_token: str):
+        return {"user": request.state.user}
+
+    app.add_middleware(AuthMiddleware, routes=app.routes)
+    client = TestClient(app)
+    client.validated_tokens = validated_tokens
+    return client
+
+
+def test_public_route_skips_validation(auth_client):
+    response = auth_client.get("/public", headers={"Authorization": "Bearer valid-token"})
+    assert response.status_code == 200
+    assert auth_client.validated_tokens == []
+
+
+def test_protected_route_requires_token(auth_client):
+    response = auth_client.get("/private")
+    assert response.status_code == 401
+
+
+def test_protected_route_rejects_invalid_token(auth_client):
+    response = auth_client.get("/private", headers={"Authorization": "Bearer other-token"})
+    assert response.status_code == 401
+
+
+def test_protected_route_sets_user(auth_client):
+    response = auth_client.get("/private", headers={"Authorization": "Bearer valid-token"})
+    assert response.status_code == 200
+    assert response.json() == {"user": "juan"}
+
+
+def test_protected_route_reads_token_from_path(auth_client):
+    response = auth_client.post("/private/valid-token")
+    assert response.status_code == 200
+    assert response.json() == {"user": "juan"}
+
+
+def test_key_fetch_runs_outside_event_loop(auth_client, monkeypatch):
+    ran_on_event_loop = []
+
+    def fake_get_user_from_token(token: str):
+        try:
+            asyncio.get_running_loop()
+            ran_on_event_loop.append(True)
+        except RuntimeError:
+            ran_on_event_loop.append(False)
+        return "juan"
+
+    monkeypatch.setattr(auth_middleware, "get_user_from_token", fake_get_user_from_token)
+    monkeypatch.setattr(auth_middleware, "requires_key_fetch", lambda token: True)
+
+    response = auth_client.get("/private", headers={"Authorization": "Bearer cold-cache-token"})
+    assert response.status_code == 200
+    assert ran_on_event_loop == [False]
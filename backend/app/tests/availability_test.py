@@ -0,0 +1,57 @@
+from app.shared.availability import DaySchedule
+
+
+def test_schedule_detects_conflicts():
+    schedule = DaySchedule()
+    schedule.add("a", 600, 720)   # 10:00 - 12:00
+    schedule.add("b", 840, 960)   # 14:00 - 16:00
+
+    assert schedule.has_conflict(660, 700)
+    assert schedule.has_conflict(540, 610)
+    assert schedule.has_conflict(900, 1000)
+    assert not schedule.has_conflict(720, 840)
+    assert not schedule.has_conflict(540, 600)
+    assert not schedule.has_conflict(960, 1320)
+
+
+def test_schedule_free_slots():
+    schedule = DaySchedule()
+    schedule.add("a", 600, 720)
+    schedule.add("b", 720, 780)
+    schedule.add("c", 1260, 1380)
+
+    assert schedule.free_slots() == [
+        {"start_time": "09:00", "end_time": "10:00"},
+        {"start_time": "13:00", "end_time": "21:00"},
+    ]
+
+
+def test_schedule_remove_splits_merged_blocks():
+    schedule = DaySchedule()
+    schedule.add("a", 600, 720)
+    schedule.add("b", 700, 800)
+    schedule.add("c", 800, 900)
+
+    schedule.remove("b")
+
+    assert not schedule.has_conflict(720, 800)
+    assert schedule.has_conflict(710, 730)
+    assert len(schedule) == 2
+
+
+def test_schedule_add_replaces_existing_reservation():
+    schedule = DaySchedule()
+    schedule.add("a", 600, 720)
+    schedule.add("a", 900, 960)
+
+    assert not schedule.has_conflict(600, 720)
+    assert schedule.has_conflict(900, 960)
+    assert len(schedule) == 1
+
+
+def test_schedule_free_gaps_with_min_duration():
+    schedule = DaySchedule()
+    schedule.add("a", 570, 1260)   # 09:30 - 21:00
+
+    assert schedule.free_gaps() == [(540, 570), (1260, 1320)]
+    assert schedule.free_gaps(min_duration=45) == [(1260, 1320)]
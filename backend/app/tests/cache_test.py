@@ -0,0 +1,62 @@
+import time
+from app.shared.cache import TTLCache
+
+
+def test_cache_hit_and_miss():
+    cache = TTLCache(maxsize=10, ttl=60)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_entries_expire():
+    cache = TTLCache(maxsize=10, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_cache_invalidate():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.invalidate("a")
+    assert cache.get("a") is None
+
+
+def test_cache_skips_set_after_invalidation():
+    cache = TTLCache(maxsize=10, ttl=60)
+    generation = cache.generation("a")
+    cache.invalidate("a")  # Escritura concurrente mientras se cargaba el valor
+
+    assert cache.set("a", "desactualizado", generation=generation) is False
+    assert cache.get("a") is None
+
+    assert cache.set("a", "actual", generation=cache.generation("a")) is True
+    assert cache.get("a") == "actual"
+
+
+def test_cache_clear_discards_pending_loads():
+    cache = TTLCache(maxsize=10, ttl=60)
+    generation = cache.generation("a")
+    cache.clear()
+
+    assert cache.set("a", 1, generation=generation) is False
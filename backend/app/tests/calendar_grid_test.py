@@ -0,0 +1,58 @@
+import random
+from datetime import date, datetime, timedelta
+from app.shared.availability import DaySchedule
+from app.shared.calendar_grid import build_calendar
+
+
+def reservation(theater_id, day, start, end):
+    reservation_date = datetime(2030, 5, 1) + timedelta(days=day)
+    return {
+        "theater_id": theater_id,
+        "reservation_date": reservation_date,
+        "start_time": reservation_date.replace(hour=start // 60, minute=start % 60),
+        "end_time": reservation_date.replace(hour=end // 60, minute=end % 60),
+    }
+
+
+def test_calendar_free_slots_and_occupancy():
+    theaters = [{"id": "a", "name": "Sala A"}, {"id": "b", "name": "Sala B"}]
+    reservations = [
+        reservation("a", 0, 600, 720),   # 10:00 - 12:00
+        reservation("a", 0, 720, 780),   # 12:00 - 13:00
+        reservation("a", 1, 540, 1320),  # Todo el día
+        reservation("b", 5, 600, 660),   # Fuera del rango consultado
+    ]
+
+    calendar = build_calendar(theaters, date(2030, 5, 1), 2, reservations)
+
+    day_a = calendar[0]["days"][0]
+    assert day_a["date"] == "2030-05-01"
+    assert day_a["free_slots"] == [
+        {"start_time": "09:00", "end_time": "10:00"},
+        {"start_time": "13:00", "end_time": "22:00"},
+    ]
+    assert day_a["occupancy"] == round(180 / 780 * 100, 2)
+    assert calendar[0]["days"][1] == {"date": "2030-05-02", "occupancy": 100.0, "free_slots": []}
+    assert calendar[1]["days"][0]["free_slots"] == [{"start_time": "09:00", "end_time": "22:00"}]
+
+
+def test_calendar_matches_day_schedule():
+    rng = random.Random(7)
+    theaters = [{"id": str(index), "name": f"Sala {index}"} for index in range(5)]
+    reservations = []
+    for theater in theaters:
+        for day in range(7):
+            for _ in range(rng.randint(0, 6)):
+                start = rng.randrange(540, 1300, 5)
+                reservations.append(reservation(theater["id"], day, start, min(start + rng.randrange(30, 180, 5), 1320)))
+
+    calendar = build_calendar(theaters, date(2030, 5, 1), 7, reservations, min_duration=60)
+
+    for row, theater in enumerate(theaters):
+        for day in range(7):
+            schedule = DaySchedule()
+            for index, item in enumerate(reservations):
+                if item["theater_id"] == theater["id"] and item["reservation_date"].day == day + 1:
+                    schedule.add(index, item["start_time"].hour * 60 + item["start_time"].minute,
+                                 item["end_time"].hour * 60 + item["end_time"].minute)
+            assert calendar[row]["days"][day]["free_slots"] == schedule.free_slots(min_duration=60)
@@ -0,0 +1,64 @@
+import time
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+from app.shared import cognito_utils, utils
+from app.shared.cache import TTLCache
+from app.shared.config import CLIENT_ID, COGNITO_ISSUER
+from app.shared.jwks import JWKSCache
+from app.tests.conftest import generate_key
+
+
+@pytest.fixture
+def signing_key(jwks_server, monkeypatch):
+    private_key, public_jwk = generate_key("k1")
+    jwks_server.keys = [public_jwk]
+    monkeypatch.setattr(utils, "jwks_cache", JWKSCache(jwks_server.url, ttl=60, min_refetch_interval=60, timeout=2))
+    monkeypatch.setattr(cognito_utils, "token_cache", TTLCache(maxsize=100, ttl=0))
+    return private_key
+
+
+def access_token(private_key: str, **claims) -> str:
+    payload = {
+        "sub": "1234",
+        "username": "juan",
+        "token_use": "access",
+        "client_id": CLIENT_ID,
+        "iss": COGNITO_ISSUER,
+        "exp": int(time.time()) + 3600,
+        **claims,
+    }
+    return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": "k1"})
+
+
+def test_get_user_from_token_is_cached(signing_key, monkeypatch):
+    token = access_token(signing_key)
+    assert cognito_utils.get_user_from_token(token) == "juan"
+
+    def fail(_):
+        raise AssertionError("El token debió resolverse desde la caché")
+
+    monkeypatch.setattr(cognito_utils, "verify_and_decode_token", fail)
+    assert cognito_utils.get_user_from_token(token) == "juan"
+
+
+def test_rejected_token_is_cached(signing_key, monkeypatch):
+    token = access_token(signing_key, token_use="id")
+    with pytest.raises(HTTPException) as error:
+        cognito_utils.get_user_from_token(token)
+    assert error.value.status_code == 401
+
+    def fail(_):
+        raise AssertionError("El rechazo debió resolverse desde la caché")
+
+    monkeypatch.setattr(cognito_utils, "verify_and_decode_token", fail)
+    with pytest.raises(HTTPException) as error:
+        cognito_utils.get_user_from_token(token)
+    assert error.value.status_code == 401
+
+
+def test_expired_token_is_rejected(signing_key):
+    token = access_token(signing_key, exp=int(time.time()) - 10)
+    with pytest.raises(HTTPException) as error:
+        cognito_utils.get_user_from_token(token)
+    assert error.value.status_code == 401
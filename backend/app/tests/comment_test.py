@@ -1,3 +1,4 @@
+import json
 from typing import List
 
 def test_create_comment(client):
@@ -88,3 +89,62 @@ def test_delete_comment(client):
     assert json_response["message"] == "El comentario ha sido eliminado exitosamente."
     assert json_response["description"] == "Se eliminó correctamente el comentario de la base de datos."
     assert json_response["data"] is None
+
+
+def test_export_comments(client):
+    # Crear un comentario para que la exportación no esté vacía
+    comment_response = client.post("/comment", json={
+        "user_id": "64f1a4b2e3c9a5508d1e8202",
+        "movie_id": "64f1a4b2e3c9a5508d1e82e8",
+        "parent_comment_id": None,
+        "comment_content": "Comentario para exportar.",
+    })
+    comment_id = comment_response.json()["data"]["id"]
+
+    response = client.get("/comment/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert comment_id in [row["id"] for row in rows]
+
+    # Un rango de fechas sin comentarios devuelve un archivo vacío
+    response = client.get("/comment/export", params={"from": "2000-01-01", "to": "2000-01-31"})
+    assert response.status_code == 200
+    assert response.text == ""
+
+
+def test_comment_writes_round_trips(client, mongo_commands):
+    comment = {
+        "user_id": "64f1a4b2e3c9a5508d1e8205",
+        "movie_id": "64f1a4b2e3c9a5508d1e8206",
+        "parent_comment_id": None,
+        "comment_content": "Comentario contado.",
+    }
+
+    # Insertar el comentario y actualizar comments_count de la película
+    mongo_commands.reset()
+    comment_id = client.post("/comment", json=comment).json()["data"]["id"]
+    assert mongo_commands.commands == ["insert", "update"]
+
+    mongo_commands.reset()
+    assert client.put(f"/comment/{comment_id}", json={"comment_content": "Editado."}).status_code == 200
+    assert mongo_commands.commands == ["findAndModify"]
+
+    mongo_commands.reset()
+    assert client.delete(f"/comment/{comment_id}").status_code == 200
+    assert mongo_commands.commands == ["findAndModify", "update"]
+
+
+def test_create_comment_with_invalid_movie_id(client):
+    comment = {
+        "user_id": "64f1a4b2e3c9a5508d1e8207",
+        "movie_id": "zzzzzzzzzzzzzzzzzzzzzzzz",  # 24 caracteres, pero no es un ObjectId
+        "parent_comment_id": None,
+        "comment_content": "Comentario sin película válida.",
+    }
+    response = client.post("/comment", json=comment)
+    assert response.status_code == 400
+
+    # No queda un comentario guardado sin contar
+    exported = client.get("/comment/export").text
+    assert comment["movie_id"] not in exported
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+from bson import ObjectId
+from app.shared.comment_tree import build_comment_tree, index_replies
+
+
+def make_comments(parents):
+    """Comentarios en orden de creación; `parents` indica la posición del padre de cada uno."""
+    comments = []
+    for position, parent in enumerate(parents):
+        comments.append({
+            "_id": ObjectId(),
+            "user_id": "u",
+            "movie_id": "m",
+            "parent_comment_id": str(comments[parent]["_id"]) if parent is not None else None,
+            "comment_content": f"comentario {position}",
+            "created_at": datetime(2030, 1, 1) + timedelta(minutes=position),
+        })
+    return comments
+
+
+def test_tree_nests_replies_up_to_depth():
+    # 0 -> 1 -> 2 -> 3, y 4 es otro comentario de primer nivel
+    comments = make_comments([None, 0, 1, 2, None])
+
+    tree, next_cursor = build_comment_tree(index_replies(comments), depth=2)
+
+    assert next_cursor is None
+    assert [node.comment_content for node in tree] == ["comentario 0", "comentario 4"]
+    reply = tree[0].replies[0]
+    assert reply.comment_content == "comentario 1"
+    # El tercer nivel no se incluye, pero se indica cuántas respuestas tiene
+    assert reply.replies == []
+    assert reply.replies_count == 1
+
+
+def test_tree_paginates_each_level():
+    comments = make_comments([None, 0, 0, 0, None, None])
+    replies = index_replies(comments)
+
+    first_page, next_cursor = build_comment_tree(replies, limit=2, depth=2, replies_limit=2)
+    assert [node.comment_content for node in first_page] == ["comentario 0", "comentario 4"]
+    assert first_page[0].replies_count == 3
+    assert len(first_page[0].replies) == 2
+
+    second_page, last_cursor = build_comment_tree(replies, limit=2, cursor=next_cursor)
+    assert [node.comment_content for node in second_page] == ["comentario 5"]
+    assert last_cursor is None
+
+    more_replies, _ = build_comment_tree(
+        replies, parent_id=first_page[0].id, cursor=first_page[0].replies_cursor
+    )
+    assert [node.comment_content for node in more_replies] == ["comentario 3"]
+
+
+def test_tree_keeps_replies_to_deleted_comments():
+    comments = make_comments([None, 0])
+    orphan = comments.pop(0)
+
+    tree, _ = build_comment_tree(index_replies(comments))
+
+    assert [node.parent_comment_id for node in tree] == [str(orphan["_id"])]
+
+
+def test_tree_with_zero_replies_limit_returns_only_counts():
+    comments = make_comments([None, 0, 0])
+
+    tree, _ = build_comment_tree(index_replies(comments), depth=2, replies_limit=0)
+
+    assert tree[0].replies == []
+    assert tree[0].replies_count == 2
+    assert tree[0].replies_cursor is None
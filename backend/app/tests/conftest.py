@@ -1,8 +1,133 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
 import pytest
+import rsa
+from jose import jwk
+from pymongo import monitoring
 from fastapi.testclient import TestClient
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Registra los comandos enviados a MongoDB para contar viajes a la base de datos."""
+
+    def __init__(self):
+        self.commands = []
+
+    def started(self, event):
+        self.commands.append(event.command_name)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def count(self, command_name: str = None) -> int:
+        if command_name is None:
+            return len(self.commands)
+        return self.commands.count(command_name)
+
+    def reset(self):
+        self.commands.clear()
+
+
+# El listener debe registrarse antes de crear el cliente de MongoDB
+command_counter = CommandCounter()
+monitoring.register(command_counter)
+
 from app.main import app  # Importa tu aplicación principal
 
-# Crear cliente de prueba
-@pytest.fixture
+# Crear cliente de prueba. Se comparte durante toda la sesión para que el cliente
+# asíncrono de MongoDB use siempre el mismo event loop.
+@pytest.fixture(scope="session")
 def client():
-    return TestClient(app)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def mongo_commands():
+    command_counter.reset()
+    return command_counter
+
+
+def generate_key(kid: str):
+    public_key, private_key = rsa.newkeys(1024)
+    public_jwk = jwk.construct(public_key.save_pkcs1().decode(), "RS256").to_dict()
+    return private_key.save_pkcs1().decode(), {**public_jwk, "kid": kid}
+
+
+class JWKSStandIn:
+    """Servidor JWKS local que cuenta las descargas recibidas."""
+
+    def __init__(self):
+        self.keys = []
+        self.requests = 0
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stand_in.requests += 1
+                body = json.dumps({"keys": stand_in.keys}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = HTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/.well-known/jwks.json"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def jwks_server():
+    server = JWKSStandIn()
+    yield server
+    server.server.shutdown()
+
+
+class CognitoStandIn:
+    """
+    Servidor local que imita la API JSON de Cognito. Cada petición consume la siguiente
+    respuesta programada en `responses` como (latencia, status, cuerpo).
+    """
+
+    def __init__(self):
+        self.responses = []
+        self.requests = 0
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                stand_in.requests += 1
+                delay, status, payload = stand_in.responses.pop(0) if stand_in.responses else (0, 200, {})
+                time.sleep(delay)
+                body = json.dumps(payload).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/x-amz-json-1.1")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def cognito_server():
+    server = CognitoStandIn()
+    yield server
+    server.server.shutdown()
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import time
+import pytest
+from app.shared.executor import BoundedExecutor, ExecutorSaturatedError, ExecutorTimeoutError
+
+
+def test_executor_does_not_block_event_loop():
+    executor = BoundedExecutor("test", max_workers=2, max_queue=2, timeout=5)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        result, _ = await asyncio.gather(executor.run(time.sleep, 0.1), ticker())
+        return result, ticks
+
+    result, ticks = asyncio.run(scenario())
+    assert result is None
+    assert ticks == 5
+    assert executor.stats()["completed"] == 1
+
+
+def test_executor_call_timeout():
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1, timeout=0.05)
+
+    with pytest.raises(ExecutorTimeoutError):
+        asyncio.run(executor.run(time.sleep, 0.2))
+    assert executor.stats()["timeouts"] == 1
+
+
+def test_executor_rejects_when_queue_is_full():
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1, timeout=5)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        queued = asyncio.ensure_future(executor.run(lambda: "ok"))
+        await asyncio.sleep(0)
+        assert executor.stats()["queued"] == 1
+
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run(lambda: "rejected")
+
+        release.set()
+        return await running, await queued
+
+    assert asyncio.run(scenario()) == (True, "ok")
+    stats = executor.stats()
+    assert stats["rejected"] == 1
+    assert stats["queued"] == 0
+    assert stats["active"] == 0
+
+
+def test_executor_propagates_exceptions():
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1, timeout=5)
+
+    def fail():
+        raise KeyError("boom")
+
+    with pytest.raises(KeyError):
+        asyncio.run(executor.run(fail))
+    assert executor.stats()["failed"] == 1
@@ -0,0 +1,24 @@
+import asyncio
+import json
+from pydantic import BaseModel
+from app.shared import export
+from app.shared.export import ndjson_lines
+
+
+class Row(BaseModel):
+    id: int
+
+
+def test_first_row_is_sent_before_the_batch_fills(monkeypatch):
+    monkeypatch.setattr(export.settings, "EXPORT_BATCH_SIZE", 2)
+
+    async def rows():
+        for index in range(4):
+            yield Row(id=index)
+
+    async def collect():
+        return [chunk async for chunk in ndjson_lines(rows())]
+
+    chunks = asyncio.run(collect())
+
+    assert [[json.loads(line)["id"] for line in chunk.decode().splitlines()] for chunk in chunks] == [[0], [1, 2], [3]]
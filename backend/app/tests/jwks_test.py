@@ -0,0 +1,91 @@
+import time
+import pytest
+from jose import jwt
+from app.shared.jwks import JWKSCache
+from app.tests.conftest import generate_key
+
+
+def test_keys_are_fetched_once(jwks_server):
+    private_key, public_jwk = generate_key("k1")
+    jwks_server.keys = [public_jwk]
+    cache = JWKSCache(jwks_server.url, ttl=60, min_refetch_interval=0, timeout=2)
+
+    token = jwt.encode({"sub": "user"}, private_key, algorithm="RS256", headers={"kid": "k1"})
+    for _ in range(5):
+        key = cache.get_key("k1")
+        assert jwt.decode(token, key, algorithms=["RS256"])["sub"] == "user"
+
+    assert jwks_server.requests == 1
+
+
+def test_unknown_kid_triggers_single_refetch(jwks_server):
+    _, old_jwk = generate_key("old")
+    jwks_server.keys = [old_jwk]
+    cache = JWKSCache(jwks_server.url, ttl=60, min_refetch_interval=0, timeout=2)
+    assert cache.get_key("old") is not None
+
+    # Rotación de claves en Cognito
+    _, new_jwk = generate_key("new")
+    jwks_server.keys = [old_jwk, new_jwk]
+    assert cache.get_key("new") is not None
+    assert jwks_server.requests == 2
+
+    assert cache.get_key("missing") is None
+    assert jwks_server.requests == 3
+
+
+def test_unknown_kid_refetch_is_rate_limited(jwks_server):
+    _, public_jwk = generate_key("k1")
+    jwks_server.keys = [public_jwk]
+    cache = JWKSCache(jwks_server.url, ttl=60, min_refetch_interval=60, timeout=2)
+
+    cache.get_key("k1")
+    for _ in range(5):
+        assert cache.get_key("missing") is None
+    assert jwks_server.requests == 1
+
+
+def test_expired_keys_refresh_in_background(jwks_server):
+    _, public_jwk = generate_key("k1")
+    jwks_server.keys = [public_jwk]
+    cache = JWKSCache(jwks_server.url, ttl=0.01, min_refetch_interval=60, timeout=2)
+
+    cache.get_key("k1")
+    time.sleep(0.02)
+    # Las claves vencidas se siguen usando mientras se refrescan en segundo plano
+    assert cache.get_key("k1") is not None
+
+    deadline = time.monotonic() + 2
+    while jwks_server.requests < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert jwks_server.requests == 2
+
+
+def test_verify_and_decode_token_uses_cached_keys(jwks_server, monkeypatch):
+    from app.shared import utils
+
+    private_key, public_jwk = generate_key("k1")
+    jwks_server.keys = [public_jwk]
+    monkeypatch.setattr(utils, "jwks_cache", JWKSCache(jwks_server.url, ttl=60, min_refetch_interval=60, timeout=2))
+
+    token = jwt.encode({"sub": "user"}, private_key, algorithm="RS256", headers={"kid": "k1"})
+    assert utils.verify_and_decode_token(token)["sub"] == "user"
+    assert utils.verify_and_decode_token(token)["sub"] == "user"
+    assert jwks_server.requests == 1
+
+    forged_key, _ = generate_key("k1")
+    forged_token = jwt.encode({"sub": "user"}, forged_key, algorithm="RS256", headers={"kid": "k1"})
+    with pytest.raises(ValueError):
+        utils.verify_and_decode_token(forged_token)
+
+
+def test_needs_fetch_matches_get_key(jwks_server):
+    _, public_jwk = generate_key("k1")
+    jwks_server.keys = [public_jwk]
+    cache = JWKSCache(jwks_server.url, ttl=60, min_refetch_interval=60, timeout=2)
+
+    assert cache.needs_fetch("k1")
+    cache.get_key("k1")
+    assert not cache.needs_fetch("k1")
+    # kid desconocido dentro del intervalo mínimo: get_key no vuelve a descargar
+    assert not cache.needs_fetch("other")
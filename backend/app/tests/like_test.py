@@ -0,0 +1,96 @@
+from bson import ObjectId
+from app.database.connection import client as mongo_client
+from app.database.indexes import create_indexes
+from app.services.like import dedupe_likes_service, movies_collection
+
+
+def create_movie(client) -> str:
+    response = client.post("/movie", json={
+        "title": "Amélie",
+        "overview": "Una joven decide cambiar la vida de quienes la rodean.",
+        "year": 2001,
+        "rating": 8.3,
+        "category": "Comedia",
+        "duration": 122,
+    })
+    return response.json()["data"]["id"]
+
+
+def test_create_like(client):
+    movie_id = create_movie(client)
+
+    response = client.post("/like", json={"user_id": "507f1f77bcf86cd799439011", "movie_id": movie_id})
+    assert response.status_code == 200
+    json_response = response.json()
+    assert json_response["message"] == "Like creado exitosamente."
+    assert json_response["data"]["movie_id"] == movie_id
+
+    movie_response = client.get(f"/movie/{movie_id}")
+    assert movie_response.json()["data"]["likes_count"] == 1
+
+
+def test_duplicate_like_is_rejected(client):
+    movie_id = create_movie(client)
+    like = {"user_id": "507f1f77bcf86cd799439011", "movie_id": movie_id}
+
+    assert client.post("/like", json=like).status_code == 200
+    response = client.post("/like", json=like)
+    assert response.status_code == 400
+    assert response.json()["detail"]["description"] == "El usuario ya dio like a esta película"
+
+    movie_response = client.get(f"/movie/{movie_id}")
+    assert movie_response.json()["data"]["likes_count"] == 1
+
+
+def test_delete_movie_likes_resets_count(client):
+    movie_id = create_movie(client)
+    for user_id in ("507f1f77bcf86cd799439011", "507f1f77bcf86cd799439012"):
+        client.post("/like", json={"user_id": user_id, "movie_id": movie_id})
+
+    response = client.delete(f"/like/movie/{movie_id}")
+    assert response.status_code == 200
+
+    # El listado resumido lee el contador guardado en la película
+    movie = client.portal.call(movies_collection.find_one, {"_id": ObjectId(movie_id)})
+    assert movie["likes_count"] == 0
+
+
+def test_like_writes_round_trips(client, mongo_commands):
+    movie_id = create_movie(client)
+
+    # Insertar el like y actualizar likes_count de la película
+    mongo_commands.reset()
+    like_id = client.post("/like", json={"user_id": "507f1f77bcf86cd799439013", "movie_id": movie_id}).json()["data"]["id"]
+    assert mongo_commands.commands == ["insert", "update"]
+
+    mongo_commands.reset()
+    assert client.delete(f"/like/{like_id}").status_code == 200
+    assert mongo_commands.commands == ["findAndModify", "update"]
+
+
+def test_unique_like_index_migration(client):
+    # Base de datos creada antes del índice único: índice no único y likes repetidos
+    database = mongo_client["movie_club_migration_test"]
+
+    async def migrate():
+        await database.drop_collection("likes")
+        await database["likes"].create_index([("user_id", 1), ("movie_id", 1)], name="user_id_1_movie_id_1")
+        await database["likes"].insert_many([
+            {"user_id": "u1", "movie_id": "m1"},
+            {"user_id": "u1", "movie_id": "m1"},
+            {"user_id": "u1", "movie_id": "m2"},
+        ])
+
+        # Los duplicados impiden crear el índice único, pero no detienen al resto
+        failed = await create_indexes(database)
+        existing = await database["likes"].index_information()
+        assert [failure.split(":")[0] for failure in failed] == ["likes.user_id_1_movie_id_1_unique"]
+        assert "user_id_1_movie_id_1" not in existing
+        assert "movie_id_1" in existing
+
+        assert await dedupe_likes_service(database["likes"]) == 1
+        assert await create_indexes(database) == []
+        assert (await database["likes"].index_information())["user_id_1_movie_id_1_unique"]["unique"]
+        await mongo_client.drop_database("movie_club_migration_test")
+
+    client.portal.call(migrate)
@@ -1,4 +1,7 @@
+import asyncio
 from typing import List
+import app.services.movie as movie_service
+from app.schemas.movie import MovieRequest
 
 
 def test_create_movie(client):
@@ -104,3 +107,272 @@ def test_delete_movie(client):
     assert json_response["data"] is None
 
 
+
+
+def test_get_movies_query_count_is_constant(client, mongo_commands):
+    # El número de consultas no debe crecer con el tamaño del catálogo
+    def create_movies(count):
+        for i in range(count):
+            client.post("/movie", json={
+                "title": f"Benchmark {i}",
+                "overview": "Película de prueba",
+                "year": 2010,
+                "rating": 7.0,
+                "category": "Drama",
+                "duration": 100,
+            })
+
+    create_movies(2)
+    mongo_commands.reset()
+    client.get("/movie")
+    small_catalog_queries = mongo_commands.count()
+
+    create_movies(20)
+    mongo_commands.reset()
+    client.get("/movie")
+    assert mongo_commands.count() == small_catalog_queries
+
+
+def test_create_movie_single_round_trip(client, mongo_commands):
+    response = client.post("/movie", json={
+        "title": "Blade Runner",
+        "overview": "Un cazador de replicantes en Los Ángeles.",
+        "year": 1982,
+        "rating": 8.1,
+        "category": "Sci-Fi",
+        "duration": 117,
+    })
+    assert response.status_code == 200
+    assert mongo_commands.commands == ["insert"]
+
+
+def test_update_movie_single_round_trip(client, mongo_commands):
+    movie = {
+        "title": "Gattaca",
+        "overview": "Un futuro de genética controlada.",
+        "year": 1997,
+        "rating": 7.8,
+        "category": "Sci-Fi",
+        "duration": 106,
+    }
+    movie_id = client.post("/movie", json=movie).json()["data"]["id"]
+
+    mongo_commands.reset()
+    response = client.put(f"/movie/{movie_id}", json={**movie, "rating": 7.9})
+    assert response.status_code == 200
+    assert mongo_commands.commands == ["findAndModify"]
+    updated_movie = response.json()["data"]
+    assert updated_movie["likes_count"] == 0
+    assert updated_movie["comments_count"] == 0
+    # Sin listas vacías que aparenten una película sin comentarios ni likes
+    assert "comments" not in updated_movie
+    assert "likes" not in updated_movie
+
+
+def test_get_movie_detail_not_cached_when_invalidated_during_load(client, monkeypatch):
+    movie = {
+        "title": "Memento",
+        "overview": "Un hombre sin memoria reciente.",
+        "year": 2000,
+        "rating": 8.4,
+        "category": "Suspenso",
+        "duration": 113,
+    }
+    movie_id = client.post("/movie", json=movie).json()["data"]["id"]
+    get_movie_comments = movie_service.get_movie_comments
+
+    async def comments_with_concurrent_update(movie_id):
+        # La película se actualiza mientras el detalle se está cargando
+        await movie_service.update_movie_service(movie_id, MovieRequest(**{**movie, "title": "Memento (remasterizada)"}))
+        return await get_movie_comments(movie_id)
+
+    monkeypatch.setattr(movie_service, "get_movie_comments", comments_with_concurrent_update)
+    client.get(f"/movie/{movie_id}")
+    monkeypatch.undo()
+
+    assert client.get(f"/movie/{movie_id}").json()["data"]["title"] == "Memento (remasterizada)"
+
+
+def test_get_movies_summary(client):
+    client.post("/movie", json={
+        "title": "Alien",
+        "overview": "Una tripulación enfrenta a una criatura desconocida.",
+        "year": 1979,
+        "rating": 8.5,
+        "category": "Terror",
+        "duration": 117,
+    })
+
+    response = client.get("/movie", params={"view": "summary"})
+    assert response.status_code == 200
+    movies = response.json()["data"]
+    assert len(movies) > 0
+    for movie in movies:
+        assert "comments" not in movie
+        assert "likes" not in movie
+        assert "likes_count" in movie
+        assert "comments_count" in movie
+
+
+def test_movie_comments_count(client, mongo_commands):
+    movie_id = client.post("/movie", json={
+        "title": "Contador",
+        "overview": "Película para contar comentarios",
+        "year": 2012,
+        "rating": 7.2,
+        "category": "Drama",
+        "duration": 105,
+    }).json()["data"]["id"]
+
+    comment_ids = [
+        client.post("/comment", json={
+            "user_id": "64f1a4b2e3c9a5508d1e8304",
+            "movie_id": movie_id,
+            "parent_comment_id": None,
+            "comment_content": "Comentario contado.",
+        }).json()["data"]["id"]
+        for _ in range(2)
+    ]
+    client.delete(f"/comment/{comment_ids[0]}")
+
+    assert client.get(f"/movie/{movie_id}").json()["data"]["comments_count"] == 1
+
+    # El listado resumido usa el contador guardado: una sola consulta a MongoDB
+    summary, cursor = {}, None
+    while True:
+        mongo_commands.reset()
+        response = client.get("/movie", params={"view": "summary", "limit": 100, "cursor": cursor}).json()
+        assert mongo_commands.commands == ["find"]
+        summary.update({movie["id"]: movie for movie in response["data"]})
+        cursor = response["next_cursor"]
+        if cursor is None:
+            break
+    assert summary[movie_id]["comments_count"] == 1
+
+
+def test_import_movies_csv(client):
+    csv_file = (
+        "title,overview,year,rating,category,duration\n"
+        "Alien,Una nave y un pasajero,1979,8.5,Terror,117\n"
+        "Sin año,Fila inválida,,7.0,Drama,100\n"
+        "Heat,Robos en Los Ángeles,1995,8.3,Acción,170\n"
+    )
+    response = client.post("/movie/import", files={"file": ("catalogo.csv", csv_file, "text/csv")})
+    assert response.status_code == 200
+    result = response.json()["data"]
+    assert result["processed"] == 3
+    assert result["inserted"] == 2
+    assert result["failed"] == 1
+    assert result["last_row"] == 3
+    assert result["errors"][0]["row"] == 2
+    assert result["errors"][0]["errors"][0].startswith("year:")
+
+
+def test_import_movies_ndjson_resume(client):
+    ndjson_file = (
+        '{"title": "Ya importada", "overview": "-", "year": 2001, "rating": 7, "category": "Drama", "duration": 90}\n'
+        "esto no es JSON\n"
+        '{"title": "Nueva", "overview": "-", "year": 2002, "rating": 7, "category": "Drama", "duration": 95}\n'
+    )
+    response = client.post(
+        "/movie/import",
+        params={"start_row": 1},
+        files={"file": ("catalogo.ndjson", ndjson_file, "application/x-ndjson")}
+    )
+    assert response.status_code == 200
+    result = response.json()["data"]
+    assert result["processed"] == 2
+    assert result["inserted"] == 1
+    assert [error["row"] for error in result["errors"]] == [2]
+
+
+def test_import_movies_validates_outside_event_loop(client, monkeypatch):
+    validated_on_event_loop = []
+    validate_movie_rows = movie_service._validate_movie_rows
+
+    def recording_validate_movie_rows(rows):
+        try:
+            asyncio.get_running_loop()
+            validated_on_event_loop.append(True)
+        except RuntimeError:
+            validated_on_event_loop.append(False)
+        return validate_movie_rows(rows)
+
+    monkeypatch.setattr(movie_service, "_validate_movie_rows", recording_validate_movie_rows)
+    csv_file = "title,overview,year,rating,category,duration\nRonin,Mercenarios en París,1998,7.2,Acción,122\n"
+    response = client.post("/movie/import", files={"file": ("catalogo.csv", csv_file, "text/csv")})
+    assert response.status_code == 200
+    assert validated_on_event_loop == [False]
+
+
+def test_import_movies_unknown_format(client):
+    response = client.post("/movie/import", files={"file": ("catalogo.xlsx", b"", "application/octet-stream")})
+    assert response.status_code == 400
+
+
+def test_get_movie_comment_tree(client):
+    movie_id = client.post("/movie", json={
+        "title": "Hilos",
+        "overview": "Película con conversación",
+        "year": 2015,
+        "rating": 7.5,
+        "category": "Drama",
+        "duration": 100,
+    }).json()["data"]["id"]
+
+    def comment(parent_comment_id=None):
+        return client.post("/comment", json={
+            "user_id": "64f1a4b2e3c9a5508d1e8301",
+            "movie_id": movie_id,
+            "parent_comment_id": parent_comment_id,
+            "comment_content": "Comentario del hilo.",
+        }).json()["data"]["id"]
+
+    root_id = comment()
+    reply_id = comment(root_id)
+    comment(reply_id)
+
+    response = client.get(f"/movie/{movie_id}/comments/tree", params={"depth": 2})
+    assert response.status_code == 200
+    tree = response.json()["data"]
+    assert [node["id"] for node in tree] == [root_id]
+    assert tree[0]["replies"][0]["id"] == reply_id
+    assert tree[0]["replies"][0]["replies"] == []
+    assert tree[0]["replies"][0]["replies_count"] == 1
+
+    response = client.get("/movie/64f1a4b2e3c9a5508d1e8302/comments/tree")
+    assert response.status_code == 404
+
+
+def test_get_movie_comments_paginated(client):
+    movie_id = client.post("/movie", json={
+        "title": "Muy comentada",
+        "overview": "Película con muchos comentarios",
+        "year": 2018,
+        "rating": 8.0,
+        "category": "Comedia",
+        "duration": 95,
+    }).json()["data"]["id"]
+    comment_ids = [
+        client.post("/comment", json={
+            "user_id": "64f1a4b2e3c9a5508d1e8303",
+            "movie_id": movie_id,
+            "parent_comment_id": None,
+            "comment_content": f"Comentario {index}",
+        }).json()["data"]["id"]
+        for index in range(5)
+    ]
+
+    seen, cursor = [], None
+    while True:
+        response = client.get(f"/movie/{movie_id}/comments", params={"limit": 2, "cursor": cursor})
+        assert response.status_code == 200
+        json_response = response.json()
+        assert len(json_response["data"]) <= 2
+        seen += [comment["id"] for comment in json_response["data"]]
+        cursor = json_response["next_cursor"]
+        if cursor is None:
+            break
+
+    # Del más reciente al más antiguo, sin repetidos
+    assert seen == comment_ids[::-1]
@@ -1,3 +1,19 @@
+import asyncio
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+import app.services.reservation as reservation_service
+from app.models.reservation import ReservationDB
+from app.schemas.reservation import ReservationRequest
+from app.services.reservation import (
+    create_reservation_service, create_reservations_batch_service, delete_reservation_service, update_reservation_service
+)
+from app.services.theater_schedule import reconcile_schedules_service, schedules_collection
+from app.shared.availability import reservations_collection
+from app.shared.utils import validate_theater_availability
+
+
 def test_create_reservation(client):
     # Crear un usuario
     user_response = client.post("/user", json={
@@ -256,4 +272,265 @@ def test_delete_reservation(client):
     assert json_response["code"] == 200
     assert json_response["message"] == "La reservación ha sido eliminada exitosamente."
     assert json_response["description"] == "Se eliminó correctamente la reservación de la base de datos."
-    assert json_response["data"] is None
\ No newline at end of file
+    assert json_response["data"] is None
+
+def create_theater_and_movie(client):
+    theater_response = client.post("/theater", json={
+        "name": "Sala Concurrencia",
+        "max_capacity": 20,
+        "projection": "4K",
+        "screen_size": '120"',
+        "description": "Sala para pruebas de reservaciones simultáneas",
+    })
+    movie_response = client.post("/movie", json={
+        "title": "Concurrencia",
+        "overview": "Película para pruebas de reservaciones simultáneas",
+        "year": 2020,
+        "rating": 7.0,
+        "category": "Drama",
+        "duration": 60,
+    })
+    return theater_response.json()["data"]["id"], movie_response.json()["data"]["id"]
+
+
+def book_concurrently(client, requests):
+    async def book_all():
+        return await asyncio.gather(
+            *(create_reservation_service(request, "user-concurrencia") for request in requests),
+            return_exceptions=True,
+        )
+
+    # Se ejecuta en el event loop de la aplicación, donde vive el cliente de MongoDB
+    return client.portal.call(book_all)
+
+
+def test_concurrent_bookings_never_double_book(client):
+    theater_id, movie_id = create_theater_and_movie(client)
+
+    # 50 reservaciones simultáneas que se traslapan entre sí (todas incluyen las 15:00)
+    requests = [
+        ReservationRequest(
+            theater_id=theater_id,
+            movie_id=movie_id,
+            is_private=True,
+            start_time=f"14:{minute:02d}",
+            end_time=f"16:{minute:02d}",
+            reservation_date="2030-01-15",
+        )
+        for minute in range(50)
+    ]
+    results = book_concurrently(client, requests)
+
+    created = [result for result in results if isinstance(result, ReservationDB)]
+    rejected = [result for result in results if isinstance(result, ValueError)]
+    assert len(created) == 1
+    assert len(rejected) == 49
+
+
+def test_concurrent_bookings_in_different_theaters_succeed(client):
+    theaters = [create_theater_and_movie(client) for _ in range(10)]
+
+    requests = [
+        ReservationRequest(
+            theater_id=theater_id,
+            movie_id=movie_id,
+            is_private=True,
+            start_time="14:00",
+            end_time="16:00",
+            reservation_date="2030-01-15",
+        )
+        for theater_id, movie_id in theaters
+    ]
+    results = book_concurrently(client, requests)
+
+    assert all(isinstance(result, ReservationDB) for result in results)
+
+
+def test_batch_booking_is_all_or_nothing(client):
+    theater_id, movie_id = create_theater_and_movie(client)
+
+    def request(start_time, end_time):
+        return ReservationRequest(
+            theater_id=theater_id,
+            movie_id=movie_id,
+            is_private=False,
+            start_time=start_time,
+            end_time=end_time,
+            reservation_date="2030-02-20",
+        )
+
+    # La segunda reservación se traslapa con la primera: no se guarda ninguna
+    with pytest.raises(ValueError) as error:
+        client.portal.call(create_reservations_batch_service, [request("10:00", "11:00"), request("10:30", "11:30")], "user-lote")
+    assert [item["index"] for item in error.value.args[0]["data"]] == [1]
+
+    created = client.portal.call(create_reservations_batch_service, [request("10:00", "11:00"), request("11:00", "12:00")], "user-lote")
+    assert [reservation.start_time.strftime("%H:%M") for reservation in created] == ["10:00", "11:00"]
+
+
+def test_batch_booking_releases_claims_when_a_claim_fails(client, monkeypatch):
+    theater_id, movie_id = create_theater_and_movie(client)
+    failing_theater_id, _ = create_theater_and_movie(client)
+    claim_slots = reservation_service.claim_slots
+
+    async def failing_claim_slots(theater_id, reservation_date, slots):
+        if theater_id == ObjectId(failing_theater_id):
+            raise PyMongoError("fallo simulado")
+        return await claim_slots(theater_id, reservation_date, slots)
+
+    monkeypatch.setattr(reservation_service, "claim_slots", failing_claim_slots)
+    requests = [
+        ReservationRequest(
+            theater_id=theater,
+            movie_id=movie_id,
+            is_private=False,
+            start_time="10:00",
+            end_time="11:00",
+            reservation_date="2030-02-21",
+        )
+        for theater in (theater_id, failing_theater_id)
+    ]
+
+    with pytest.raises(RuntimeError):
+        client.portal.call(create_reservations_batch_service, requests, "user-lote")
+
+    # El horario ocupado en la otra sala se liberó
+    schedule = client.portal.call(schedules_collection.find_one, {"theater_id": ObjectId(theater_id)})
+    assert schedule["slots"] == []
+
+
+def test_reconcile_releases_slot_left_by_failed_delete(client, monkeypatch):
+    theater_id, movie_id = create_theater_and_movie(client)
+    request = ReservationRequest(
+        theater_id=theater_id,
+        movie_id=movie_id,
+        is_private=True,
+        start_time="18:00",
+        end_time="19:00",
+        reservation_date="2030-03-10",
+    )
+    reservation = client.portal.call(create_reservation_service, request, "user-reconcile")
+
+    async def failing_release_slot(*args, **kwargs):
+        raise PyMongoError("fallo simulado")
+
+    monkeypatch.setattr(reservation_service, "release_slot", failing_release_slot)
+    monkeypatch.setattr(reservation_service.settings, "SLOT_RELEASE_ATTEMPTS", 2)
+    with pytest.raises(RuntimeError):
+        client.portal.call(delete_reservation_service, reservation.id)
+    monkeypatch.undo()
+
+    # La reservación se eliminó, pero su horario sigue ocupado
+    with pytest.raises(ValueError):
+        client.portal.call(create_reservation_service, request, "user-reconcile")
+
+    assert client.portal.call(reconcile_schedules_service, 500, 0) >= 1
+    schedule = client.portal.call(schedules_collection.find_one, {"theater_id": ObjectId(theater_id)})
+    assert schedule["slots"] == []
+    assert client.portal.call(create_reservation_service, request, "user-reconcile").start_time.strftime("%H:%M") == "18:00"
+
+
+def test_reservation_writes_round_trips(client, mongo_commands):
+    theater_id, movie_id = create_theater_and_movie(client)
+
+    def request(start_time, end_time):
+        return ReservationRequest(
+            theater_id=theater_id,
+            movie_id=movie_id,
+            is_private=True,
+            start_time=start_time,
+            end_time=end_time,
+            reservation_date="2030-04-02",
+        )
+
+    # La primera reservación del día crea el documento de horarios de la sala
+    client.portal.call(create_reservation_service, request("09:00", "10:00"), "user-conteo")
+
+    # Comprobar el documento de horarios, ocupar el horario e insertar la reservación
+    mongo_commands.reset()
+    reservation = client.portal.call(create_reservation_service, request("11:00", "12:00"), "user-conteo")
+    assert mongo_commands.commands == ["find", "update", "insert"]
+
+    # Eliminar la reservación y liberar su horario
+    mongo_commands.reset()
+    client.portal.call(delete_reservation_service, reservation.id)
+    assert mongo_commands.commands == ["findAndModify", "update"]
+
+
+def test_suggest_reservation_times_prefers_tight_fits(client):
+    theater_id, movie_id = create_theater_and_movie(client)
+    # Deja libre solo 21:00 - 22:00, justo la duración de la película
+    client.portal.call(create_reservation_service, ReservationRequest(
+        theater_id=theater_id,
+        movie_id=movie_id,
+        is_private=True,
+        start_time="09:00",
+        end_time="21:00",
+        reservation_date="2030-03-05",
+    ), "user-sugerencias")
+
+    response = client.get("/reservation/suggest", params={"movie_id": movie_id, "date": "2030-03-05"})
+    assert response.status_code == 200
+    suggestions = response.json()["data"]
+    leftovers = [suggestion["leftover_minutes"] for suggestion in suggestions]
+    assert leftovers == sorted(leftovers)
+    assert suggestions[0]["leftover_minutes"] == 0
+    assert suggestions[0]["start_time"] == "21:00"
+
+
+def test_availability_reloads_stale_schedule_before_rejecting(client):
+    theater_id, movie_id = create_theater_and_movie(client)
+    request = ReservationRequest(
+        theater_id=theater_id,
+        movie_id=movie_id,
+        is_private=True,
+        start_time="20:00",
+        end_time="21:00",
+        reservation_date="2030-04-05",
+    )
+    reservation = client.portal.call(create_reservation_service, request, "user-cache")
+
+    def check_availability():
+        return client.portal.call(
+            validate_theater_availability, theater_id, request.reservation_date, request.start_time, request.end_time
+        )
+
+    # El horario queda en caché con la reservación ocupando las 20:00
+    with pytest.raises(ValueError):
+        check_availability()
+
+    # Otro proceso elimina la reservación sin pasar por la caché de este proceso
+    client.portal.call(reservations_collection.delete_one, {"_id": ObjectId(reservation.id)})
+    check_availability()
+
+
+def test_update_reservation_stores_same_fields_as_create(client):
+    theater_id, movie_id = create_theater_and_movie(client)
+
+    def request(start_time, end_time, reservation_date):
+        return ReservationRequest(
+            theater_id=theater_id,
+            movie_id=movie_id,
+            is_private=True,
+            start_time=start_time,
+            end_time=end_time,
+            reservation_date=reservation_date,
+        )
+
+    reservation = client.portal.call(create_reservation_service, request("10:00", "11:00", "2030-05-01"), "user-dueño")
+    client.portal.call(update_reservation_service, reservation.id, request("12:00", "13:00", "2030-05-02"))
+
+    stored = client.portal.call(reservations_collection.find_one, {"_id": ObjectId(reservation.id)})
+    assert stored["user_id"] == "user-dueño"
+    assert stored["start_time"] == datetime(2030, 5, 2, 12, 0)
+    assert stored["end_time"] == datetime(2030, 5, 2, 13, 0)
+
+    response = client.put("/reservation/64f1a4b2e3c9a5508d1e8310", json={
+        "theater_id": theater_id,
+        "movie_id": movie_id,
+        "is_private": True,
+        "start_time": "15:00",
+        "end_time": "16:00",
+        "reservation_date": "2030-05-03",
+    })
+    assert response.status_code == 404
@@ -0,0 +1,113 @@
+import time
+import pytest
+from botocore.exceptions import ClientError, ReadTimeoutError
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.routers.cognito import auth
+from app.shared.executor import ExecutorSaturatedError, ExecutorTimeoutError
+from app.shared.resilience import CircuitBreaker, CircuitOpenError, ResilientClient, build_cognito_client
+
+THROTTLED = (0, 400, {"__type": "TooManyRequestsException", "message": "Rate exceeded"})
+NOT_AUTHORIZED = (0, 400, {"__type": "NotAuthorizedException", "message": "Incorrect username or password."})
+OK = (0, 200, {"Username": "user-1", "UserAttributes": []})
+
+
+def make_client(cognito_server, failure_threshold=3, reset_timeout=30, read_timeout=1.0, max_attempts=3):
+    boto_client = build_cognito_client(
+        "us-east-1",
+        connect_timeout=1.0,
+        read_timeout=read_timeout,
+        endpoint_url=cognito_server.url,
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+    )
+    breaker = CircuitBreaker("cognito", failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+    return ResilientClient(boto_client, breaker, max_attempts=max_attempts, base_delay=0.01, max_delay=0.05, budget=5)
+
+
+def test_retries_transient_errors(cognito_server):
+    client = make_client(cognito_server)
+    cognito_server.responses = [THROTTLED, THROTTLED, OK]
+
+    response = client.get_user(AccessToken="token")
+
+    assert response["Username"] == "user-1"
+    assert cognito_server.requests == 3
+    assert client.breaker.stats()["state"] == "closed"
+
+
+def test_business_errors_are_not_retried(cognito_server):
+    client = make_client(cognito_server)
+    cognito_server.responses = [NOT_AUTHORIZED]
+
+    with pytest.raises(client.exceptions.NotAuthorizedException):
+        client.get_user(AccessToken="token")
+    assert cognito_server.requests == 1
+    assert client.breaker.stats()["failures"] == 0
+
+
+def test_read_timeout_is_not_retried(cognito_server):
+    client = make_client(cognito_server, read_timeout=0.1)
+    cognito_server.responses = [(0.5, 200, {})]
+
+    with pytest.raises(ReadTimeoutError):
+        client.get_user(AccessToken="token")
+    assert cognito_server.requests == 1
+    assert client.breaker.stats()["failures"] == 1
+
+
+def test_circuit_opens_and_fails_fast(cognito_server):
+    client = make_client(cognito_server, failure_threshold=3, max_attempts=1)
+    cognito_server.responses = [THROTTLED] * 3
+
+    for _ in range(3):
+        with pytest.raises(ClientError):
+            client.get_user(AccessToken="token")
+
+    with pytest.raises(CircuitOpenError):
+        client.get_user(AccessToken="token")
+    assert cognito_server.requests == 3
+    assert client.breaker.stats()["state"] == "open"
+
+
+def test_circuit_closes_after_successful_probe(cognito_server):
+    client = make_client(cognito_server, failure_threshold=1, reset_timeout=0.05, max_attempts=1)
+    cognito_server.responses = [THROTTLED, OK]
+
+    with pytest.raises(ClientError):
+        client.get_user(AccessToken="token")
+    with pytest.raises(CircuitOpenError):
+        client.get_user(AccessToken="token")
+
+    time.sleep(0.06)
+    assert client.get_user(AccessToken="token")["Username"] == "user-1"
+    assert client.breaker.stats()["state"] == "closed"
+
+
+def test_exhausted_retries_count_as_one_failure(cognito_server):
+    client = make_client(cognito_server, failure_threshold=2, max_attempts=3)
+    cognito_server.responses = [THROTTLED] * 3
+
+    with pytest.raises(ClientError):
+        client.get_user(AccessToken="token")
+    assert cognito_server.requests == 3
+    assert client.breaker.stats()["failures"] == 1
+    assert client.breaker.stats()["state"] == "closed"
+
+
+@pytest.mark.parametrize("error, status_code", [
+    (CircuitOpenError("circuito abierto"), 503),
+    (ExecutorSaturatedError("executor saturado"), 503),
+    (ExecutorTimeoutError("tiempo agotado"), 504),
+])
+def test_unavailable_errors_map_to_gateway_status(monkeypatch, error, status_code):
+    async def failing_login(user):
+        raise error
+
+    monkeypatch.setattr(auth, "login_user_service", failing_login)
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/auth")
+
+    response = TestClient(app).post("/auth/login", json={"username": "juan", "password": "Password@123"})
+    assert response.status_code == status_code
+    assert response.json()["detail"]["description"] == str(error)
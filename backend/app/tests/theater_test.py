@@ -93,3 +93,92 @@ def test_delete_theater(client):
     assert json_response["description"] == "Se eliminó correctamente la sala de proyección de la base de datos."
     assert json_response["data"] is None
 
+
+
+def test_get_theaters_paginated(client):
+    for i in range(3):
+        client.post("/theater", json={
+            "name": f"Sala Paginada {i}",
+            "max_capacity": 20,
+            "projection": "4K",
+            "screen_size": '100"',
+            "description": "Sala para probar la paginación.",
+        })
+
+    first_page = client.get("/theater", params={"limit": 2}).json()
+    assert len(first_page["data"]) == 2
+    assert first_page["next_cursor"] is not None
+
+    second_page = client.get("/theater", params={"limit": 2, "cursor": first_page["next_cursor"]}).json()
+    first_ids = {theater["id"] for theater in first_page["data"]}
+    assert all(theater["id"] not in first_ids for theater in second_page["data"])
+
+
+def test_get_theaters_page_size_limit(client):
+    response = client.get("/theater", params={"limit": 10_000})
+    assert response.status_code == 422
+
+
+def test_theater_writes_single_round_trip(client, mongo_commands):
+    theater = {
+        "name": "Sala Estudio",
+        "max_capacity": 15,
+        "projection": "1080p",
+        "screen_size": '90"',
+        "description": "Sala pequeña para funciones privadas.",
+    }
+    create_response = client.post("/theater", json=theater)
+    assert create_response.status_code == 200
+    assert mongo_commands.commands == ["insert"]
+
+    mongo_commands.reset()
+    theater_id = create_response.json()["data"]["id"]
+    update_response = client.put(f"/theater/{theater_id}", json={**theater, "max_capacity": 20})
+    assert update_response.status_code == 200
+    assert update_response.json()["data"]["id"] == theater_id
+    assert mongo_commands.commands == ["findAndModify"]
+
+
+def test_theaters_availability_single_aggregation(client, mongo_commands):
+    theater_response = client.post("/theater", json={
+        "name": "Sala Disponibilidad",
+        "max_capacity": 25,
+        "projection": "4K",
+        "screen_size": '100"',
+        "description": "Sala para consultar horarios libres.",
+    })
+    theater_id = theater_response.json()["data"]["id"]
+
+    mongo_commands.reset()
+    response = client.get("/theater/availability", params={"date": "2031-03-10"})
+    assert response.status_code == 200
+    assert mongo_commands.commands == ["aggregate"]
+
+    availability = {theater["theater_id"]: theater for theater in response.json()["data"]}
+    assert availability[theater_id]["free_slots"] == [{"start_time": "09:00", "end_time": "22:00"}]
+
+    # Ninguna sala tiene un horario libre de más de 13 horas
+    response = client.get("/theater/availability", params={"date": "2031-03-10", "min_duration": 13 * 60 + 1})
+    assert response.status_code == 200
+    assert response.json()["data"] == []
+
+
+def test_theaters_availability_unknown_movie(client):
+    response = client.get("/theater/availability", params={"date": "2031-03-10", "movie_id": "6" * 24})
+    assert response.status_code == 404
+
+
+def test_theaters_calendar(client, mongo_commands):
+    mongo_commands.reset()
+    response = client.get("/theater/calendar", params={"start_date": "2031-04-01", "days": 30})
+    assert response.status_code == 200
+    assert mongo_commands.commands == ["aggregate"]
+
+    for theater in response.json()["data"]:
+        assert len(theater["days"]) == 30
+        assert theater["days"][0]["date"] == "2031-04-01"
+
+
+def test_theaters_calendar_range_limit(client):
+    response = client.get("/theater/calendar", params={"start_date": "2031-04-01", "days": 1000})
+    assert response.status_code == 422